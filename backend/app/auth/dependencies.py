@@ -1,30 +1,116 @@
 # backend/app/auth/dependencies.py
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from jose import JWTError, jwt
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
 from typing import Optional
 
 from ..database import get_db
 from ..models import User
 from ..core.config import settings
+from ..cache import get_cache, get_singleflight, user_key
+from ..utils.entitlements import TIER_ANONYMOUS, TIER_PREMIUM, tier_for_user
+
+# Columns cached per user; the password hash never leaves the database
+USER_SNAPSHOT_FIELDS = (
+    "id", "username", "email", "is_active", "is_superuser", "google_id",
+    "name", "picture", "email_verified", "is_premium", "created_at", "updated_at",
+)
 
 oauth2_scheme = OAuth2PasswordBearer(
     tokenUrl="token",
     auto_error=False  # Don't auto-raise errors for public endpoints
 )
 
-async def get_optional_current_user(
-    token: Optional[str] = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> Optional[User]:
+def get_user_by_email(db: Session, email: str) -> Optional[User]:
     """
-    Get current user if token is valid, otherwise return None.
-    Used for endpoints that can be accessed both authenticated and unauthenticated.
+    Look up a user for token authentication, served from the shared cache
+    when possible. Returns a detached User that is not attached to `db`;
+    re-query it before modifying. Concurrent misses share one query.
+    """
+    key = user_key(email)
+    try:
+        snapshot = get_cache().get(key)
+    except Exception as e:
+        print(f"User cache read failed: {str(e)}")
+        snapshot = None
+    if snapshot is not None:
+        return User(**snapshot)
+
+    def load() -> Optional[dict]:
+        user = db.query(User).filter(User.email == email).first()
+        if user is None:
+            return None
+        snapshot = {field: getattr(user, field) for field in USER_SNAPSHOT_FIELDS}
+        try:
+            get_cache().set(key, snapshot, settings.USER_CACHE_TTL_SECONDS)
+        except Exception as e:
+            print(f"User cache write failed: {str(e)}")
+        return snapshot
+
+    snapshot = get_singleflight().do(key, load)
+    return User(**snapshot) if snapshot is not None else None
+
+def invalidate_user(email: str) -> None:
+    """Drop a cached user after its row changes"""
+    try:
+        get_cache().delete(user_key(email))
+    except Exception as e:
+        print(f"User cache invalidation failed: {str(e)}")
+
+# Every write to a users row drops its cached snapshot once the write
+# commits, so no code path has to remember to. ORM bulk UPDATE/DELETE
+# statements on users do not say which rows they touched and drop them all.
+_INVALIDATE_KEY = "invalidate_users"
+
+@event.listens_for(User, "after_insert")
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _user_row_written(mapper, connection, target) -> None:
+    session = object_session(target)
+    if session is None:
+        return
+    emails = session.info.setdefault(_INVALIDATE_KEY, set())
+    emails.add(target.email)
+    # A changed address leaves the old key behind too
+    emails.update(email for email in inspect(target).attrs.email.history.deleted if email)
+
+@event.listens_for(Session, "do_orm_execute")
+def _user_rows_bulk_written(state) -> None:
+    if (state.is_update or state.is_delete) and any(
+        mapper.class_ is User for mapper in state.all_mappers
+    ):
+        state.session.info.setdefault(_INVALIDATE_KEY, set()).add(None)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_written_users(session) -> None:
+    emails = session.info.pop(_INVALIDATE_KEY, None)
+    if not emails:
+        return
+    if None in emails:
+        try:
+            get_cache().delete_prefix(user_key(""))
+        except Exception as e:
+            print(f"User cache invalidation failed: {str(e)}")
+        return
+    for email in emails:
+        if email:
+            invalidate_user(email)
+
+@event.listens_for(Session, "after_rollback")
+def _forget_written_users(session) -> None:
+    session.info.pop(_INVALIDATE_KEY, None)
+
+def user_from_token(token: Optional[str], db: Session) -> Optional[User]:
+    """
+    Resolve a bearer token to its user, or None if it is missing or invalid.
+    Also used where the token arrives outside the Authorization header.
     """
     if not token:
         return None
 
+    from jose import JWTError, jwt  # imported lazily to keep startup fast
+
     try:
         payload = jwt.decode(
             token, 
@@ -37,10 +123,49 @@ async def get_optional_current_user(
     except JWTError:
         return None
 
-    user = db.query(User).filter(User.email == email).first()
-    return user
+    return get_user_by_email(db, email)
 
-async def get_current_user(
+# The dependencies below that may look the user up are plain functions so
+# FastAPI runs them in the threadpool: the cache read, the shared
+# SingleFlight wait and the query all block.
+
+def get_optional_current_user(
+    token: Optional[str] = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+) -> Optional[User]:
+    """
+    Get current user if token is valid, otherwise return None.
+    Used for endpoints that can be accessed both authenticated and unauthenticated.
+    """
+    return user_from_token(token, db)
+
+def get_access_tier(
+    token: Optional[str] = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+) -> str:
+    """
+    The caller's access tier (utils.entitlements), from the cached user,
+    which is dropped whenever the users row changes. Missing or invalid
+    tokens are anonymous. Tokens are not trusted to carry the tier: one
+    issued before a downgrade would keep premium access until it expired.
+    """
+    if not token:
+        return TIER_ANONYMOUS
+
+    from jose import JWTError, jwt
+
+    try:
+        payload = jwt.decode(
+            token,
+            settings.SECRET_KEY,
+            algorithms=["HS256"]
+        )
+    except JWTError:
+        return TIER_ANONYMOUS
+    email = payload.get("sub")
+    return tier_for_user(get_user_by_email(db, email) if email else None)
+
+def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db)
 ) -> User:
@@ -55,6 +180,8 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    from jose import JWTError, jwt
+
     try:
         payload = jwt.decode(
             token, 
@@ -75,7 +202,7 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    user = db.query(User).filter(User.email == email).first()
+    user = get_user_by_email(db, email)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -86,6 +213,27 @@ async def get_current_user(
 async def get_premium_user(
     current_user: User = Depends(get_current_user)
 ) -> User:
-    """Check if user has premium access"""
-    # TODO: Add premium status to User model and check it here
-    return current_user
\ No newline at end of file
+    """Require an authenticated user with premium access"""
+    if tier_for_user(current_user) != TIER_PREMIUM:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Premium access required"
+        )
+    return current_user
+
+def get_admin_user(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+) -> User:
+    """
+    Require an authenticated, active superuser. Checked against the users
+    row itself, never the cached snapshot, so a revoked admin is locked
+    out at once.
+    """
+    user = db.query(User).filter(User.id == current_user.id).first()
+    if user is None or not user.is_active or not user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+    return user
\ No newline at end of file
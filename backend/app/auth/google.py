@@ -1,5 +1,4 @@
 # backend/app/auth/google.py
-import httpx
 from fastapi import HTTPException
 from typing import Optional, Dict, Any
 import json
@@ -10,6 +9,8 @@ from ..models import User
 
 async def exchange_code_for_token(code: str, redirect_uri: str) -> Dict[str, Any]:
     """Exchange authorization code for access token."""
+    import httpx  # imported lazily; only needed during login
+
     try:
         print(f"Exchanging code for token with following parameters:")
         print(f"Client ID: {settings.GOOGLE_CLIENT_ID}")
@@ -60,6 +61,8 @@ async def exchange_code_for_token(code: str, redirect_uri: str) -> Dict[str, Any
 
 async def verify_google_token(token: str) -> Dict[str, Any]:
     """Verify Google OAuth token and get user info."""
+    import httpx
+
     try:
         async with httpx.AsyncClient() as client:
             response = await client.get(
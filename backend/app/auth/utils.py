@@ -1,7 +1,6 @@
 # backend/app/auth/utils.py
 from datetime import datetime, timedelta
 from typing import Any, Union
-from jose import jwt
 from ..core.config import settings
 
 def create_access_token(
@@ -18,6 +17,8 @@ def create_access_token(
     Returns:
         str: JWT token
     """
+    from jose import jwt  # imported lazily to keep startup fast
+
     to_encode = data.copy()
     
     if expires_delta:
@@ -50,6 +51,8 @@ def verify_token(token: str) -> dict[str, Any]:
     Returns:
         dict: Decoded token payload
     """
+    from jose import jwt
+
     try:
         decoded_token = jwt.decode(
             token,
@@ -3,18 +3,20 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from typing import Optional
 from datetime import datetime
-from jose import JWTError, jwt
 
 from ..database import get_db
 from ..models import User
 from ..core.config import settings
+from .dependencies import get_user_by_email
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
-async def get_current_user(
+def get_current_user(
     token: str,
     db: Session = Depends(get_db)
 ) -> Optional[User]:
+    from jose import JWTError, jwt  # imported lazily to keep startup fast
+
     try:
         payload = jwt.decode(
             token, 
@@ -27,7 +29,7 @@ async def get_current_user(
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
-    user = db.query(User).filter(User.email == email).first()
+    user = get_user_by_email(db, email)
     if user is None:
         raise HTTPException(status_code=404, detail="User not found")
     
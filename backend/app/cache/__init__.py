@@ -0,0 +1,146 @@
+"""
+Cache used by the API, chosen by settings.CACHE_BACKEND:
+
+    memory   in-process LRU (default; one copy per worker)
+    sqlite   a file shared by every worker on the host (CACHE_URL is the path)
+    redis    a Redis-protocol server shared across hosts (CACHE_URL is redis://...)
+
+Catalog entries are namespaced by catalog version. Every worker derives
+the version from the database, so when the catalog changes all workers
+move to the new namespace together and stale entries are never read,
+whichever backend holds them.
+
+Concurrent misses for the same key are coalesced into one computation,
+and hot catalog entries are refreshed shortly before they expire (see
+app.cache.singleflight), so a version bump or expiry does not send every
+in-flight request to the database at once.
+"""
+import os
+import threading
+from typing import Any, Callable, Optional
+
+from ..core.config import settings
+from .base import CacheBackend
+from .memory import MemoryCache
+from .singleflight import (
+    CacheEntry, SingleFlight, compute_entry, get_singleflight, should_refresh_early
+)
+
+_cache: Optional[CacheBackend] = None
+_cache_lock = threading.Lock()
+_previous_version: Optional[str] = None
+
+
+def create_cache(backend: str, url: Optional[str] = None, ttl: Optional[float] = None) -> CacheBackend:
+    backend = backend.lower()
+    if backend == "memory":
+        return MemoryCache(max_entries=settings.CACHE_MAX_ENTRIES, default_ttl=ttl)
+    if backend == "sqlite":
+        from .sqlite import SQLiteCache
+        return SQLiteCache(url or os.path.join(os.getcwd(), "cache.sqlite3"), default_ttl=ttl)
+    if backend == "redis":
+        from .redis import RedisCache
+        return RedisCache(url or "redis://127.0.0.1:6379/0", default_ttl=ttl)
+    raise ValueError(f"Unknown cache backend: {backend}")
+
+
+def get_cache() -> CacheBackend:
+    """
+    Return the process-wide cache, creating it on first use
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = create_cache(settings.CACHE_BACKEND, settings.CACHE_URL,
+                                      settings.CACHE_TTL_SECONDS)
+    return _cache
+
+
+def catalog_key(*parts: Any) -> Optional[str]:
+    """
+    Build a cache key in the current catalog version's namespace, or None
+    when the version is not known yet (callers then skip the cache)
+    """
+    from ..utils.catalog import current_catalog_version
+
+    version = current_catalog_version()
+    if version is None:
+        return None
+    return "catalog:{}:{}".format(version, ":".join(str(p) for p in parts))
+
+
+def cached_catalog(key: Optional[str], compute: Callable[[], Any]) -> Any:
+    """
+    get_or_set for catalog payloads; computes directly when key is None.
+    Concurrent misses share one compute(), and entries close to expiry are
+    recomputed early by a single reader while the others keep the old value.
+    """
+    if key is None:
+        return compute()
+    try:
+        cache = get_cache()
+        entry = cache.get(key)
+    except Exception as e:
+        print(f"Cache read failed for {key}: {str(e)}")
+        return compute()
+
+    flights = get_singleflight()
+    refresh = False
+    if isinstance(entry, CacheEntry):
+        if flights.in_flight(key) or not should_refresh_early(entry, settings.CACHE_EARLY_REFRESH_BETA):
+            return entry.value
+        refresh = True
+    elif entry is not None:
+        # Written before entries carried refresh metadata
+        return entry
+
+    def load() -> CacheEntry:
+        if not refresh:
+            # The previous leader may have stored it since our miss
+            current = cache.get(key)
+            if isinstance(current, CacheEntry):
+                return current
+        fresh = compute_entry(compute, cache.default_ttl)
+        try:
+            cache.set(key, fresh)
+        except Exception as e:
+            print(f"Cache write failed for {key}: {str(e)}")
+        return fresh
+
+    return flights.do(key, load).value
+
+
+def evict_previous_catalog(version: str) -> None:
+    """
+    Catalog listener: drop entries of the version we just moved away from.
+    Only the old namespace is touched so entries other workers already
+    wrote for the new version survive.
+    """
+    global _previous_version
+    previous, _previous_version = _previous_version, version
+    if previous and previous != version:
+        get_cache().delete_prefix(f"catalog:{previous}:")
+
+
+def user_key(email: str) -> str:
+    return f"user:{email.lower()}"
+
+
+from .responses import cached_catalog_response
+
+
+__all__ = [
+    "CacheBackend",
+    "CacheEntry",
+    "MemoryCache",
+    "SingleFlight",
+    "cached_catalog",
+    "cached_catalog_response",
+    "catalog_key",
+    "create_cache",
+    "evict_previous_catalog",
+    "get_cache",
+    "get_singleflight",
+    "user_key",
+]
@@ -0,0 +1,49 @@
+"""
+Cache backend interface shared by the in-process, SQLite and Redis backends.
+"""
+from typing import Any, Callable, Optional
+
+
+class CacheBackend:
+    """
+    Minimal key/value cache. Values must be picklable for the shared
+    backends; the in-process backend stores them as-is, so callers must
+    treat cached values as read-only.
+    """
+    default_ttl: Optional[float] = None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        raise NotImplementedError
+
+    def delete(self, *keys: str) -> None:
+        raise NotImplementedError
+
+    def pop(self, key: str, default: Any = None) -> Any:
+        """
+        Delete `key` and return its value in one step: of several callers
+        racing for the same key, only one gets the value
+        """
+        raise NotImplementedError
+
+    def delete_prefix(self, prefix: str) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def get_or_set(self, key: str, compute: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        """
+        Return the cached value for `key`, computing and storing it on a miss
+        """
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            if value is not None:
+                self.set(key, value, ttl)
+        return value
+
+    def _ttl(self, ttl: Optional[float]) -> Optional[float]:
+        return ttl if ttl is not None else self.default_ttl
@@ -0,0 +1,142 @@
+"""
+Redis cache backend speaking RESP2 over a plain socket, so no client
+library is needed. Works against Redis, Valkey, KeyDB or the local
+stand-in in resp_server.py.
+"""
+import os
+import pickle
+import socket
+import threading
+from typing import Any, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from .base import CacheBackend
+
+
+class RedisError(Exception):
+    """Error reply from the server"""
+
+
+class RespConnection:
+    def __init__(self, host: str, port: int, db: int = 0, password: Optional[str] = None,
+                 timeout: float = 2.0):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.reader = self.sock.makefile("rb")
+        if password:
+            self.execute("AUTH", password)
+        if db:
+            self.execute("SELECT", db)
+
+    @staticmethod
+    def encode(args: Tuple[Any, ...]) -> bytes:
+        out = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode()
+            out.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+        return b"".join(out)
+
+    def read_reply(self) -> Any:
+        line = self.reader.readline()
+        if not line:
+            raise ConnectionError("Connection closed by server")
+        kind, body = line[:1], line[1:-2]
+        if kind == b"+":
+            return body.decode()
+        if kind == b"-":
+            raise RedisError(body.decode())
+        if kind == b":":
+            return int(body)
+        if kind == b"$":
+            length = int(body)
+            if length < 0:
+                return None
+            data = self.reader.read(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            length = int(body)
+            if length < 0:
+                return None
+            return [self.read_reply() for _ in range(length)]
+        raise RedisError(f"Unexpected reply type {kind!r}")
+
+    def execute(self, *args: Any) -> Any:
+        self.sock.sendall(self.encode(args))
+        return self.read_reply()
+
+    def close(self) -> None:
+        try:
+            self.reader.close()
+            self.sock.close()
+        except OSError:
+            pass
+
+
+class RedisCache(CacheBackend):
+    """
+    One connection per thread (and per process after fork). Keys are
+    prefixed so several deployments can share one server.
+    """
+    def __init__(self, url: str, default_ttl: Optional[float] = None, key_prefix: str = "dsa:"):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "127.0.0.1"
+        self.port = parsed.port or 6379
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.password = parsed.password
+        self.default_ttl = default_ttl
+        self.key_prefix = key_prefix
+        self._local = threading.local()
+
+    def _connection(self) -> RespConnection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = RespConnection(self.host, self.port, self.db, self.password)
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def _execute(self, *args: Any) -> Any:
+        try:
+            return self._connection().execute(*args)
+        except (ConnectionError, OSError):
+            # Reconnect once; the server may have restarted
+            self._local.connection = None
+            return self._connection().execute(*args)
+
+    def _scan(self, pattern: str) -> List[bytes]:
+        keys: List[bytes] = []
+        cursor = b"0"
+        while True:
+            cursor, batch = self._execute("SCAN", cursor, "MATCH", pattern, "COUNT", 500)
+            keys.extend(batch)
+            if cursor in (b"0", "0"):
+                return keys
+
+    def get(self, key: str, default: Any = None) -> Any:
+        data = self._execute("GET", self.key_prefix + key)
+        return default if data is None else pickle.loads(data)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self._ttl(ttl)
+        args = ["SET", self.key_prefix + key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)]
+        if ttl:
+            args += ["PX", int(ttl * 1000)]
+        self._execute(*args)
+
+    def delete(self, *keys: str) -> None:
+        if keys:
+            self._execute("DEL", *(self.key_prefix + key for key in keys))
+
+    def pop(self, key: str, default: Any = None) -> Any:
+        # GETDEL needs Redis 6.2
+        data = self._execute("GETDEL", self.key_prefix + key)
+        return default if data is None else pickle.loads(data)
+
+    def delete_prefix(self, prefix: str) -> None:
+        keys = self._scan(self.key_prefix + prefix.replace("*", r"\*") + "*")
+        for start in range(0, len(keys), 500):
+            self._execute("DEL", *keys[start:start + 500])
+
+    def clear(self) -> None:
+        self.delete_prefix("")
@@ -0,0 +1,116 @@
+"""
+Local stand-in for Redis, for development and for exercising the Redis
+cache backend without a real server:
+
+    python -m app.cache.resp_server --port 6390
+    CACHE_BACKEND=redis CACHE_URL=redis://127.0.0.1:6390 python -m app.serve
+
+Implements only the commands RedisCache uses (PING, AUTH, SELECT, GET,
+GETDEL, SET with EX/PX, DEL, SCAN, FLUSHDB) on a single in-memory dictionary.
+"""
+import argparse
+import fnmatch
+import socketserver
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from .redis import RedisError, RespConnection
+
+_store: Dict[bytes, Tuple[bytes, Optional[float]]] = {}
+_lock = threading.Lock()
+
+
+def _encode_reply(value: Any) -> bytes:
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, RedisError):
+        return b"-ERR %s\r\n" % str(value).encode()
+    if isinstance(value, str):
+        return b"+%s\r\n" % value.encode()
+    if isinstance(value, int):
+        return b":%d\r\n" % value
+    if isinstance(value, bytes):
+        return b"$%d\r\n%s\r\n" % (len(value), value)
+    return b"*%d\r\n" % len(value) + b"".join(_encode_reply(item) for item in value)
+
+
+def _live(key: bytes) -> Optional[bytes]:
+    entry = _store.get(key)
+    if entry is None:
+        return None
+    value, expires_at = entry
+    if expires_at is not None and expires_at <= time.monotonic():
+        del _store[key]
+        return None
+    return value
+
+
+def handle_command(args: list) -> Any:
+    command = args[0].upper()
+    with _lock:
+        if command in (b"PING", b"AUTH", b"SELECT"):
+            return "PONG" if command == b"PING" else "OK"
+        if command == b"GET":
+            return _live(args[1])
+        if command == b"SET":
+            expires_at = None
+            options = [a.upper() for a in args[3::2]]
+            for option, amount in zip(options, args[4::2]):
+                if option == b"PX":
+                    expires_at = time.monotonic() + int(amount) / 1000
+                elif option == b"EX":
+                    expires_at = time.monotonic() + int(amount)
+            _store[args[1]] = (args[2], expires_at)
+            return "OK"
+        if command == b"GETDEL":
+            value = _live(args[1])
+            _store.pop(args[1], None)
+            return value
+        if command == b"DEL":
+            return sum(1 for key in args[1:] if _store.pop(key, None) is not None)
+        if command == b"SCAN":
+            # The whole keyspace fits in one page here
+            options = dict(zip((a.upper() for a in args[2::2]), args[3::2]))
+            pattern = options.get(b"MATCH", b"*").decode()
+            keys = [k for k in list(_store) if _live(k) is not None
+                    and fnmatch.fnmatchcase(k.decode(), pattern)]
+            return [b"0", keys]
+        if command == b"FLUSHDB":
+            _store.clear()
+            return "OK"
+    return RedisError(f"unknown command '{command.decode()}'")
+
+
+class RespHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        parser = RespConnection.__new__(RespConnection)
+        parser.reader = self.rfile
+        while True:
+            try:
+                args = parser.read_reply()
+            except (ConnectionError, OSError):
+                return
+            if not isinstance(args, list) or not args:
+                return
+            self.wfile.write(_encode_reply(handle_command(args)))
+
+
+class RespServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Minimal local Redis stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6390)
+    args = parser.parse_args(argv)
+
+    with RespServer((args.host, args.port), RespHandler) as server:
+        print(f"RESP cache server listening on {args.host}:{args.port}")
+        server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
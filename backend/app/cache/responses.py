@@ -0,0 +1,69 @@
+"""
+Catalog responses cached together with their compressed variants, so a
+payload is serialized and compressed once per catalog version instead of
+once per request.
+"""
+import json
+from typing import Any, Callable, Dict, Optional
+
+from fastapi.encoders import jsonable_encoder
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+
+from ..core.compression import choose_encoding, compress_body, supported_encodings
+from ..core.config import settings
+
+
+def serialize_payload(payload: Any) -> bytes:
+    """Serialize a payload the way JSONResponse does"""
+    return json.dumps(
+        jsonable_encoder(payload),
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def compress_variants(body: bytes) -> Dict[str, bytes]:
+    """
+    Precompress a body with every supported encoding, keeping only
+    variants that are smaller
+    """
+    variants = {"identity": body}
+    if len(body) >= settings.COMPRESSION_MINIMUM_SIZE:
+        for encoding in supported_encodings():
+            compressed = compress_body(body, encoding, best=True)
+            if len(compressed) < len(body):
+                variants[encoding] = compressed
+    return variants
+
+
+def encode_variants(payload: Any) -> Dict[str, bytes]:
+    return compress_variants(serialize_payload(payload))
+
+
+def variant_response(variants: Dict[str, bytes], accept_encoding: str) -> Response:
+    compressed = [e for e in supported_encodings() if e in variants]
+    headers = {"Vary": "Accept-Encoding"} if compressed else {}
+
+    encoding = choose_encoding(accept_encoding, compressed) if compressed else None
+    if encoding is None:
+        return Response(variants["identity"], media_type="application/json", headers=headers)
+
+    headers["Content-Encoding"] = encoding
+    return Response(variants[encoding], media_type="application/json", headers=headers)
+
+
+def cached_catalog_response(request: Request, key: Optional[str], compute: Callable[[], Any]) -> Response:
+    """
+    Serve a catalog payload from the cache with the best encoding the
+    client accepts; without a key the payload is computed and left to the
+    compression middleware
+    """
+    from . import cached_catalog
+
+    if key is None:
+        return JSONResponse(compute())
+
+    variants = cached_catalog(key, lambda: encode_variants(compute()))
+    return variant_response(variants, request.headers.get("accept-encoding", ""))
@@ -0,0 +1,95 @@
+"""
+Request coalescing and probabilistic early refresh for cached reads.
+
+SingleFlight makes concurrent callers asking for the same key share one
+computation: the first caller (the leader) runs it and everyone arriving
+while it runs gets the leader's result or exception. do() blocks while it
+waits, so call it from sync handlers and dependencies (which FastAPI runs
+in the threadpool), never from the event loop.
+
+Coalescing is per process; with a shared cache backend each worker
+computes a missing entry at most once.
+
+Early refresh follows the XFetch algorithm: a cached entry remembers how
+long it took to compute, and each read recomputes it early with a
+probability that rises as expiry approaches, scaled by that cost and
+settings.CACHE_EARLY_REFRESH_BETA. Hot keys are refreshed by one reader
+shortly before they expire instead of by every reader right after.
+"""
+import math
+import random
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def _join(self, key: str) -> Tuple[Future, bool]:
+        """Return the in-flight call for `key` and whether the caller leads it"""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                return future, False
+            future = self._calls[key] = Future()
+            return future, True
+
+    def _finish(self, key: str, future: Future) -> None:
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+
+    def in_flight(self, key: str) -> bool:
+        with self._lock:
+            return key in self._calls
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """Run fn() once for all concurrent callers with the same key"""
+        future, leader = self._join(key)
+        if not leader:
+            return future.result()
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            self._finish(key, future)
+        future.set_result(result)
+        return result
+
+
+class CacheEntry(NamedTuple):
+    """A cached value with what XFetch needs to refresh it early"""
+    value: Any
+    # Seconds the computation took
+    delta: float
+    # Wall-clock expiry (time.time()), None when the entry never expires
+    expires_at: Optional[float]
+
+
+def should_refresh_early(entry: CacheEntry, beta: float, now: Optional[float] = None) -> bool:
+    """XFetch: now - delta * beta * ln(rand) >= expiry"""
+    if beta <= 0 or entry.expires_at is None:
+        return False
+    now = time.time() if now is None else now
+    return now - entry.delta * beta * math.log(1.0 - random.random()) >= entry.expires_at
+
+
+def compute_entry(compute: Callable[[], Any], ttl: Optional[float]) -> CacheEntry:
+    started = time.time()
+    value = compute()
+    finished = time.time()
+    return CacheEntry(value, finished - started, finished + ttl if ttl else None)
+
+
+_flights = SingleFlight()
+
+
+def get_singleflight() -> SingleFlight:
+    """The process-wide SingleFlight used by the cache helpers"""
+    return _flights
@@ -0,0 +1,100 @@
+"""
+SQLite file cache backend, shared by every worker process on one host.
+WAL mode lets readers proceed while another worker writes.
+"""
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from typing import Any, Optional
+
+from .base import CacheBackend
+
+# Expired rows are purged opportunistically every N writes
+PURGE_EVERY = 500
+
+
+class SQLiteCache(CacheBackend):
+    def __init__(self, path: str, default_ttl: Optional[float] = None):
+        self.path = path
+        self.default_ttl = default_ttl
+        self._local = threading.local()
+        self._writes = 0
+
+        connection = self._connection()
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL)"
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread, and never one inherited across fork
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None,
+                                         check_same_thread=False)
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def get(self, key: str, default: Any = None) -> Any:
+        row = self._connection().execute(
+            "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return default
+        value, expires_at = row
+        if expires_at is not None and expires_at <= time.time():
+            return default
+        return pickle.loads(value)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self._ttl(ttl)
+        expires_at = time.time() + ttl if ttl else None
+        connection = self._connection()
+        connection.execute(
+            "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), expires_at)
+        )
+        self._writes += 1
+        if self._writes % PURGE_EVERY == 0:
+            connection.execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),))
+
+    def delete(self, *keys: str) -> None:
+        if keys:
+            self._connection().executemany(
+                "DELETE FROM cache WHERE key = ?", [(key,) for key in keys]
+            )
+
+    def pop(self, key: str, default: Any = None) -> Any:
+        connection = self._connection()
+        # The write lock up front, so no other worker reads the row in between
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute(
+                "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                connection.execute("DELETE FROM cache WHERE key = ?", (key,))
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        if row is None:
+            return default
+        value, expires_at = row
+        if expires_at is not None and expires_at <= time.time():
+            return default
+        return pickle.loads(value)
+
+    def delete_prefix(self, prefix: str) -> None:
+        # Range scan on the primary key instead of LIKE (which would need escaping)
+        self._connection().execute(
+            "DELETE FROM cache WHERE key >= ? AND key < ?", (prefix, prefix + "￿")
+        )
+
+    def clear(self) -> None:
+        self._connection().execute("DELETE FROM cache")
@@ -0,0 +1,26 @@
+"""
+Pin each request to one catalog version.
+
+A request reads the catalog version this worker is on when the request
+arrives, for its whole lifetime: if a publish or rollback lands midway,
+the in-memory indexes and cache keys it uses still all belong to the
+version it started with.
+"""
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from ..utils.catalog import pin_catalog_version, unpin_catalog_version
+
+
+class CatalogPinMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = pin_catalog_version()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            unpin_catalog_version(token)
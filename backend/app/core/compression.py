@@ -0,0 +1,194 @@
+"""
+Response compression for the API.
+
+Negotiates Brotli (when the brotli package is installed) or gzip from the
+Accept-Encoding header and compresses text responses above a minimum size,
+including streamed ones. Responses that already carry a Content-Encoding,
+such as the precompressed catalog entries from app.cache, and file
+downloads that serve byte ranges pass through untouched.
+"""
+import gzip
+import zlib
+from functools import lru_cache
+from typing import Dict, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+COMPRESSIBLE_TYPES = (
+    "text/", "application/json", "application/x-ndjson", "application/javascript",
+    "application/xml", "image/svg+xml",
+)
+# Each event must reach the client immediately
+NEVER_COMPRESS_TYPES = ("text/event-stream",)
+
+
+@lru_cache(maxsize=None)
+def _brotli():
+    """The brotli module, imported on first use to keep startup fast; None when not installed"""
+    try:
+        import brotli
+    except ImportError:  # gzip only
+        return None
+    return brotli
+
+
+def supported_encodings() -> tuple:
+    return ("br", "gzip") if _brotli() is not None else ("gzip",)
+
+
+def choose_encoding(accept_encoding: str, available=None) -> Optional[str]:
+    """
+    Pick the best encoding the client accepts, preferring Brotli over gzip
+    """
+    available = available or supported_encodings()
+    accepted: Dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name.strip()] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in available:
+        quality = accepted.get(encoding, accepted.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress_body(body: bytes, encoding: str, best: bool = False) -> bytes:
+    """
+    Compress a whole body; best=True trades CPU for size, for bodies that
+    are compressed once and served many times
+    """
+    if encoding == "br":
+        return _brotli().compress(body, quality=11 if best else 5)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=9 if best else 6, mtime=0)
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+def is_compressible(content_type: str) -> bool:
+    content_type = content_type.lower()
+    if content_type.startswith(NEVER_COMPRESS_TYPES):
+        return False
+    return content_type.startswith(COMPRESSIBLE_TYPES) or content_type.endswith("+json")
+
+
+class _StreamCompressor:
+    def __init__(self, encoding: str):
+        if encoding == "br":
+            self._br = _brotli().Compressor(quality=5)
+            self._zlib = None
+        else:
+            self._br = None
+            self._zlib = zlib.compressobj(6, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        if self._br is not None:
+            return self._br.process(data)
+        return self._zlib.compress(data)
+
+    def finish(self) -> bytes:
+        if self._br is not None:
+            return self._br.finish()
+        return self._zlib.flush()
+
+
+class CompressionMiddleware:
+    """
+    Pure ASGI middleware, so streamed bodies are compressed chunk by chunk
+    instead of being buffered
+    """
+    def __init__(self, app: ASGIApp, minimum_size: Optional[int] = None):
+        from .config import settings
+
+        self.app = app
+        self.minimum_size = (
+            minimum_size if minimum_size is not None else settings.COMPRESSION_MINIMUM_SIZE
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        responder = _CompressionResponder(send, encoding, self.minimum_size)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    def __init__(self, send: Send, encoding: Optional[str], minimum_size: int):
+        self._send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start: Optional[Message] = None
+        self.compressor: Optional[_StreamCompressor] = None
+        self.passthrough = False
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # Held back until the first body chunk shows how big the response is
+            self.start = message
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self._send(message)
+            return
+        if self.compressor is not None:
+            await self._send_compressed(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        headers = MutableHeaders(scope=self.start)
+
+        eligible = (
+            self.start["status"] not in (204, 206, 304)
+            and "content-encoding" not in headers
+            # Byte ranges refer to the uncompressed file
+            and "accept-ranges" not in headers
+            and is_compressible(headers.get("content-type", ""))
+            and (more_body or len(body) >= self.minimum_size)
+        )
+        if eligible and "accept-encoding" not in headers.get("vary", "").lower():
+            headers.add_vary_header("Accept-Encoding")
+        if not eligible or self.encoding is None:
+            self.passthrough = True
+            await self._send(self.start)
+            await self._send(message)
+            return
+
+        if not more_body:
+            compressed = compress_body(body, self.encoding)
+            if len(compressed) < len(body):
+                headers["Content-Encoding"] = self.encoding
+                headers["Content-Length"] = str(len(compressed))
+                message = {**message, "body": compressed}
+            self.passthrough = True
+            await self._send(self.start)
+            await self._send(message)
+            return
+
+        # Streamed body: length is unknown up front
+        headers["Content-Encoding"] = self.encoding
+        if "content-length" in headers:
+            del headers["Content-Length"]
+        self.compressor = _StreamCompressor(self.encoding)
+        await self._send(self.start)
+        await self._send_compressed(message)
+
+    async def _send_compressed(self, message: Message) -> None:
+        more_body = message.get("more_body", False)
+        data = self.compressor.compress(message.get("body", b""))
+        if not more_body:
+            data += self.compressor.finish()
+        if data or not more_body:
+            await self._send({"type": "http.response.body", "body": data, "more_body": more_body})
@@ -1,6 +1,7 @@
 # backend/app/core/config.py
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Optional
 
 class Settings(BaseSettings):
     # Base API configs
@@ -20,6 +21,72 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "your-secret-key-replace-in-production"  # replace in production
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     
+    # How often each worker checks whether the course catalog changed
+    CATALOG_VERSION_POLL_SECONDS: float = 30
+    
+    # Database connections opened during startup warm-up
+    DB_POOL_PRECONNECT: int = 2
+    
+    # Cache backend: "memory", "sqlite" (CACHE_URL = file path) or "redis" (CACHE_URL = redis://...)
+    CACHE_BACKEND: str = "memory"
+    CACHE_URL: Optional[str] = None
+    CACHE_TTL_SECONDS: float = 300
+    CACHE_MAX_ENTRIES: int = 2048
+    USER_CACHE_TTL_SECONDS: float = 60
+    # Probabilistic early refresh of hot catalog entries (XFetch beta); 0 disables it
+    CACHE_EARLY_REFRESH_BETA: float = 1.0
+    
+    # Resource files live in a content-addressed store on disk, not in the database
+    BLOB_STORE_DIR: str = "blobs"
+    # When set (e.g. "/_blobs/"), downloads are handed to nginx with
+    # X-Accel-Redirect to an internal location aliased to BLOB_STORE_DIR
+    BLOB_ACCEL_REDIRECT_PREFIX: Optional[str] = None
+    
+    # Static snapshots of the anonymous catalog endpoints (python -m app.snapshot),
+    # one directory per catalog version; SNAPSHOT_SERVE answers matching
+    # requests from the snapshot of the current version
+    SNAPSHOT_DIR: str = "snapshots"
+    SNAPSHOT_SERVE: bool = False
+    SNAPSHOT_KEEP: int = 3
+    
+    # Responses smaller than this are sent uncompressed
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    
+    # Lesson code execution (EXECUTION_POOL_SIZE = 0 disables it)
+    EXECUTION_POOL_SIZE: int = 2
+    EXECUTION_CPU_SECONDS: int = 5
+    EXECUTION_WALL_SECONDS: float = 10
+    EXECUTION_MEMORY_MB: int = 512
+    EXECUTION_OUTPUT_LIMIT: int = 64 * 1024
+    EXECUTION_FILE_LIMIT: int = 1024 * 1024
+    EXECUTION_MAX_PER_USER: int = 2
+    EXECUTION_MAX_QUEUE: int = 32
+    EXECUTION_CACHE_TTL_SECONDS: float = 7 * 24 * 3600
+    # A server started as root runs lesson code as this user (default: nobody);
+    # it needs read access to the Python installation
+    EXECUTION_UID: int = 65534
+    EXECUTION_GID: int = 65534
+    
+    # Spark engine, off by default: lesson code can reach the JVM, so only
+    # enable it (SPARK_POOL_SIZE > 0, pyspark installed) on an isolated host
+    SPARK_POOL_SIZE: int = 0
+    SPARK_MASTER: str = "local[*]"
+    SPARK_DRIVER_MEMORY: str = "1g"
+    SPARK_WALL_SECONDS: float = 60
+    SPARK_MAX_QUEUE: int = 8
+    
+    # Exercise grading has its own sandbox pool (GRADING_POOL_SIZE = 0 disables it)
+    GRADING_POOL_SIZE: int = 2
+    GRADING_MAX_QUEUE: int = 200
+    GRADING_CPU_SECONDS: int = 2  # per test
+    GRADING_WALL_SECONDS: float = 5
+    
+    # Live event channel (/events, /ws)
+    REALTIME_CLIENT_BUFFER: int = 100
+    REALTIME_HEARTBEAT_SECONDS: float = 15
+    REALTIME_REPLAY_SECONDS: float = 300  # how far back Last-Event-ID can resume
+    REALTIME_TICKET_SECONDS: float = 30  # lifetime of a /events/ticket
+    
     class Config:
         env_file = ".env"
 
@@ -27,4 +94,9 @@ class Settings(BaseSettings):
 def get_settings() -> Settings:
     return Settings()
 
-settings = get_settings()
\ No newline at end of file
+class _LazySettings:
+    """Defers reading the environment and .env until a setting is first used"""
+    def __getattr__(self, name):
+        return getattr(get_settings(), name)
+
+settings = _LazySettings()
\ No newline at end of file
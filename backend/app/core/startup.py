@@ -0,0 +1,40 @@
+"""
+Startup warm-up phases for the Spark Tutorial API.
+Each phase is timed and failures are reported without aborting startup,
+so a cold worker can still serve requests from the database.
+"""
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+
+class StartupReport:
+    """
+    Records how long each warm-up phase took
+    """
+    def __init__(self):
+        self.phases: List[Tuple[str, float]] = []
+        self.errors: Dict[str, str] = {}
+
+    def run(self, name: str, fn: Callable, *args, **kwargs) -> Any:
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        except Exception as e:
+            print(f"Startup phase '{name}' failed: {str(e)}")
+            self.errors[name] = str(e)
+            return None
+        finally:
+            elapsed = time.perf_counter() - start
+            self.phases.append((name, elapsed))
+            print(f"Startup phase '{name}' took {elapsed * 1000:.1f}ms")
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(elapsed for _, elapsed in self.phases)
+
+    def as_dict(self) -> Dict:
+        return {
+            "phases_ms": {name: round(elapsed * 1000, 2) for name, elapsed in self.phases},
+            "total_ms": round(self.total_seconds * 1000, 2),
+            "errors": self.errors
+        }
@@ -1,17 +1,28 @@
 # backend/app/database.py
+import os
+
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./spark_tutorial.db"
+SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./spark_tutorial.db")
 
 engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+    SQLALCHEMY_DATABASE_URL,
+    connect_args={"check_same_thread": False} if SQLALCHEMY_DATABASE_URL.startswith("sqlite") else {}
 )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+def preconnect_pool(size: int = 2) -> int:
+    """Open pooled connections up front so first requests skip the connect cost"""
+    connections = [engine.connect() for _ in range(size)]
+    for connection in connections:
+        connection.exec_driver_sql("SELECT 1")
+        connection.close()
+    return len(connections)
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
@@ -0,0 +1,61 @@
+"""
+Programmatic access to the Alembic migrations in backend/migrations.
+
+    python -m app.db_migrations            # upgrade to head
+    python -m app.db_migrations current    # show the applied revision
+"""
+import sys
+from pathlib import Path
+
+from sqlalchemy import inspect
+
+from .database import engine
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+BASELINE_REVISION = "0001_baseline"
+
+
+def alembic_config():
+    from alembic.config import Config
+
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(BACKEND_DIR / "migrations"))
+    return config
+
+
+def upgrade_database(revision: str = "head") -> None:
+    """
+    Upgrade the configured database, adopting databases that predate
+    migrations (tables present, no alembic_version) at the baseline revision
+    """
+    from alembic import command
+
+    if str(BACKEND_DIR) not in sys.path:
+        sys.path.insert(0, str(BACKEND_DIR))
+
+    config = alembic_config()
+    with engine.connect() as connection:
+        config.attributes["connection"] = connection
+        tables = set(inspect(connection).get_table_names())
+        if "courses" in tables and "alembic_version" not in tables:
+            print(f"Existing database without migration history; stamping {BASELINE_REVISION}")
+            command.stamp(config, BASELINE_REVISION)
+        # Alembic must own the transactions so online migrations can commit per batch
+        connection.commit()
+        command.upgrade(config, revision)
+
+
+def current_revision() -> None:
+    from alembic import command
+
+    config = alembic_config()
+    with engine.connect() as connection:
+        config.attributes["connection"] = connection
+        command.current(config, verbose=True)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "current":
+        current_revision()
+    else:
+        upgrade_database(sys.argv[1] if len(sys.argv) > 1 else "head")
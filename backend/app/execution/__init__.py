@@ -0,0 +1,70 @@
+"""
+Sandboxed execution of lesson code samples.
+"""
+from typing import Optional
+
+from ..core.config import settings
+from .engines import ExecutionEngine, ExecutionRejected, PythonEngine
+from .service import ExecutionService
+from .spark import SparkEngine, spark_available
+
+_service: Optional[ExecutionService] = None
+
+
+def execution_limits() -> dict:
+    return {
+        "cpu_seconds": settings.EXECUTION_CPU_SECONDS,
+        "wall_seconds": settings.EXECUTION_WALL_SECONDS,
+        "memory_mb": settings.EXECUTION_MEMORY_MB,
+        "output_bytes": settings.EXECUTION_OUTPUT_LIMIT,
+        "file_bytes": settings.EXECUTION_FILE_LIMIT,
+        "run_as_uid": settings.EXECUTION_UID,
+        "run_as_gid": settings.EXECUTION_GID,
+    }
+
+
+def get_execution_service() -> ExecutionService:
+    """
+    Return the process-wide service with the default engines registered
+    """
+    global _service
+    if _service is None:
+        service = ExecutionService(
+            max_per_user=settings.EXECUTION_MAX_PER_USER,
+            max_queue=settings.EXECUTION_MAX_QUEUE,
+            cache_ttl=settings.EXECUTION_CACHE_TTL_SECONDS,
+        )
+        service.register(PythonEngine(settings.EXECUTION_POOL_SIZE, execution_limits()))
+        if settings.SPARK_POOL_SIZE > 0 and spark_available():
+            service.register(SparkEngine(
+                settings.SPARK_POOL_SIZE,
+                {**execution_limits(), "wall_seconds": settings.SPARK_WALL_SECONDS},
+                master=settings.SPARK_MASTER,
+                driver_memory=settings.SPARK_DRIVER_MEMORY,
+                max_pending=settings.SPARK_MAX_QUEUE,
+            ))
+        _service = service
+    return _service
+
+
+def start_execution() -> None:
+    if settings.EXECUTION_POOL_SIZE > 0:
+        get_execution_service().start()
+
+
+def stop_execution() -> None:
+    if _service is not None:
+        _service.stop()
+
+
+__all__ = [
+    "ExecutionEngine",
+    "ExecutionRejected",
+    "ExecutionService",
+    "PythonEngine",
+    "SparkEngine",
+    "execution_limits",
+    "get_execution_service",
+    "start_execution",
+    "stop_execution",
+]
@@ -0,0 +1,72 @@
+"""
+Execution engines behind POST /lessons/{id}/run.
+
+An engine owns its worker pool and decides which submissions it can run.
+The service asks engines in priority order, so a specialised engine can
+claim code before the plain Python engine sees it.
+"""
+import hashlib
+import json
+from typing import Any, Dict, Optional
+
+from .pool import SandboxPool
+
+
+class ExecutionRejected(Exception):
+    """The run was not admitted; carries the HTTP status to report"""
+    def __init__(self, status_code: int, detail: str, retry_after: Optional[int] = None):
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+        super().__init__(detail)
+
+
+class ExecutionEngine:
+    name = "base"
+    languages = ()
+    priority = 0
+    # Engine-specific queue bound, on top of the service-wide one
+    max_pending: Optional[int] = None
+    # Whether a run request may name this engine (lesson authors always can)
+    learner_selectable = True
+
+    def start(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+    def accepts(self, code: str, language: Optional[str]) -> bool:
+        return (language or "python").lower() in self.languages
+
+    def cache_token(self) -> str:
+        """Anything besides the code that changes a run's output"""
+        return self.name
+
+    async def run(self, code: str) -> Dict[str, Any]:
+        raise NotImplementedError
+
+
+class PythonEngine(ExecutionEngine):
+    """Plain CPython in the forking sandbox"""
+    name = "python"
+    languages = ("python", "py")
+
+    def __init__(self, pool_size: int, limits: Dict[str, Any]):
+        self.limits = limits
+        self.pool = SandboxPool(pool_size)
+
+    def start(self) -> None:
+        self.pool.start()
+
+    def stop(self) -> None:
+        self.pool.stop()
+
+    def cache_token(self) -> str:
+        limits = json.dumps(self.limits, sort_keys=True)
+        return f"{self.name}:{hashlib.sha1(limits.encode()).hexdigest()[:8]}"
+
+    async def run(self, code: str) -> Dict[str, Any]:
+        # Leave the worker time to enforce the wall limit itself
+        timeout = float(self.limits["wall_seconds"]) + 5
+        return await self.pool.run({"code": code, "limits": self.limits}, timeout)
@@ -0,0 +1,193 @@
+"""
+Pool of warm sandbox worker processes.
+
+Workers are started once and reused; each run still executes in a fresh
+child forked by the worker (see sandbox.py), so a run costs a fork rather
+than an interpreter start. Jobs wait in the executor's FIFO queue until a
+worker is free.
+"""
+import asyncio
+import itertools
+import os
+import queue
+import select
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+
+from .sandbox import read_message, write_message
+
+SANDBOX_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sandbox.py")
+
+# Seconds between attempts to refill a slot whose worker could not be respawned
+RESPAWN_DELAY = 5
+
+
+class WorkerError(Exception):
+    """The worker process died or stopped responding"""
+
+
+class SandboxWorker:
+    """
+    One worker process. Every job is sent with a fresh id and the reply
+    must carry it back, so a reply that does not belong to the job (a
+    forged or out-of-sync one) retires the worker instead of being used.
+    """
+    _ids = itertools.count(1)
+
+    def __init__(self, script: str, ready_timeout: float, args: Sequence[str] = (),
+                 env: Optional[Dict[str, str]] = None):
+        # Isolated mode and a bare environment: no app imports, no secrets
+        env = {"PATH": os.environ.get("PATH", "/usr/bin:/bin"), "LANG": "C.UTF-8", **(env or {})}
+        self.process = subprocess.Popen(
+            [sys.executable, "-I", script, *args],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            env=env,
+            cwd=tempfile.gettempdir(),
+            start_new_session=True,
+        )
+        hello = self._receive(ready_timeout)
+        if not hello.get("ready"):
+            self.stop()
+            raise WorkerError(f"Worker failed to start: {hello.get('error', hello)}")
+
+    def _receive(self, timeout: float) -> Dict[str, Any]:
+        ready, _, _ = select.select([self.process.stdout], [], [], timeout)
+        if not ready:
+            raise WorkerError("Worker did not respond in time")
+        message = read_message(self.process.stdout)
+        if message is None:
+            raise WorkerError("Worker exited")
+        return message
+
+    def call(self, job: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        job_id = next(self._ids)
+        try:
+            write_message(self.process.stdin, {**job, "id": job_id})
+        except (BrokenPipeError, OSError):
+            raise WorkerError("Worker exited")
+        reply = self._receive(timeout)
+        if reply.pop("id", None) != job_id:
+            raise WorkerError("Worker replied out of turn")
+        return reply
+
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def stop(self, timeout: float = 5) -> None:
+        try:
+            self.process.stdin.close()
+            self.process.wait(timeout)
+        except (OSError, subprocess.TimeoutExpired):
+            self.process.kill()
+            self.process.wait()
+
+
+class SandboxPool:
+    """
+    Fixed-size pool; `run` is awaitable and never blocks the event loop.
+    A worker that answers with "recycle": true is replaced after the job.
+    A slot whose replacement fails to start stays empty and is refilled
+    by a later job; jobs fail instead of waiting when no worker is left.
+    """
+    def __init__(self, size: int, script: str = SANDBOX_SCRIPT, ready_timeout: float = 30,
+                 args: Sequence[str] = (), env: Optional[Dict[str, str]] = None):
+        self.size = size
+        self.script = script
+        self.ready_timeout = ready_timeout
+        self.args = tuple(args)
+        self.env = env
+        self._idle: "queue.Queue[SandboxWorker]" = queue.Queue()
+        self._workers: List[SandboxWorker] = []
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._running = False
+        self._respawn_at = 0.0
+
+    def start(self) -> None:
+        self._executor = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix="sandbox")
+        self._running = True
+        try:
+            for _ in range(self.size):
+                worker = self._spawn()
+                self._workers.append(worker)
+                self._idle.put(worker)
+        except Exception:
+            self.stop()
+            raise
+
+    def _spawn(self) -> SandboxWorker:
+        return SandboxWorker(self.script, self.ready_timeout, self.args, self.env)
+
+    def stop(self) -> None:
+        self._running = False
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        with self._lock:
+            for worker in self._workers:
+                worker.stop()
+            self._workers.clear()
+
+    def _replace(self, worker: SandboxWorker) -> Optional[SandboxWorker]:
+        """Swap a worker for a fresh one; None (the slot stays empty) if that fails"""
+        worker.stop(timeout=0)
+        with self._lock:
+            if worker in self._workers:
+                self._workers.remove(worker)
+        try:
+            replacement = self._spawn()
+        except Exception as e:
+            print(f"Could not replace a sandbox worker: {str(e)}")
+            self._respawn_at = time.monotonic() + RESPAWN_DELAY
+            return None
+        with self._lock:
+            self._workers.append(replacement)
+        return replacement
+
+    def _refill(self) -> None:
+        with self._lock:
+            while self._running and len(self._workers) < self.size \
+                    and time.monotonic() >= self._respawn_at:
+                try:
+                    worker = self._spawn()
+                except Exception as e:
+                    print(f"Could not respawn a sandbox worker: {str(e)}")
+                    self._respawn_at = time.monotonic() + RESPAWN_DELAY
+                    return
+                self._workers.append(worker)
+                self._idle.put(worker)
+
+    def _acquire(self) -> SandboxWorker:
+        while True:
+            self._refill()
+            if not self._workers:
+                raise WorkerError("No sandbox worker is available")
+            try:
+                return self._idle.get(timeout=1)
+            except queue.Empty:
+                # Busy workers, or a slot emptied while we waited
+                continue
+
+    def call(self, job: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        worker = self._acquire()
+        try:
+            result = worker.call(job, timeout)
+            if result.pop("recycle", False):
+                worker = self._replace(worker)
+            return result
+        except WorkerError:
+            # Never hand a wedged worker to the next job
+            worker = self._replace(worker)
+            raise
+        finally:
+            if worker is not None:
+                self._idle.put(worker)
+
+    async def run(self, job: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.call, job, timeout)
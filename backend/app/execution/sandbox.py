@@ -0,0 +1,457 @@
+"""
+Sandbox worker for lesson code.
+
+The pool starts this file as a standalone script with `python -I`, so a
+worker imports nothing from the app and never sees its environment or
+secrets. The worker stays warm and forks a fresh child for every run;
+the child applies resource limits, switches to an unprivileged user and
+executes the submission, so no state leaks from one run to the next.
+
+Protocol on the worker's original stdin/stdout: each message is a 4-byte
+big-endian length followed by a UTF-8 JSON object. Requests look like
+{"id": int, "code": str, "limits": {...}}; replies are run results (see
+run_job) carrying the request's id. The child closes every descriptor it
+inherits except its own result pipe, so a run cannot reach the protocol
+stream.
+
+Limits are enforced with setrlimit (CPU time, address space, file size,
+open files), a wall-clock deadline, an audit hook that rejects network,
+process and filesystem access outside the run directory, and a best-effort
+network namespace. Audit hooks are a mitigation, not a security boundary:
+a worker started as root runs code as the run_as_uid/run_as_gid user
+(nobody by default) and refuses to run it as root at all.
+"""
+import builtins
+import io
+import json
+import os
+import resource
+import select
+import shutil
+import signal
+import struct
+import sys
+import sysconfig
+import tempfile
+import time
+import traceback
+
+# Imported once in the warm worker so runs do not pay for them
+PREIMPORTED = (
+    "collections", "csv", "dataclasses", "datetime", "decimal", "functools",
+    "heapq", "itertools", "json", "math", "operator", "random", "re",
+    "statistics", "string", "textwrap", "typing",
+)
+
+DEFAULT_LIMITS = {
+    "cpu_seconds": 5,
+    "wall_seconds": 10.0,
+    "memory_mb": 512,
+    "output_bytes": 64 * 1024,
+    "file_bytes": 1024 * 1024,
+    "run_as_uid": 65534,
+    "run_as_gid": 65534,
+}
+
+# Frozen, and copied into the hook's closure by make_audit_hook: a run can
+# reach this module as sys.modules["__main__"] and must not edit the policy
+BLOCKED_EVENTS = frozenset({
+    "socket.__new__", "socket.bind", "socket.connect", "socket.getaddrinfo",
+    "socket.sendto", "subprocess.Popen", "os.system", "os.exec", "os.posix_spawn",
+    "os.spawn", "os.fork", "os.forkpty", "os.kill", "os.killpg", "os.setuid",
+    "ctypes.dlopen", "ctypes.dlsym", "ctypes.cdata", "ctypes.call_function",
+    "pty.spawn", "webbrowser.open",
+    # Walking the heap would reach the hook's closure cells
+    "gc.get_objects", "gc.get_referrers", "gc.get_referents",
+})
+
+# Events whose first argument is a path that must stay inside the run directory
+WRITE_PATH_EVENTS = frozenset({
+    "os.remove", "os.rename", "os.rmdir", "os.mkdir", "os.chmod", "os.chown",
+    "os.link", "os.symlink", "os.truncate", "os.utime", "shutil.rmtree", "os.chdir",
+})
+# ...or inside a readable root (the import system lists stdlib directories)
+READ_PATH_EVENTS = frozenset({"os.listdir", "os.scandir"})
+
+# Socket events a run may use towards this host only (make_audit_hook)
+LOOPBACK_EVENTS = frozenset({"socket.__new__", "socket.bind", "socket.connect", "socket.getaddrinfo"})
+LOOPBACK_HOSTS = frozenset({"localhost", "127.0.0.1", "::1"})
+
+CLONE_NEWNET = 0x40000000
+
+_HEADER = struct.Struct(">I")
+
+
+class LimitedWriter(io.TextIOBase):
+    """stdout/stderr replacement that keeps at most `limit` characters"""
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.parts = []
+        self.size = 0
+        self.truncated = False
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        room = self.limit - self.size
+        if room <= 0:
+            self.truncated = self.truncated or bool(text)
+            return len(text)
+        if len(text) > room:
+            self.truncated = True
+        self.parts.append(text[:room])
+        self.size += min(len(text), room)
+        return len(text)
+
+    def getvalue(self) -> str:
+        return "".join(self.parts)
+
+
+def read_message(stream):
+    header = stream.read(_HEADER.size)
+    if len(header) < _HEADER.size:
+        return None
+    (length,) = _HEADER.unpack(header)
+    return json.loads(stream.read(length).decode("utf-8"))
+
+
+def write_message(stream, message) -> None:
+    data = json.dumps(message).encode("utf-8")
+    stream.write(_HEADER.pack(len(data)) + data)
+    stream.flush()
+
+
+def _readable_roots(workdir: str):
+    roots = {os.path.realpath(workdir), "/dev/null", "/dev/urandom"}
+    for name in ("stdlib", "platstdlib", "purelib", "platlib"):
+        path = sysconfig.get_paths().get(name)
+        if path:
+            roots.add(os.path.realpath(path))
+    return tuple(roots)
+
+
+def close_fds_except(keep) -> None:
+    """Close every descriptor of this process except those in `keep`"""
+    try:
+        limit = os.sysconf("SC_OPEN_MAX")
+    except (ValueError, OSError):
+        limit = resource.getrlimit(resource.RLIMIT_NOFILE)[0]
+    start = 0
+    for fd in sorted(set(keep)) + [max(limit, 0)]:
+        # closerange() with an empty range closes everything on some Pythons
+        if fd > start:
+            os.closerange(start, fd)
+        start = max(start, fd + 1)
+
+
+def make_audit_hook(workdir: str, inherited_fds=(), extra_writable=(), allow_loopback: bool = False):
+    """
+    Audit hook confining a run to `workdir` (plus `extra_writable`).
+    Descriptors the run inherited cannot be reopened by number; ones it
+    opened itself can (tempfile does). With allow_loopback, sockets may
+    be used to reach this host only.
+
+    The policy and the helpers the hook calls are bound into its closure
+    here, so rebinding module globals or builtins afterwards (the run can
+    reach both) does not change what the hook enforces.
+    """
+    inherited_fds = frozenset(inherited_fds)
+    workdir = os.path.realpath(workdir)
+    writable = (workdir, *(os.path.realpath(path) for path in extra_writable))
+    readable = _readable_roots(workdir) + writable[1:]
+    blocked = frozenset(BLOCKED_EVENTS - LOOPBACK_EVENTS if allow_loopback else BLOCKED_EVENTS)
+    loopback_events = frozenset(LOOPBACK_EVENTS)
+    loopback_hosts = frozenset(LOOPBACK_HOSTS)
+    write_path_events = frozenset(WRITE_PATH_EVENTS)
+    read_path_events = frozenset(READ_PATH_EVENTS)
+    write_flags = os.O_WRONLY | os.O_RDWR | os.O_CREAT | os.O_TRUNC | os.O_APPEND
+    fsdecode, fspath, join, realpath = os.fsdecode, os.fspath, os.path.join, os.path.realpath
+    # The run shares the builtins module too
+    any, isinstance, len = builtins.any, builtins.isinstance, builtins.len
+    bytes, int, tuple = builtins.bytes, builtins.int, builtins.tuple
+    PermissionError = builtins.PermissionError
+
+    def inside(path, roots) -> bool:
+        if isinstance(path, int):
+            return path not in inherited_fds
+        if isinstance(path, bytes):
+            path = fsdecode(path)
+        path = realpath(join(workdir, fspath(path)))
+        return any(path == root or path.startswith(root.rstrip("/") + "/") for root in roots)
+
+    def loopback(event, args) -> bool:
+        if event == "socket.__new__":
+            return True
+        if event == "socket.getaddrinfo":
+            host = args[0] if args else None
+        else:
+            address = args[1] if len(args) > 1 else None
+            host = address[0] if isinstance(address, tuple) and address else None
+        if isinstance(host, bytes):
+            host = host.decode("ascii", "replace")
+        return host in loopback_hosts
+
+    def hook(event, args):
+        if event in blocked:
+            raise PermissionError(f"{event} is not allowed in the sandbox")
+        if allow_loopback and event in loopback_events and not loopback(event, args):
+            raise PermissionError(f"{event} is only allowed to this host in the sandbox")
+        if event == "open" and args and args[0] is not None:
+            mode = args[1] if len(args) > 1 else None
+            if isinstance(mode, str):
+                writing = any(flag in mode for flag in "wax+")
+            else:
+                # os.open passes flags instead of a mode string
+                flags = args[2] if len(args) > 2 and isinstance(args[2], int) else 0
+                writing = bool(flags & write_flags)
+            if not inside(args[0], writable if writing else readable):
+                raise PermissionError(f"Access to {args[0]!r} is not allowed in the sandbox")
+        elif event in write_path_events and args and not inside(args[0], writable):
+            raise PermissionError(f"{event} outside the sandbox is not allowed")
+        elif event in read_path_events and args and args[0] is not None \
+                and not inside(args[0], readable):
+            raise PermissionError(f"{event} outside the sandbox is not allowed")
+
+    return hook
+
+
+def format_error(error: BaseException) -> str:
+    """Format a traceback without the sandbox's own frames"""
+    here = os.path.abspath(__file__)
+    summary = traceback.TracebackException.from_exception(error)
+    summary.stack = traceback.StackSummary.from_list(
+        [frame for frame in summary.stack if os.path.abspath(frame.filename) != here]
+    )
+    return "".join(summary.format())
+
+
+def _unshare_network() -> None:
+    """Move the child into an empty network namespace where permitted"""
+    try:
+        import ctypes
+        libc = ctypes.CDLL(None, use_errno=True)
+        libc.unshare(CLONE_NEWNET)
+    except Exception:
+        pass
+
+
+def _apply_limits(limits, memory_base: int = 0) -> None:
+    """`memory_base` bytes of address space are allowed on top of the memory limit"""
+    cpu = int(limits["cpu_seconds"])
+    memory = memory_base + int(limits["memory_mb"]) * 1024 * 1024
+    for kind, soft, hard in (
+        (resource.RLIMIT_CPU, cpu, cpu + 1),
+        (resource.RLIMIT_AS, memory, memory),
+        (resource.RLIMIT_FSIZE, int(limits["file_bytes"]), int(limits["file_bytes"])),
+        (resource.RLIMIT_NOFILE, 64, 64),
+        (resource.RLIMIT_CORE, 0, 0),
+        (resource.RLIMIT_NPROC, 0, 0),
+    ):
+        try:
+            resource.setrlimit(kind, (soft, hard))
+        except (ValueError, OSError):
+            pass
+
+
+def _drop_privileges(limits, paths=()) -> None:
+    """
+    Switch a root process to the configured unprivileged user, handing it
+    `paths` first. Raises PermissionError rather than carry on as root.
+    """
+    if os.geteuid() == 0:
+        uid, gid = int(limits["run_as_uid"]), int(limits["run_as_gid"])
+        for path in paths:
+            os.chown(path, uid, gid)
+        os.setgroups([])
+        os.setgid(gid)
+        os.setuid(uid)
+    if os.getuid() == 0 or os.geteuid() == 0:
+        raise PermissionError("Refusing to run code as root")
+
+
+def write_result(result_fd: int, result) -> None:
+    data = json.dumps(result).encode("utf-8")
+    while data:
+        data = data[os.write(result_fd, data):]
+
+
+def _child(code: str, limits, workdir: str, result_fd: int) -> None:
+    """Runs in the forked child; never returns"""
+    exit_code = 0
+    try:
+        os.setsid()
+        os.chdir(workdir)
+        devnull = os.open(os.devnull, os.O_RDWR)
+        for fd in (0, 1, 2):
+            os.dup2(devnull, fd)
+        # Above all the worker's protocol pipes
+        close_fds_except((0, 1, 2, result_fd))
+        os.environ.clear()
+        os.environ.update({"HOME": workdir, "TMPDIR": workdir, "LANG": "C.UTF-8"})
+        # The worker already resolved (and cached) its own temp directory
+        tempfile.tempdir = workdir
+        _unshare_network()
+        _apply_limits(limits)
+        # Built before the switch: finding the readable roots may read files
+        audit_hook = make_audit_hook(workdir, inherited_fds=(0, 1, 2, result_fd))
+        try:
+            _drop_privileges(limits, (workdir,))
+        except OSError as e:
+            write_result(result_fd, {"status": "crashed", "stdout": "", "stderr": "",
+                                     "truncated": False, "error": f"Sandbox refused to run: {str(e)}"})
+            return
+
+        stdout = LimitedWriter(int(limits["output_bytes"]))
+        stderr = LimitedWriter(int(limits["output_bytes"]))
+        sys.stdin, sys.stdout, sys.stderr = io.StringIO(""), stdout, stderr
+        compiled = None
+        status, error = "ok", None
+        try:
+            compiled = compile(code, "<lesson>", "exec")
+        except SyntaxError:
+            status, error = "error", traceback.format_exc(limit=0)
+
+        sys.addaudithook(audit_hook)
+        started = time.perf_counter()
+        if compiled is not None:
+            try:
+                exec(compiled, {"__name__": "__main__", "__builtins__": __builtins__})
+            except SystemExit as e:
+                if e.code not in (None, 0):
+                    status, error = "error", f"SystemExit: {e.code}"
+            except MemoryError:
+                status, error = "memory_limit", "MemoryError: memory limit exceeded"
+            except BaseException as e:
+                status, error = "error", format_error(e)
+        elapsed = time.perf_counter() - started
+
+        write_result(result_fd, {
+            "status": status,
+            "stdout": stdout.getvalue(),
+            "stderr": stderr.getvalue(),
+            "error": error[-int(limits["output_bytes"]):] if error else None,
+            "truncated": stdout.truncated or stderr.truncated,
+            "exec_ms": round(elapsed * 1000, 2),
+        })
+    except BaseException:
+        exit_code = 70
+    finally:
+        os._exit(exit_code)
+
+
+def _status_for_signal(signum: int) -> str:
+    if signum == signal.SIGXCPU:
+        return "timeout"
+    if signum == signal.SIGXFSZ:
+        return "file_limit"
+    if signum in (signal.SIGSEGV, signal.SIGBUS, signal.SIGABRT):
+        return "crashed"
+    return "killed"
+
+
+def run_job(job) -> dict:
+    """Fork a child for one submission and collect its result"""
+    limits = {**DEFAULT_LIMITS, **(job.get("limits") or {})}
+    workdir = tempfile.mkdtemp(prefix="run-")
+    read_fd, write_fd = os.pipe()
+    started = time.monotonic()
+
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        _child(job["code"], limits, workdir, write_fd)
+    os.close(write_fd)
+
+    try:
+        return collect_child(pid, read_fd, limits, started)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def collect_child(pid: int, read_fd: int, limits, started: float, on_timeout=None) -> dict:
+    """
+    Read a forked child's JSON result from `read_fd`, killing it at the
+    wall deadline (after calling on_timeout), and reap it
+    """
+    chunks = []
+    received = 0
+    cap = 4 * int(limits["output_bytes"]) + 4096
+    timed_out = False
+    deadline = started + float(limits["wall_seconds"])
+    try:
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                timed_out = True
+                break
+            ready, _, _ = select.select([read_fd], [], [], remaining)
+            if not ready:
+                continue
+            data = os.read(read_fd, 65536)
+            if not data:
+                break
+            received += len(data)
+            if received <= cap:
+                chunks.append(data)
+    finally:
+        os.close(read_fd)
+        if timed_out:
+            try:
+                os.killpg(pid, signal.SIGKILL)
+            except OSError:
+                os.kill(pid, signal.SIGKILL)
+            if on_timeout is not None:
+                on_timeout()
+        _, wait_status = os.waitpid(pid, 0)
+
+    duration_ms = round((time.monotonic() - started) * 1000, 2)
+    empty = {"stdout": "", "stderr": "", "truncated": False, "duration_ms": duration_ms}
+    if timed_out:
+        return {**empty, "status": "timeout",
+                "error": f"Time limit of {limits['wall_seconds']}s exceeded"}
+    if os.WIFSIGNALED(wait_status):
+        signum = os.WTERMSIG(wait_status)
+        status = _status_for_signal(signum)
+        message = {
+            "timeout": f"CPU time limit of {limits['cpu_seconds']}s exceeded",
+            "file_limit": "File size limit exceeded",
+        }.get(status, f"Terminated by {signal.Signals(signum).name}")
+        return {**empty, "status": status, "error": message}
+
+    try:
+        result = json.loads(b"".join(chunks).decode("utf-8"))
+    except ValueError:
+        return {**empty, "status": "crashed", "error": "The run ended without a result"}
+    result["duration_ms"] = duration_ms
+    return result
+
+
+def main() -> None:
+    # Keep the protocol on private descriptors so stray writes to fd 0/1
+    # cannot corrupt it
+    requests = os.fdopen(os.dup(0), "rb")
+    replies = os.fdopen(os.dup(1), "wb")
+    devnull = os.open(os.devnull, os.O_RDWR)
+    os.dup2(devnull, 0)
+    os.dup2(devnull, 1)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    for module in PREIMPORTED:
+        __import__(module)
+    write_message(replies, {"ready": True, "pid": os.getpid()})
+
+    while True:
+        job = read_message(requests)
+        if job is None:
+            return
+        try:
+            result = run_job(job)
+        except Exception as e:
+            result = {"status": "crashed", "stdout": "", "stderr": "", "truncated": False,
+                      "error": f"Sandbox failure: {str(e)}"}
+        write_message(replies, {**result, "id": job.get("id")})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Admission control and result caching for lesson code runs.
+"""
+import hashlib
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+from ..cache import get_cache
+from .engines import ExecutionEngine, ExecutionRejected
+from .pool import WorkerError
+
+
+class ExecutionService:
+    """
+    Runs submissions on the first engine that accepts them. Each process
+    enforces its own caps, so with N server workers the effective limits
+    are N times these.
+    """
+    def __init__(self, max_per_user: int, max_queue: int, cache_ttl: Optional[float] = None):
+        self.max_per_user = max_per_user
+        self.max_queue = max_queue
+        self.cache_ttl = cache_ttl
+        self.engines: List[ExecutionEngine] = []
+        self._per_user: Dict[int, int] = defaultdict(int)
+        self._per_engine: Dict[str, int] = defaultdict(int)
+        self._pending = 0
+        self._started = False
+
+    def register(self, engine: ExecutionEngine) -> None:
+        self.engines.append(engine)
+        self.engines.sort(key=lambda e: -e.priority)
+        if self._started:
+            engine.start()
+
+    def start(self) -> None:
+        for engine in self.engines:
+            engine.start()
+        self._started = True
+
+    def stop(self) -> None:
+        for engine in self.engines:
+            try:
+                engine.stop()
+            except Exception as e:
+                print(f"Error stopping {engine.name} engine: {str(e)}")
+        self._started = False
+
+    def select_engine(self, code: str, language: Optional[str], name: Optional[str] = None) -> ExecutionEngine:
+        for engine in self.engines:
+            if name is not None:
+                if engine.name == name:
+                    return engine
+            elif engine.accepts(code, language):
+                return engine
+        if name is not None:
+            raise ExecutionRejected(400, f"Unknown execution engine: {name}")
+        raise ExecutionRejected(400, f"Running {language or 'this'} code is not supported")
+
+    @staticmethod
+    def cache_key(engine: ExecutionEngine, code: str) -> str:
+        digest = hashlib.sha256(f"{engine.cache_token()}\0{code}".encode()).hexdigest()
+        return f"exec:{digest}"
+
+    async def run(
+        self,
+        user_id: int,
+        code: str,
+        language: Optional[str] = None,
+        engine_name: Optional[str] = None,
+        cacheable: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Run code for a user. Only unmodified lesson samples are cacheable:
+        their output is keyed by the code's content hash, so every learner
+        after the first gets it without using a worker.
+        """
+        if not self._started:
+            raise ExecutionRejected(503, "Code execution is disabled on this server")
+        engine = self.select_engine(code, language, engine_name)
+        if engine_name is not None and not engine.learner_selectable:
+            raise ExecutionRejected(400, f"The {engine_name} engine cannot be chosen for a run")
+
+        key = self.cache_key(engine, code) if cacheable else None
+        if key is not None:
+            cached = get_cache().get(key)
+            if cached is not None:
+                return {**cached, "engine": engine.name, "cached": True}
+
+        if self._per_user[user_id] >= self.max_per_user:
+            raise ExecutionRejected(
+                429, f"At most {self.max_per_user} runs at a time; wait for one to finish",
+                retry_after=1
+            )
+        if self._pending >= self.max_queue or (
+            engine.max_pending is not None and self._per_engine[engine.name] >= engine.max_pending
+        ):
+            raise ExecutionRejected(503, "Code runner is busy; try again shortly", retry_after=5)
+
+        self._per_user[user_id] += 1
+        self._per_engine[engine.name] += 1
+        self._pending += 1
+        try:
+            result = await engine.run(code)
+        except WorkerError as e:
+            print(f"Execution worker failure on {engine.name}: {str(e)}")
+            result = {"status": "crashed", "error": "The code runner failed; please retry"}
+        finally:
+            self._pending -= 1
+            self._per_engine[engine.name] -= 1
+            self._per_user[user_id] -= 1
+            if not self._per_user[user_id]:
+                del self._per_user[user_id]
+
+        # Timeouts and crashes may be load-related; only cache clean outcomes
+        if key is not None and result.get("status") in ("ok", "error"):
+            get_cache().set(key, result, self.cache_ttl)
+        return {**result, "engine": engine.name, "cached": False}
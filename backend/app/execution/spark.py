@@ -0,0 +1,103 @@
+"""
+Spark execution engine: a warm pool of local-mode SparkSessions.
+"""
+import importlib.util
+import json
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from .engines import ExecutionEngine, ExecutionRejected
+from .pool import SandboxPool
+
+SPARK_WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "spark_worker.py")
+
+# Environment Spark needs from the host; everything else is withheld from workers
+SPARK_ENV_PASSTHROUGH = (
+    "JAVA_HOME", "SPARK_HOME", "HADOOP_HOME", "HADOOP_CONF_DIR", "SPARK_LOCAL_IP",
+    "PYSPARK_PYTHON", "TMPDIR",
+)
+
+_SPARK_CODE_RE = re.compile(r"\b(pyspark|SparkSession|SparkContext|spark\.|sc\.)")
+
+
+def spark_available() -> bool:
+    return importlib.util.find_spec("pyspark") is not None
+
+
+class SparkEngine(ExecutionEngine):
+    """
+    Claims Python code that uses Spark. The pool starts in the background
+    because JVM startup would otherwise hold up application startup; runs
+    are refused with 503 until it is ready.
+
+    Runs are forked and audited like the Python sandbox, but the JVM and
+    Spark's Python executors are reachable from lesson code and are not
+    sandboxed. Only enable the engine on a host that has nothing else to
+    protect. Learners cannot ask for it by name.
+    """
+    name = "spark"
+    languages = ("python", "py", "pyspark")
+    priority = 10
+    learner_selectable = False
+
+    def __init__(self, pool_size: int, limits: Dict[str, Any], master: str = "local[*]",
+                 driver_memory: str = "1g", max_pending: Optional[int] = None):
+        self.limits = limits
+        self.max_pending = max_pending
+        self.options = {
+            "master": master,
+            "driver_memory": driver_memory,
+            "limits": limits,
+        }
+        env = {key: os.environ[key] for key in SPARK_ENV_PASSTHROUGH if key in os.environ}
+        env.setdefault("PYSPARK_PYTHON", os.environ.get("PYSPARK_PYTHON", "python3"))
+        # Runs fork the worker; pinned threads would tie py4j connections to the parent
+        env["PYSPARK_PIN_THREAD"] = "false"
+        self.pool = SandboxPool(
+            pool_size,
+            script=SPARK_WORKER_SCRIPT,
+            ready_timeout=180,
+            args=[json.dumps(self.options)],
+            env=env,
+        )
+        self.state = "stopped"
+        self.error: Optional[str] = None
+
+    def start(self) -> None:
+        self.state = "starting"
+        threading.Thread(target=self._start_pool, name="spark-pool", daemon=True).start()
+
+    def _start_pool(self) -> None:
+        started = time.perf_counter()
+        try:
+            self.pool.start()
+        except Exception as e:
+            self.state, self.error = "failed", str(e)
+            print(f"Spark engine unavailable: {str(e)}")
+            return
+        self.state = "ready"
+        print(f"Spark engine ready with {self.pool.size} sessions "
+              f"in {time.perf_counter() - started:.1f}s")
+
+    def stop(self) -> None:
+        self.pool.stop()
+        self.state = "stopped"
+
+    def accepts(self, code: str, language: Optional[str]) -> bool:
+        # Once Spark has failed, leave the code to the plain Python engine
+        return self.state != "failed" and super().accepts(code, language) \
+            and bool(_SPARK_CODE_RE.search(code))
+
+    def cache_token(self) -> str:
+        return f"{self.name}:{self.options['master']}"
+
+    async def run(self, code: str) -> Dict[str, Any]:
+        if self.state != "ready":
+            detail = "Spark runtime is starting; try again shortly" if self.state == "starting" \
+                else "Spark runtime is unavailable"
+            raise ExecutionRejected(503, detail, retry_after=10)
+        timeout = float(self.limits["wall_seconds"]) + 15
+        return await self.pool.run({"code": code}, timeout)
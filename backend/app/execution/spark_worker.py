@@ -0,0 +1,324 @@
+"""
+Spark worker for lesson code.
+
+Started by the pool like sandbox.py (`python -I spark_worker.py OPTIONS`),
+but long-lived around a warm local-mode SparkSession so learners do not
+pay for JVM startup. Each run gets its own session via newSession(), so
+SQL conf, temporary views and UDFs are private to it; cached data and
+temp views are dropped afterwards. Runs execute under a Spark job group
+so they can be cancelled on timeout and their stages reported back.
+
+Each run executes in a child forked from the worker, as in the Python
+sandbox. The child gets its own connection to the JVM and closes every
+other inherited descriptor. It also gets the sandbox's rlimits and audit
+hook, with sockets allowed to this host only, which Spark needs to return
+results. Monkeypatches, threads and module state therefore die with the
+child. The worker is replaced when a run ends abnormally or stops the
+SparkContext.
+
+The JVM and Spark's Python executors are outside this sandbox. Code can
+reach them through py4j and closures, so the engine is off by default and
+must only be enabled on a host with nothing to protect (see SparkEngine).
+"""
+import collections
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+import uuid
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sandbox import (  # noqa: E402
+    DEFAULT_LIMITS, LimitedWriter, _apply_limits, _drop_privileges, close_fds_except, collect_child,
+    format_error, make_audit_hook, read_message, write_message, write_result
+)
+
+# Child outcomes after which the worker itself is no longer trusted
+RECYCLE_STATUSES = {"crashed", "killed"}
+
+UI_TIME_FORMAT = "%Y-%m-%dT%H:%M:%S.%f%Z"
+
+
+def create_session(options):
+    from pyspark.sql import SparkSession
+
+    builder = SparkSession.builder\
+        .master(options.get("master", "local[*]"))\
+        .appName("lesson-runner")
+    config = {
+        "spark.driver.memory": options.get("driver_memory", "1g"),
+        "spark.ui.enabled": "true",
+        "spark.ui.port": "0",
+        "spark.ui.showConsoleProgress": "false",
+        # Lesson datasets are tiny; the default 200 partitions only add overhead
+        "spark.sql.shuffle.partitions": str(options.get("shuffle_partitions", 4)),
+        "spark.default.parallelism": str(options.get("shuffle_partitions", 4)),
+    }
+    for key, value in config.items():
+        builder = builder.config(key, value)
+
+    spark = builder.getOrCreate()
+    spark.sparkContext.setLogLevel("ERROR")
+    # Warm up codegen and the task path once, before the first learner run
+    spark.range(100).selectExpr("sum(id)").collect()
+    return spark
+
+
+def _ui_get(url):
+    with urllib.request.urlopen(url, timeout=2) as response:
+        return json.loads(response.read().decode("utf-8"))
+
+
+def _ui_millis(value):
+    if not value:
+        return None
+    return datetime.strptime(value.replace("GMT", "UTC"), UI_TIME_FORMAT).timestamp() * 1000
+
+
+def stage_timings(sc, group):
+    """
+    Per-stage timings for a job group, from the Spark UI's REST API when
+    available, otherwise task counts from the status tracker
+    """
+    tracker = sc.statusTracker()
+    job_ids = sorted(tracker.getJobIdsForGroup(group))
+    if not job_ids:
+        return []
+
+    ui = sc.uiWebUrl
+    if ui:
+        base = f"{ui}/api/v1/applications/{sc.applicationId}"
+        try:
+            stages = []
+            for job_id in job_ids:
+                for stage_id in _ui_get(f"{base}/jobs/{job_id}").get("stageIds", []):
+                    for attempt in _ui_get(f"{base}/stages/{stage_id}"):
+                        submitted = _ui_millis(attempt.get("submissionTime"))
+                        completed = _ui_millis(attempt.get("completionTime"))
+                        stages.append({
+                            "job_id": job_id,
+                            "stage_id": stage_id,
+                            "name": attempt.get("name"),
+                            "status": attempt.get("status"),
+                            "num_tasks": attempt.get("numTasks"),
+                            "duration_ms": round(completed - submitted, 2)
+                            if submitted and completed else None,
+                            "executor_run_time_ms": attempt.get("executorRunTime"),
+                            "input_bytes": attempt.get("inputBytes"),
+                            "shuffle_read_bytes": attempt.get("shuffleReadBytes"),
+                            "shuffle_write_bytes": attempt.get("shuffleWriteBytes"),
+                        })
+            return stages
+        except Exception:
+            pass
+
+    stages = []
+    for job_id in job_ids:
+        job = tracker.getJobInfo(job_id)
+        for stage_id in (job.stageIds if job else []):
+            stage = tracker.getStageInfo(stage_id)
+            if stage is not None:
+                stages.append({
+                    "job_id": job_id,
+                    "stage_id": stage_id,
+                    "name": stage.name,
+                    "num_tasks": stage.numTasks,
+                    "completed_tasks": stage.numCompletedTasks,
+                    "failed_tasks": stage.numFailedTasks,
+                })
+    return stages
+
+
+def cleanup(base, session):
+    """Drop everything a run may have left in the shared SparkContext"""
+    for database in (None, "global_temp"):
+        try:
+            tables = session.catalog.listTables(database) if database else session.catalog.listTables()
+        except Exception:
+            continue
+        for table in tables:
+            if not table.isTemporary:
+                continue
+            if database:
+                session.catalog.dropGlobalTempView(table.name)
+            else:
+                session.catalog.dropTempView(table.name)
+    base.catalog.clearCache()
+
+
+def _address_space() -> int:
+    """This process's current virtual memory size in bytes"""
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def _reconnect_gateway(sc):
+    """
+    Give this (forked) process its own py4j connection so it never shares
+    a socket with the worker; returns the descriptors it uses
+    """
+    client = sc._gateway._gateway_client
+    client.deque = collections.deque()
+    if hasattr(client, "thread_connection"):
+        client.thread_connection = threading.local()
+    connection = client._get_connection()
+    client._give_back_connection(connection)
+    return [connection.socket.fileno()]
+
+
+def _child(sc, session, job, limits, group, workdir, result_fd):
+    """Runs in the forked child; never returns"""
+    from pyspark.sql import SparkSession
+
+    exit_code = 0
+    try:
+        os.setsid()
+        os.chdir(workdir)
+        gateway_fds = _reconnect_gateway(sc)
+        devnull = os.open(os.devnull, os.O_RDWR)
+        for fd in (0, 1, 2):
+            os.dup2(devnull, fd)
+        close_fds_except((0, 1, 2, result_fd, *gateway_fds))
+        os.environ.clear()
+        os.environ.update({"HOME": workdir, "TMPDIR": workdir, "LANG": "C.UTF-8"})
+        tempfile.tempdir = workdir
+        # Memory on top of what the driver already maps
+        _apply_limits(limits, memory_base=_address_space())
+        # parallelize() stages data in the SparkContext's temp directory; the
+        # hook is built before the switch since finding its roots may read files
+        audit_hook = make_audit_hook(
+            workdir,
+            inherited_fds=(0, 1, 2, result_fd, *gateway_fds),
+            extra_writable=(sc._temp_dir,),
+            allow_loopback=True
+        )
+        try:
+            # The run user also needs the SparkContext's temp directory
+            _drop_privileges(limits, (workdir, sc._temp_dir))
+        except OSError as e:
+            write_result(result_fd, {"status": "crashed", "stdout": "", "stderr": "",
+                                     "truncated": False, "error": f"Sandbox refused to run: {str(e)}"})
+            return
+
+        # getOrCreate() in lesson code should return this run's session
+        SparkSession._instantiatedSession = session
+        SparkSession._activeSession = session
+        sc.setJobGroup(group, "lesson run", interruptOnCancel=True)
+
+        stdout = LimitedWriter(int(limits["output_bytes"]))
+        stderr = LimitedWriter(int(limits["output_bytes"]))
+        sys.stdin, sys.stdout, sys.stderr = io.StringIO(""), stdout, stderr
+        compiled = None
+        status, error = "ok", None
+        try:
+            compiled = compile(job["code"], "<lesson>", "exec")
+        except SyntaxError as e:
+            status, error = "error", format_error(e)
+
+        sys.addaudithook(audit_hook)
+        if compiled is not None:
+            try:
+                exec(compiled, {"__name__": "__main__", "spark": session, "sc": sc})
+            except SystemExit as e:
+                if e.code not in (None, 0):
+                    status, error = "error", f"SystemExit: {e.code}"
+            except MemoryError:
+                status, error = "memory_limit", "MemoryError: memory limit exceeded"
+            except BaseException as e:
+                status, error = "error", format_error(e)
+
+        write_result(result_fd, {
+            "status": status,
+            "stdout": stdout.getvalue(),
+            "stderr": stderr.getvalue(),
+            "error": error[-int(limits["output_bytes"]):] if error else None,
+            "truncated": stdout.truncated or stderr.truncated,
+        })
+    except BaseException:
+        exit_code = 70
+    finally:
+        os._exit(exit_code)
+
+
+def _context_stopped(sc) -> bool:
+    try:
+        return sc._jsc.sc().isStopped()
+    except Exception:
+        return True
+
+
+def run_job(base, job, limits):
+    """Fork a child for one run, then collect stage timings and clean up"""
+    sc = base.sparkContext
+    limits = {**DEFAULT_LIMITS, **limits}
+    group = f"run-{uuid.uuid4().hex[:12]}"
+    session = base.newSession()
+    workdir = tempfile.mkdtemp(prefix="spark-run-")
+    read_fd, write_fd = os.pipe()
+    started = time.monotonic()
+
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        _child(sc, session, job, limits, group, workdir, write_fd)
+    os.close(write_fd)
+
+    try:
+        result = collect_child(pid, read_fd, limits, started,
+                               on_timeout=lambda: sc.cancelJobGroup(group))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    # The child may have stopped the SparkContext through the JVM
+    recycle = result["status"] in RECYCLE_STATUSES or _context_stopped(sc)
+    if recycle:
+        stages = []
+    else:
+        stages = stage_timings(sc, group)
+        cleanup(base, session)
+    return {**result, "stages": stages, "recycle": recycle}
+
+
+def main() -> None:
+    options = json.loads(sys.argv[1]) if len(sys.argv) > 1 else {}
+    requests = os.fdopen(os.dup(0), "rb")
+    replies = os.fdopen(os.dup(1), "wb")
+    devnull = os.open(os.devnull, os.O_RDWR)
+    os.dup2(devnull, 0)
+    # JVM and Spark logging go to stderr, never into the protocol stream
+    os.dup2(2, 1)
+
+    try:
+        spark = create_session(options)
+    except Exception as e:
+        write_message(replies, {"ready": False, "error": f"{type(e).__name__}: {str(e)}"})
+        return
+    write_message(replies, {"ready": True, "pid": os.getpid()})
+
+    limits = options.get("limits", {})
+    try:
+        while True:
+            job = read_message(requests)
+            if job is None:
+                return
+            try:
+                result = run_job(spark, job, {**limits, **(job.get("limits") or {})})
+            except Exception as e:
+                result = {"status": "crashed", "stdout": "", "stderr": "", "truncated": False,
+                          "error": f"Spark worker failure: {str(e)}", "recycle": True}
+            write_message(replies, {**result, "id": job.get("id")})
+            if result.get("recycle"):
+                return
+    finally:
+        spark.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Automated grading of exercise lessons.
+"""
+import asyncio
+from typing import Callable, List, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+
+from ..core.config import settings
+from ..database import SessionLocal
+from ..execution import ExecutionRejected, PythonEngine, execution_limits
+from ..models import Lesson
+from ..schemas import ExerciseSpec
+from ..utils.catalog_index import get_catalog_index
+from .service import GradingError, GradingService, load_exercise_spec, spec_hash
+
+_service: Optional[GradingService] = None
+
+
+def get_grading_service() -> GradingService:
+    global _service
+    if _service is None:
+        _service = GradingService(
+            PythonEngine(settings.GRADING_POOL_SIZE, {
+                **execution_limits(),
+                "cpu_seconds": settings.GRADING_CPU_SECONDS,
+                "wall_seconds": settings.GRADING_WALL_SECONDS,
+            }),
+            max_queue=settings.GRADING_MAX_QUEUE,
+            cache_ttl=settings.EXECUTION_CACHE_TTL_SECONDS,
+        )
+    return _service
+
+
+def start_grading() -> None:
+    if settings.GRADING_POOL_SIZE > 0:
+        get_grading_service().start()
+
+
+def stop_grading() -> None:
+    if _service is not None:
+        _service.stop()
+
+
+def _load_exercise_specs() -> List[Tuple[int, ExerciseSpec]]:
+    db = SessionLocal()
+    try:
+        catalog = get_catalog_index()
+        rows = [(lesson.id, lesson.interactive_elements) for lesson in catalog.lessons] \
+            if catalog is not None else db.query(Lesson.id, Lesson.interactive_elements).all()
+        specs = []
+        for lesson_id, elements in rows:
+            try:
+                spec = load_exercise_spec(elements)
+            except ValueError as e:
+                print(f"Invalid exercise on lesson {lesson_id}: {str(e)}")
+                continue
+            if spec is not None:
+                specs.append((lesson_id, spec))
+        return specs
+    finally:
+        db.close()
+
+
+async def precompute_reference_outputs() -> int:
+    """
+    Compute reference outputs for every exercise ahead of submissions;
+    versions already in the cache cost nothing
+    """
+    if _service is None or not settings.GRADING_POOL_SIZE:
+        return 0
+    count = 0
+    for lesson_id, spec in await run_in_threadpool(_load_exercise_specs):
+        try:
+            await _service.reference_values(spec)
+            count += 1
+        except (GradingError, ExecutionRejected) as e:
+            print(f"Could not precompute reference outputs for lesson {lesson_id}: {str(e)}")
+    return count
+
+
+def reference_precompute_listener(loop: asyncio.AbstractEventLoop) -> Callable[[str], None]:
+    """Catalog listener (called off the event loop) that refreshes reference outputs"""
+    def listener(version: str) -> None:
+        asyncio.run_coroutine_threadsafe(precompute_reference_outputs(), loop)
+    return listener
+
+
+__all__ = [
+    "GradingError",
+    "GradingService",
+    "get_grading_service",
+    "load_exercise_spec",
+    "precompute_reference_outputs",
+    "reference_precompute_listener",
+    "spec_hash",
+    "start_grading",
+    "stop_grading",
+]
@@ -0,0 +1,59 @@
+"""
+Builds the program run for each exercise test and reads its result.
+
+A test program is the submission, the test's setup and a final line that
+prints the test expression as JSON behind a per-grading random marker, so
+ordinary output is not mistaken for the result. The marker is not a
+security boundary. The submission runs in the same process, can read the
+marker from the program and can patch print or json, so it can forge its
+own result. Grades are feedback for the learner and nothing should trust
+them more than that.
+"""
+import json
+import math
+import secrets
+from typing import Any, Optional, Tuple
+
+from ..schemas import ExerciseTest
+
+
+def new_marker() -> str:
+    return f"@@grader-{secrets.token_hex(8)}@@"
+
+
+def build_program(code: str, test: ExerciseTest, marker: str) -> str:
+    parts = [code, ""]
+    if test.setup:
+        parts.append(test.setup)
+    parts.append(
+        "import json as _grader_json\n"
+        f"_grader_value = ({test.expression})\n"
+        f"print({marker!r} + _grader_json.dumps(_grader_value, default=repr, sort_keys=True))"
+    )
+    return "\n".join(parts)
+
+
+def read_value(stdout: str, marker: str) -> Tuple[bool, Any]:
+    """Return (found, value) for the marked result line"""
+    for line in reversed(stdout.splitlines()):
+        if line.startswith(marker):
+            try:
+                return True, json.loads(line[len(marker):])
+            except ValueError:
+                return False, None
+    return False, None
+
+
+def values_match(actual: Any, expected: Any, tolerance: Optional[float] = None) -> bool:
+    if tolerance is not None and isinstance(actual, (int, float)) and isinstance(expected, (int, float)) \
+            and not isinstance(actual, bool) and not isinstance(expected, bool):
+        return math.isclose(actual, expected, rel_tol=0, abs_tol=tolerance)
+    if isinstance(actual, list) and isinstance(expected, list):
+        return len(actual) == len(expected) and all(
+            values_match(a, e, tolerance) for a, e in zip(actual, expected)
+        )
+    if isinstance(actual, dict) and isinstance(expected, dict):
+        return actual.keys() == expected.keys() and all(
+            values_match(actual[k], expected[k], tolerance) for k in actual
+        )
+    return actual == expected
@@ -0,0 +1,178 @@
+"""
+Grades exercise submissions against their declared tests.
+"""
+import asyncio
+import hashlib
+import json
+from typing import Any, Dict, List, Optional, Set
+
+from ..cache import get_cache
+from ..execution import ExecutionEngine, ExecutionRejected, get_execution_service
+from ..execution.pool import WorkerError
+from ..schemas import ExerciseSpec, ExerciseTest
+from .harness import build_program, new_marker, read_value, values_match
+
+# Error text returned to learners is clipped to this many characters
+MAX_ERROR_CHARS = 2000
+
+
+class GradingError(Exception):
+    """The exercise itself is broken, e.g. its reference solution fails"""
+
+
+def load_exercise_spec(interactive_elements: Any) -> Optional[ExerciseSpec]:
+    """Read the exercise declared on a lesson, if any"""
+    if not isinstance(interactive_elements, dict) or not interactive_elements.get("exercise"):
+        return None
+    return ExerciseSpec.model_validate(interactive_elements["exercise"])
+
+
+def spec_hash(spec: ExerciseSpec) -> str:
+    """Identifies an exercise version: any edit to tests or reference changes it"""
+    payload = json.dumps(spec.model_dump(mode="json"), sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()[:24]
+
+
+class GradingService:
+    """
+    Tests of one submission run concurrently across the grading pool, which
+    is separate from the one behind "Run" so a deadline rush cannot starve
+    it. Reference outputs are computed once per exercise version and kept
+    in the shared cache; identical submissions reuse earlier results.
+    """
+    def __init__(self, engine: ExecutionEngine, max_queue: int, cache_ttl: Optional[float] = None):
+        self.engine = engine
+        self.max_queue = max_queue
+        self.cache_ttl = cache_ttl
+        self._busy_users: Set[int] = set()
+        self._pending = 0
+        self._reference_locks: Dict[str, asyncio.Lock] = {}
+        self._started = False
+
+    def start(self) -> None:
+        self.engine.start()
+        self._started = True
+
+    def stop(self) -> None:
+        self.engine.stop()
+        self._started = False
+
+    def engine_for(self, spec: ExerciseSpec) -> ExecutionEngine:
+        if spec.engine and spec.engine != self.engine.name:
+            return get_execution_service().select_engine("", None, spec.engine)
+        return self.engine
+
+    async def _run(self, engine: ExecutionEngine, code: str, test: ExerciseTest) -> Dict[str, Any]:
+        marker = new_marker()
+        try:
+            result = await engine.run(build_program(code, test, marker))
+        except WorkerError as e:
+            print(f"Grading worker failure: {str(e)}")
+            result = {"status": "crashed", "error": "The grader failed; please resubmit"}
+        found, value = read_value(result.get("stdout") or "", marker)
+        return {**result, "found": found, "value": value}
+
+    async def reference_values(self, spec: ExerciseSpec) -> List[Any]:
+        """
+        Expected value per test: declared in the spec, or produced by the
+        reference solution and cached for this exercise version
+        """
+        if all(test.expected is not None for test in spec.tests):
+            return [test.expected for test in spec.tests]
+
+        key = f"grading:ref:{spec_hash(spec)}"
+        cached = get_cache().get(key)
+        if cached is not None:
+            return cached
+
+        lock = self._reference_locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            cached = get_cache().get(key)
+            if cached is not None:
+                return cached
+            if not spec.reference_solution:
+                raise GradingError("Exercise tests without 'expected' need a reference solution")
+
+            engine = self.engine_for(spec)
+            pending = [test for test in spec.tests if test.expected is None]
+            runs = await asyncio.gather(*(
+                self._run(engine, spec.reference_solution, test) for test in pending
+            ))
+            by_name = {}
+            for test, run in zip(pending, runs):
+                if not run["found"]:
+                    raise GradingError(
+                        f"Reference solution failed on test '{test.name}': "
+                        f"{run.get('error') or run.get('status')}"
+                    )
+                by_name[test.name] = run["value"]
+
+            values = [
+                test.expected if test.expected is not None else by_name[test.name]
+                for test in spec.tests
+            ]
+            get_cache().set(key, values, self.cache_ttl)
+            return values
+
+    async def grade(self, user_id: int, spec: ExerciseSpec, code: str) -> Dict[str, Any]:
+        if not self._started:
+            raise ExecutionRejected(503, "Grading is disabled on this server")
+        if user_id in self._busy_users:
+            raise ExecutionRejected(429, "Your previous submission is still being graded", retry_after=2)
+        if self._pending >= self.max_queue:
+            raise ExecutionRejected(503, "The grader is busy; try again shortly", retry_after=5)
+
+        result_key = "grading:result:{}:{}".format(
+            spec_hash(spec), hashlib.sha256(code.encode()).hexdigest()
+        )
+        cached = get_cache().get(result_key)
+        if cached is not None:
+            return {**cached, "cached": True}
+
+        self._busy_users.add(user_id)
+        self._pending += 1
+        try:
+            expected_values = await self.reference_values(spec)
+            engine = self.engine_for(spec)
+            runs = await asyncio.gather(*(self._run(engine, code, test) for test in spec.tests))
+        finally:
+            self._pending -= 1
+            self._busy_users.discard(user_id)
+
+        tests = [
+            self._test_result(test, run, expected)
+            for test, run, expected in zip(spec.tests, runs, expected_values)
+        ]
+        passed_count = sum(1 for test in tests if test["passed"])
+        result = {
+            "passed": passed_count == len(tests),
+            "score": round(passed_count / len(tests), 4),
+            "tests": tests,
+            "cached": False,
+        }
+        # Infrastructure failures are not the learner's fault; do not cache them
+        if all(test["status"] not in ("crashed", "killed") for test in tests):
+            get_cache().set(result_key, result, self.cache_ttl)
+        return result
+
+    @staticmethod
+    def _test_result(test: ExerciseTest, run: Dict[str, Any], expected: Any) -> Dict[str, Any]:
+        error = None
+        if run["found"]:
+            passed = values_match(run["value"], expected, test.tolerance)
+            status = "passed" if passed else "failed"
+        else:
+            passed = False
+            status = run.get("status") if run.get("status") != "ok" else "error"
+            error = run.get("error") or "The test expression produced no result"
+            error = error[-MAX_ERROR_CHARS:]
+
+        return {
+            "name": test.name,
+            "passed": passed,
+            "status": status,
+            "expected": None if test.hidden else expected,
+            "actual": None if test.hidden or not run["found"] else run["value"],
+            "error": error,
+            "duration_ms": run.get("duration_ms", 0),
+        }
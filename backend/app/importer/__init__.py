@@ -0,0 +1,8 @@
+"""
+Catalog import pipeline: load courses, lessons and resources from a content
+directory, validate them against the schemas and apply only the differences.
+"""
+from .apply import import_catalog
+from .loader import CatalogImportError, load_catalog
+
+__all__ = ["CatalogImportError", "import_catalog", "load_catalog"]
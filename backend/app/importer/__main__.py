@@ -0,0 +1,59 @@
+"""
+Import the content directory into the database.
+
+    python -m app.importer content [--prune] [--dry-run] [--publish]
+"""
+import argparse
+import sys
+
+from ..database import SessionLocal
+from ..publishing import publish
+from . import CatalogImportError, import_catalog, load_catalog
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Import catalog content into the database")
+    parser.add_argument("root", nargs="?", default="content", help="content directory (default: content)")
+    parser.add_argument("--prune", action="store_true", help="delete slugged rows missing from the source")
+    parser.add_argument("--dry-run", action="store_true", help="compute and report changes, then roll back")
+    parser.add_argument("--publish", action="store_true", help="publish the catalog after importing")
+    args = parser.parse_args(argv)
+
+    try:
+        courses = load_catalog(args.root)
+    except CatalogImportError as e:
+        print("Content validation failed:")
+        for error in e.errors:
+            print(f"  - {error}")
+        return 1
+
+    print(f"Loaded {len(courses)} courses, "
+          f"{sum(len(c.lessons) for c in courses)} lessons from {args.root}")
+
+    db = SessionLocal()
+    try:
+        report = import_catalog(db, courses, prune=args.prune, dry_run=args.dry_run)
+        published = publish(db, note=f"import {args.root}") if args.publish and not args.dry_run else None
+    except CatalogImportError as e:
+        print("Content validation failed:")
+        for error in e.errors:
+            print(f"  - {error}")
+        return 1
+    except Exception as e:
+        print(f"Error importing catalog: {str(e)}")
+        return 1
+    finally:
+        db.close()
+
+    for kind, counts in report.items():
+        print(f"{kind}: " + ", ".join(f"{k}={v}" for k, v in counts.items()))
+    if args.dry_run:
+        print("Dry run: no changes were committed")
+    elif published is not None:
+        print(f"Published {published['version']}" if published["created"]
+              else f"Nothing to publish: {published['version']} is current")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,330 @@
+"""
+Diff-and-apply stage of catalog imports.
+
+The source catalog is compared against the database by slug and only the
+differences are written, using set-based insert/update statements inside
+a single transaction. Rows are never deleted wholesale, so lesson ids and
+the progress rows that reference them survive a reload. Every written row
+is recorded in the catalog change log for delta sync, and changed lesson
+bodies are rendered to HTML before the transaction commits.
+"""
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.orm import Session
+
+from ..models import Course, Lesson, Resource, UserProgress, lesson_prerequisites
+from ..rendering import render_lessons
+from ..schemas import CourseImport
+from ..storage import store_resource_file, store_resource_text
+from ..utils.ordering import key_for_order
+from ..utils.sync import record_catalog_changes
+from .loader import CatalogImportError, slugify
+
+COURSE_FIELDS = (
+    "title", "description", "order", "is_premium", "category", "tags",
+    "prerequisites", "target_audience", "learning_outcomes",
+)
+
+LESSON_FIELDS = (
+    "title", "description", "summary", "content", "content_sections",
+    "code_samples", "key_points", "order", "difficulty", "lesson_type",
+    "content_format", "estimated_time", "skill_level_required",
+    "learning_objectives", "is_premium", "sort_key",
+)
+
+RESOURCE_FIELDS = (
+    "title", "type", "content", "description", "blob_hash", "size", "media_type", "filename",
+)
+
+CHANGE_ENTITIES = {Course: "course", Lesson: "lesson", Resource: "resource"}
+
+
+def _new_report() -> Dict[str, Dict[str, int]]:
+    return {
+        kind: {"created": 0, "updated": 0, "unchanged": 0, "deleted": 0}
+        for kind in ("courses", "lessons", "resources", "prerequisites")
+    }
+
+
+def _sync_table(
+    db: Session,
+    model,
+    fields: Tuple[str, ...],
+    desired: Dict[str, Dict[str, Any]],
+    scope=None,
+    report: Optional[Dict[str, int]] = None,
+    now: Optional[datetime] = None
+) -> Dict[str, int]:
+    """
+    Bring `model` in line with `desired` (slug -> column values) and return
+    slug -> id for every desired row. Existing rows without a slug are
+    adopted by title so catalogs created before slugs existed keep their ids.
+    """
+    columns = [model.id, model.slug, *(getattr(model, f) for f in fields)]
+    query = select(*columns)
+    if scope is not None:
+        query = query.where(scope)
+    existing_rows = db.execute(query).mappings().all()
+
+    if scope is not None:
+        # A slug owned by a row outside the import would hit the unique index
+        in_scope = {row["id"] for row in existing_rows}
+        clashes = sorted(
+            slug for slug, id in db.execute(select(model.slug, model.id).where(model.slug.in_(list(desired))))
+            if id not in in_scope
+        )
+        if clashes:
+            raise CatalogImportError([
+                f"{CHANGE_ENTITIES[model]} slug already used outside this import: {slug}" for slug in clashes
+            ])
+
+    by_slug = {row["slug"]: row for row in existing_rows if row["slug"]}
+    by_title = {}
+    for row in existing_rows:
+        if not row["slug"]:
+            by_title.setdefault(row["title"], row)
+
+    inserts: List[Dict[str, Any]] = []
+    updates: List[Dict[str, Any]] = []
+    for slug, values in desired.items():
+        row = by_slug.get(slug) or by_title.pop(values["title"], None)
+        if row is None:
+            inserts.append({"slug": slug, **values, "created_at": now, "updated_at": now})
+            continue
+
+        changed = {
+            key: value for key, value in values.items()
+            if row[key] != value
+        }
+        if row["slug"] != slug:
+            changed["slug"] = slug
+        if changed:
+            updates.append({"id": row["id"], **changed, "updated_at": now})
+        elif report is not None:
+            report["unchanged"] += 1
+
+    if inserts:
+        db.execute(insert(model), inserts)
+    # Group by key set: executemany needs uniform parameter sets
+    by_keys: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+    for params in updates:
+        by_keys.setdefault(tuple(sorted(params)), []).append(params)
+    for batch in by_keys.values():
+        db.execute(update(model), batch)
+
+    if report is not None:
+        report["created"] += len(inserts)
+        report["updated"] += len(updates)
+
+    ids = dict(db.execute(
+        select(model.slug, model.id).where(model.slug.in_(list(desired)))
+    ).all())
+    record_catalog_changes(
+        db, CHANGE_ENTITIES[model],
+        [ids[params["slug"]] for params in inserts] + [params["id"] for params in updates],
+        now=now
+    )
+    return ids
+
+
+def import_catalog(
+    db: Session,
+    courses: Iterable[CourseImport],
+    prune: bool = False,
+    dry_run: bool = False
+) -> Dict[str, Dict[str, int]]:
+    """
+    Apply a validated source catalog in one transaction and return counts
+    of created/updated/unchanged/deleted rows per entity.
+
+    With prune=True, slugged lessons and resources missing from the source
+    are removed, except lessons that still have learner progress. A slug
+    already used by a lesson or resource outside the imported courses is
+    reported as a CatalogImportError.
+    """
+    courses = list(courses)
+    report = _new_report()
+    now = datetime.utcnow()
+
+    try:
+        course_values = {
+            course.slug: course.model_dump(include=set(COURSE_FIELDS), mode="python")
+            for course in courses
+        }
+        course_ids = _sync_table(db, Course, COURSE_FIELDS, course_values,
+                                 report=report["courses"], now=now)
+
+        lesson_values: Dict[str, Dict[str, Any]] = {}
+        resource_values: Dict[str, Dict[str, Any]] = {}
+        prerequisite_slugs: Dict[str, List[str]] = {}
+        for course in courses:
+            for lesson in course.lessons:
+                values = lesson.model_dump(include=set(LESSON_FIELDS), mode="python")
+                # The authored order is the source of truth: it resets admin moves
+                values["sort_key"] = key_for_order(lesson.order)
+                values["course_id"] = course_ids[course.slug]
+                lesson_values[lesson.slug] = values
+                prerequisite_slugs[lesson.slug] = lesson.prerequisites
+                for resource in lesson.resources:
+                    slug = resource.slug or f"{lesson.slug}/{slugify(resource.title)}"
+                    # Files go to the blob store (even on dry runs; `python -m app.storage gc`
+                    # removes unreferenced blobs); only metadata is compared and stored
+                    stored = store_resource_file(Path(resource.file)) if resource.file \
+                        else store_resource_text(resource.content)
+                    resource_values[slug] = {
+                        **resource.model_dump(include={"title", "type", "description"}),
+                        **stored,
+                        "lesson_slug": lesson.slug,
+                    }
+
+        lesson_ids = _sync_table(
+            db, Lesson, LESSON_FIELDS + ("course_id",), lesson_values,
+            scope=Lesson.course_id.in_(list(course_ids.values())),
+            report=report["lessons"], now=now
+        ) if lesson_values else {}
+
+        for values in resource_values.values():
+            values["lesson_id"] = lesson_ids[values.pop("lesson_slug")]
+        resource_ids = _sync_table(
+            db, Resource, RESOURCE_FIELDS + ("lesson_id",), resource_values,
+            scope=Resource.lesson_id.in_(list(lesson_ids.values())),
+            report=report["resources"], now=now
+        ) if resource_values else {}
+
+        _sync_prerequisites(db, lesson_ids, prerequisite_slugs, report["prerequisites"], now)
+
+        if prune:
+            _prune(db, Resource, resource_ids, report["resources"], now)
+            _prune_lessons(db, lesson_ids, report["lessons"], now)
+            # Courses go only once no lesson references them
+            _prune(db, Course, course_ids, report["courses"], now,
+                   ~select(Lesson.id).where(Lesson.course_id == Course.id).exists())
+
+        if dry_run:
+            db.rollback()
+            return report
+
+        render_lessons(db, list(lesson_ids.values()))
+        db.commit()
+        return report
+
+    except Exception:
+        db.rollback()
+        raise
+
+
+def _sync_prerequisites(
+    db: Session,
+    lesson_ids: Dict[str, int],
+    prerequisite_slugs: Dict[str, List[str]],
+    report: Dict[str, int],
+    now: Optional[datetime] = None
+) -> None:
+    known_ids = dict(lesson_ids)
+    missing = {p for prereqs in prerequisite_slugs.values() for p in prereqs} - set(known_ids)
+    if missing:
+        known_ids.update(db.execute(
+            select(Lesson.slug, Lesson.id).where(Lesson.slug.in_(missing))
+        ).all())
+    unknown = missing - set(known_ids)
+    if unknown:
+        raise ValueError(f"Unknown prerequisite lesson slugs: {sorted(unknown)}")
+
+    desired = {
+        (known_ids[slug], known_ids[prereq])
+        for slug, prereqs in prerequisite_slugs.items()
+        for prereq in prereqs
+    }
+    table = lesson_prerequisites
+    existing = set(db.execute(
+        select(table.c.lesson_id, table.c.prerequisite_id)
+        .where(table.c.lesson_id.in_(list(lesson_ids.values())))
+    ).all())
+
+    to_add = desired - existing
+    to_remove = existing - desired
+    if to_add:
+        db.execute(insert(table), [
+            {"lesson_id": lesson_id, "prerequisite_id": prereq_id}
+            for lesson_id, prereq_id in to_add
+        ])
+    for lesson_id, prereq_id in to_remove:
+        db.execute(delete(table).where(
+            table.c.lesson_id == lesson_id,
+            table.c.prerequisite_id == prereq_id
+        ))
+
+    report["created"] += len(to_add)
+    report["deleted"] += len(to_remove)
+    report["unchanged"] += len(desired & existing)
+    # Prerequisites are part of the synced lesson
+    record_catalog_changes(db, "lesson", sorted({lesson_id for lesson_id, _ in to_add | to_remove}), now=now)
+
+
+def _prune(
+    db: Session,
+    model,
+    keep_ids: Dict[str, int],
+    report: Dict[str, int],
+    now: Optional[datetime] = None,
+    *criteria
+) -> None:
+    """
+    Delete slugged rows that are no longer present in the source
+    """
+    stale = db.execute(
+        select(model.id).where(
+            model.slug.isnot(None),
+            model.id.notin_(list(keep_ids.values())),
+            *criteria
+        )
+    ).scalars().all()
+
+    if stale:
+        db.execute(delete(model).where(model.id.in_(stale)))
+        record_catalog_changes(db, CHANGE_ENTITIES[model], stale, op="delete", now=now)
+    report["deleted"] += len(stale)
+
+
+def _prune_lessons(
+    db: Session,
+    keep_ids: Dict[str, int],
+    report: Dict[str, int],
+    now: Optional[datetime] = None
+) -> None:
+    stale = db.execute(
+        select(Lesson.id).where(
+            Lesson.slug.isnot(None),
+            Lesson.id.notin_(list(keep_ids.values()))
+        )
+    ).scalars().all()
+    if not stale:
+        return
+
+    with_progress = set(db.execute(
+        select(UserProgress.lesson_id).where(UserProgress.lesson_id.in_(stale)).distinct()
+    ).scalars().all())
+    if with_progress:
+        print(f"Keeping lessons with learner progress: {sorted(with_progress)}")
+
+    removable = [lesson_id for lesson_id in stale if lesson_id not in with_progress]
+    if removable:
+        table = lesson_prerequisites
+        dependents = set(db.execute(
+            select(table.c.lesson_id).where(table.c.prerequisite_id.in_(removable))
+        ).scalars().all()) - set(removable)
+        resources = db.execute(
+            select(Resource.id).where(Resource.lesson_id.in_(removable))
+        ).scalars().all()
+        db.execute(delete(table).where(
+            table.c.lesson_id.in_(removable) | table.c.prerequisite_id.in_(removable)
+        ))
+        db.execute(delete(Resource).where(Resource.lesson_id.in_(removable)))
+        db.execute(delete(Lesson).where(Lesson.id.in_(removable)))
+        record_catalog_changes(db, "resource", resources, op="delete", now=now)
+        record_catalog_changes(db, "lesson", removable, op="delete", now=now)
+        record_catalog_changes(db, "lesson", sorted(dependents), now=now)
+    report["deleted"] += len(removable)
@@ -0,0 +1,189 @@
+"""
+Content directory loader for catalog imports.
+
+Layout, relative to the content root:
+
+    courses/<course>/course.yaml         course fields (also .yml or .json)
+    courses/<course>/lessons/*.md        lesson body with YAML front matter
+    courses/<course>/lessons/*.yaml      lesson fields (also .yml or .json)
+
+Slugs default to the directory name for courses, to
+"<course>/<file name without numeric prefix>" for lessons, so renumbering
+a file does not turn it into a new lesson, and to "<lesson>/<title>" for
+resources, wherever they are declared.
+"""
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, List
+
+from pydantic import ValidationError
+
+from ..schemas import CourseImport
+
+COURSE_FILES = ("course.yaml", "course.yml", "course.json")
+LESSON_SUFFIXES = (".md", ".yaml", ".yml", ".json")
+
+_NUMERIC_PREFIX_RE = re.compile(r"^(\d+)[_\-\s]+")
+
+
+class CatalogImportError(Exception):
+    """Raised when the content directory cannot be loaded or validated"""
+    def __init__(self, errors: List[str]):
+        self.errors = errors
+        super().__init__("\n".join(errors))
+
+
+def slugify(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
+
+
+def _load_yaml(text: str) -> Any:
+    try:
+        import yaml
+    except ImportError:
+        raise CatalogImportError(["PyYAML is required to import YAML content (pip install PyYAML)"])
+    return yaml.safe_load(text)
+
+
+def _read_mapping(path: Path) -> Dict[str, Any]:
+    text = path.read_text(encoding="utf-8")
+    data = json.loads(text) if path.suffix == ".json" else _load_yaml(text)
+    if not isinstance(data, dict):
+        raise ValueError("expected a mapping at the top level")
+    return data
+
+
+def _read_markdown(path: Path) -> Dict[str, Any]:
+    """
+    Split a Markdown lesson into front matter fields and body content.
+    A leading "# Title" line before the front matter is tolerated.
+    """
+    lines = path.read_text(encoding="utf-8").splitlines()
+    start = 0
+    while start < len(lines) and (not lines[start].strip() or lines[start].startswith("# ")):
+        start += 1
+
+    if start >= len(lines) or lines[start].strip() != "---":
+        raise ValueError("missing YAML front matter")
+
+    try:
+        end = lines.index("---", start + 1)
+    except ValueError:
+        raise ValueError("unterminated YAML front matter")
+
+    data = _load_yaml("\n".join(lines[start + 1:end])) or {}
+    if not isinstance(data, dict):
+        raise ValueError("front matter must be a mapping")
+    data.setdefault("content", "\n".join(lines[end + 1:]).strip())
+    return data
+
+
+def _load_lesson(path: Path, course_slug: str) -> Dict[str, Any]:
+    data = _read_markdown(path) if path.suffix == ".md" else _read_mapping(path)
+
+    stem_match = _NUMERIC_PREFIX_RE.match(path.stem)
+    stem = path.stem[stem_match.end():] if stem_match else path.stem
+    data.setdefault("slug", f"{course_slug}/{slugify(stem)}")
+    if stem_match:
+        data.setdefault("order", int(stem_match.group(1)))
+
+    _default_resource_slugs(data)
+    _resolve_resource_files(data, path.parent)
+    return data
+
+
+def _default_resource_slugs(lesson: Dict[str, Any]) -> None:
+    if not lesson.get("slug"):
+        return
+    for resource in lesson.get("resources") or []:
+        if isinstance(resource, dict) and resource.get("title"):
+            resource.setdefault("slug", f"{lesson['slug']}/{slugify(resource['title'])}")
+
+
+def _resolve_resource_files(lesson: Dict[str, Any], base_dir: Path) -> None:
+    """Make resource file paths absolute, relative to the file that declares them"""
+    for resource in lesson.get("resources") or []:
+        if not isinstance(resource, dict) or not resource.get("file"):
+            continue
+        path = (base_dir / resource["file"]).resolve()
+        if not path.is_file():
+            raise ValueError(f"resource file not found: {resource['file']}")
+        resource["file"] = str(path)
+
+
+def load_catalog(root: Path) -> List[CourseImport]:
+    """
+    Read and validate every course under `root`, collecting all errors
+    before raising so authors can fix a whole directory in one pass
+    """
+    courses_dir = Path(root) / "courses"
+    if not courses_dir.is_dir():
+        raise CatalogImportError([f"{courses_dir}: not a directory"])
+
+    errors: List[str] = []
+    courses: List[CourseImport] = []
+
+    for course_dir in sorted(p for p in courses_dir.iterdir() if p.is_dir()):
+        course_file = next((course_dir / n for n in COURSE_FILES if (course_dir / n).exists()), None)
+        if course_file is None:
+            errors.append(f"{course_dir}: missing {' / '.join(COURSE_FILES)}")
+            continue
+
+        try:
+            course_data = _read_mapping(course_file)
+        except (ValueError, OSError) as e:
+            errors.append(f"{course_file}: {str(e)}")
+            continue
+        course_data.setdefault("slug", slugify(course_dir.name))
+        try:
+            for lesson in course_data.get("lessons") or []:
+                if isinstance(lesson, dict):
+                    _default_resource_slugs(lesson)
+                    _resolve_resource_files(lesson, course_dir)
+        except ValueError as e:
+            errors.append(f"{course_file}: {str(e)}")
+            continue
+
+        lessons = []
+        lessons_dir = course_dir / "lessons"
+        if lessons_dir.is_dir():
+            for path in sorted(lessons_dir.iterdir()):
+                if path.suffix not in LESSON_SUFFIXES:
+                    continue
+                try:
+                    lessons.append(_load_lesson(path, course_data["slug"]))
+                except (ValueError, OSError) as e:
+                    errors.append(f"{path}: {str(e)}")
+        course_data["lessons"] = course_data.get("lessons", []) + lessons
+
+        try:
+            courses.append(CourseImport.model_validate(course_data))
+        except ValidationError as e:
+            for error in e.errors():
+                location = ".".join(str(part) for part in error["loc"])
+                errors.append(f"{course_dir}: {location}: {error['msg']}")
+
+    errors.extend(check_unique_slugs(courses))
+    if errors:
+        raise CatalogImportError(errors)
+    return courses
+
+
+def check_unique_slugs(courses: List[CourseImport]) -> List[str]:
+    """
+    Report slugs used more than once across the whole import
+    """
+    errors = []
+    seen = set()
+    for kind, slug in (
+        [("course", c.slug) for c in courses]
+        + [("lesson", l.slug) for c in courses for l in c.lessons]
+        + [("resource", r.slug) for c in courses for l in c.lessons for r in l.resources]
+    ):
+        if slug is None:
+            continue
+        if (kind, slug) in seen:
+            errors.append(f"duplicate {kind} slug: {slug}")
+        seen.add((kind, slug))
+    return errors
@@ -1,28 +1,101 @@
 # backend/app/main.py
-from fastapi import FastAPI, Depends, HTTPException, Request
+from fastapi import FastAPI, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy import tuple_
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Dict, List, Optional
+from contextlib import asynccontextmanager
+import asyncio
 import traceback
 from datetime import datetime
 
 # Import models, schemas, and dependencies
 from . import models, schemas
-from .database import engine, get_db
+from .database import engine, get_db, preconnect_pool
 from .core.config import settings
+from .core.catalog_pin import CatalogPinMiddleware
+from .core.compression import CompressionMiddleware
+from .core.startup import StartupReport
 from .auth.oauth_routes import router as oauth_router
 from .auth.validation import router as validation_router
-from .auth.dependencies import get_current_user, get_optional_current_user
+from .auth.dependencies import get_access_tier, get_current_user, get_optional_current_user
+from .cache import cached_catalog_response, catalog_key, evict_previous_catalog, get_singleflight
+from .execution import start_execution, stop_execution
+from .grading import (
+    precompute_reference_outputs, reference_precompute_listener, start_grading, stop_grading
+)
+from .routes.admin import router as admin_router
+from .routes.courses import router as courses_router
+from .routes.execution import router as execution_router
+from .routes.export import router as export_router
+from .routes.events import router as events_router
+from .routes.grading import router as grading_router
+from .routes.resources import router as resources_router
+from .routes.sync import router as sync_router
+from .routes.suggest import router as suggest_router
+from .utils.catalog import (
+    current_catalog_version, on_catalog_change, parse_published_version, refresh_catalog_version,
+    watch_catalog_version
+)
+from .utils.catalog_index import get_catalog_index, rebuild_catalog_index
+from .utils.entitlements import get_entitlements, lesson_locked, rebuild_entitlements, redact_lessons
+from .utils.pagination import paginate, paginate_sorted, next_cursor
+from .utils.navigation import get_navigation_index, rebuild_navigation_index
 from .utils.progress import ProgressTracker
+from .rendering import get_rendered_lesson, highlight_css
+from .snapshot import SnapshotMiddleware
+from .utils.suggest import rebuild_suggest_index
 
 # Import necessary types
 from .models import User, Lesson, Course
 
-# Create database tables
-models.Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm up in explicit, timed phases before accepting traffic
+    report = StartupReport()
+    await run_in_threadpool(report.run, "pool pre-connect", preconnect_pool, settings.DB_POOL_PRECONNECT)
+    version = await run_in_threadpool(report.run, "catalog version", refresh_catalog_version)
+    # The catalog index first: the others are built from it
+    await run_in_threadpool(report.run, "catalog index", rebuild_catalog_index, version)
+    await run_in_threadpool(report.run, "cache prefill", rebuild_suggest_index, version)
+    await run_in_threadpool(report.run, "navigation index", rebuild_navigation_index, version)
+    await run_in_threadpool(report.run, "entitlements", rebuild_entitlements, version)
+    await run_in_threadpool(report.run, "execution pool", start_execution)
+    await run_in_threadpool(report.run, "grading pool", start_grading)
+    app.state.startup_report = report
+
+    # Rebuild in-memory catalog indexes whenever the catalog changes
+    on_catalog_change(rebuild_catalog_index)
+    on_catalog_change(rebuild_suggest_index)
+    on_catalog_change(rebuild_navigation_index)
+    on_catalog_change(rebuild_entitlements)
+    on_catalog_change(evict_previous_catalog)
+    evict_previous_catalog(version)
+    on_catalog_change(reference_precompute_listener(asyncio.get_running_loop()))
+    # Reference outputs are computed in the background; the first submission
+    # to an exercise waits for them only if this has not finished yet
+    reference_warmup = asyncio.create_task(precompute_reference_outputs())
 
-app = FastAPI(title="Spark Tutorial API")
+    watcher = asyncio.create_task(
+        watch_catalog_version(settings.CATALOG_VERSION_POLL_SECONDS)
+    )
+    try:
+        yield
+    finally:
+        # In-flight requests have drained by now; release pooled connections
+        watcher.cancel()
+        reference_warmup.cancel()
+        await run_in_threadpool(stop_grading)
+        await run_in_threadpool(stop_execution)
+        await run_in_threadpool(engine.dispose)
+
+app = FastAPI(title="Spark Tutorial API", lifespan=lifespan)
 
+# Innermost, so snapshot responses still get CORS headers (SNAPSHOT_SERVE)
+app.add_middleware(SnapshotMiddleware)
+# Outside the snapshot lookup, so it uses the version the request is pinned to
+app.add_middleware(CatalogPinMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000"],
@@ -30,10 +103,20 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(CompressionMiddleware)
 
 # Include routers
 app.include_router(oauth_router)
 app.include_router(validation_router)
+app.include_router(suggest_router)
+app.include_router(export_router)
+app.include_router(execution_router)
+app.include_router(grading_router)
+app.include_router(events_router)
+app.include_router(sync_router)
+app.include_router(resources_router)
+app.include_router(courses_router)
+app.include_router(admin_router)
 
 # Add a health check endpoint
 @app.get("/")
@@ -44,42 +127,71 @@ async def health_check():
     }
 
 # Course endpoints
+def _load_courses(db: Session, skip: int, limit: int, cursor: Optional[str]) -> dict:
+    # Served from the in-memory catalog once it is built for this version
+    index = get_catalog_index()
+    if index is not None:
+        courses = paginate_sorted(index.courses, limit, cursor, skip)
+        return {
+            "courses": [course.to_dict() for course in courses],
+            "next_cursor": next_cursor(courses, limit)
+        }
+    
+    print("Querying database...")
+    
+    # Get courses with explicit columns
+    courses = paginate(
+        db.query(
+            models.Course.id,
+            models.Course.title,
+            models.Course.description,
+            models.Course.order,
+            models.Course.is_premium
+        ),
+        models.Course.order,
+        models.Course.id,
+        limit=limit,
+        cursor=cursor,
+        skip=skip
+    ).all()
+    
+    print(f"Found {len(courses) if courses else 0} courses")
+    
+    # Convert to list of dictionaries
+    courses_data = [
+        {
+            "id": course.id,
+            "title": course.title,
+            "description": course.description,
+            "order": course.order,
+            "is_premium": course.is_premium,
+        }
+        for course in courses
+    ]
+    
+    return {
+        "courses": courses_data,
+        "next_cursor": next_cursor(courses, limit)
+    }
+
 @app.get("/courses")
 def get_courses(
+    request: Request,
     skip: int = 0, 
     limit: int = 100, 
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
     try:
         print("\n=== Fetching Courses ===")
-        print("Querying database...")
-        
-        # Get courses with explicit columns
-        courses = db.query(
-            models.Course.id,
-            models.Course.title,
-            models.Course.description,
-            models.Course.order,
-            models.Course.is_premium
-        ).order_by(models.Course.order).offset(skip).limit(limit).all()
-        
-        print(f"Found {len(courses) if courses else 0} courses")
-        
-        # Convert to list of dictionaries
-        courses_data = [
-            {
-                "id": course.id,
-                "title": course.title,
-                "description": course.description,
-                "order": course.order,
-                "is_premium": course.is_premium,
-            }
-            for course in courses
-        ]
-        
-        print("Courses data:", courses_data)
+        return cached_catalog_response(
+            request,
+            catalog_key("courses", skip, limit, cursor),
+            lambda: _load_courses(db, skip, limit, cursor)
+        )
         
-        return {"courses": courses_data}
+    except HTTPException:
+        raise
         
     except Exception as e:
         print("\n=== Error in /courses endpoint ===")
@@ -96,31 +208,45 @@ def get_courses(
             }
         )
 
-@app.get("/courses/{course_id}")
-def get_course(course_id: int, db: Session = Depends(get_db)):
-    try:
-        print(f"\nFetching course with ID: {course_id}")
-        course = db.query(models.Course)\
-            .filter(models.Course.id == course_id)\
-            .first()
-            
-        if course is None:
-            print(f"Course {course_id} not found")
+def _load_course(db: Session, course_id: int) -> dict:
+    index = get_catalog_index()
+    if index is not None:
+        record = index.course(course_id)
+        if record is None:
             raise HTTPException(status_code=404, detail="Course not found")
-            
-        print(f"Found course: {course.title}")
+        return record.to_dict()
+    
+    course = db.query(models.Course)\
+        .filter(models.Course.id == course_id)\
+        .first()
         
-        # Convert to dict for consistency
-        course_data = {
-            "id": course.id,
-            "title": course.title,
-            "description": course.description,
-            "order": course.order,
-            "is_premium": course.is_premium
-        }
+    if course is None:
+        print(f"Course {course_id} not found")
+        raise HTTPException(status_code=404, detail="Course not found")
         
-        return course_data
+    print(f"Found course: {course.title}")
+    
+    # Convert to dict for consistency
+    return {
+        "id": course.id,
+        "title": course.title,
+        "description": course.description,
+        "order": course.order,
+        "is_premium": course.is_premium
+    }
+
+@app.get("/courses/{course_id}")
+def get_course(course_id: int, request: Request, db: Session = Depends(get_db)):
+    try:
+        print(f"\nFetching course with ID: {course_id}")
+        return cached_catalog_response(
+            request,
+            catalog_key("course", course_id),
+            lambda: _load_course(db, course_id)
+        )
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error fetching course {course_id}: {str(e)}")
         print(traceback.format_exc())
@@ -129,13 +255,29 @@ def get_course(course_id: int, db: Session = Depends(get_db)):
 # Lesson endpoints
 @app.get("/lessons", response_model=List[schemas.LessonRead])
 def get_lessons(
+    response: Response,
     skip: int = 0, 
     limit: int = 100,
     course_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    tier: str = Depends(get_access_tier),
     db: Session = Depends(get_db)
 ):
+    """Lessons in (order, id) order; bodies of lessons the caller may not open are left out"""
     try:
         print("\n=== Fetching Lessons ===")
+        index = get_catalog_index()
+        if index is not None:
+            rows = index.course_lessons(course_id) if course_id is not None else index.lessons
+            page = paginate_sorted(rows, limit, cursor, skip, order_attr="sort_key")
+            cursor_for_next = next_cursor(page, limit, order_attr="sort_key")
+            if cursor_for_next:
+                response.headers["X-Next-Cursor"] = cursor_for_next
+            return redact_lessons(db, [
+                {**lesson.to_dict(), "prerequisites": list(lesson.prerequisite_ids)}
+                for lesson in page
+            ], tier)
+        
         query = db.query(models.Lesson)
         
         # Optional filtering by course
@@ -143,82 +285,156 @@ def get_lessons(
             query = query.filter(models.Lesson.course_id == course_id)
         
         # Order and paginate
-        lessons = query\
-            .order_by(models.Lesson.order)\
-            .offset(skip)\
-            .limit(limit)\
-            .all()
+        lessons = paginate(
+            query,
+            models.Lesson.sort_key,
+            models.Lesson.id,
+            limit=limit,
+            cursor=cursor,
+            skip=skip
+        ).all()
         
         print(f"Found {len(lessons)} lessons")
         
-        return lessons
+        # The body stays a plain list for existing clients; the cursor rides in a header
+        cursor_for_next = next_cursor(lessons, limit, order_attr="sort_key")
+        if cursor_for_next:
+            response.headers["X-Next-Cursor"] = cursor_for_next
+        
+        return redact_lessons(db, [
+            schemas.LessonRead.model_validate(lesson, from_attributes=True).model_dump()
+            for lesson in lessons
+        ], tier)
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error fetching lessons: {str(e)}")
         print(traceback.format_exc())
         raise HTTPException(status_code=500, detail=str(e))
 
+def _load_lesson(db: Session, lesson_id: int, rendered: bool = False) -> dict:
+    index = get_catalog_index()
+    if index is not None:
+        record = index.lesson(lesson_id)
+        if record is None:
+            raise HTTPException(status_code=404, detail="Lesson not found")
+        lesson_data = record.to_dict()
+        if rendered:
+            lesson_data["rendered"] = get_rendered_lesson(db, record)
+        return lesson_data
+    
+    lesson = db.query(models.Lesson)\
+        .filter(models.Lesson.id == lesson_id)\
+        .first()
+        
+    if lesson is None:
+        print(f"Lesson {lesson_id} not found")
+        raise HTTPException(status_code=404, detail="Lesson not found")
+    
+    print(f"Found lesson: {lesson.title}")
+    
+    # Convert to dict for consistent serialization
+    lesson_data = {
+        "id": lesson.id,
+        "title": lesson.title,
+        "description": lesson.description,
+        "content": lesson.content,
+        "content_sections": lesson.content_sections or [],
+        "code_samples": lesson.code_samples or [],
+        "key_points": lesson.key_points,
+        "order": lesson.order,
+        "difficulty": lesson.difficulty.value if lesson.difficulty else "beginner",
+        "lesson_type": lesson.lesson_type.value if lesson.lesson_type else "theory",
+        "estimated_time": lesson.estimated_time,
+        "learning_objectives": lesson.learning_objectives,
+        "is_premium": lesson.is_premium,
+        "course_id": lesson.course_id
+    }
+    if rendered:
+        lesson_data["rendered"] = get_rendered_lesson(db, lesson)
+    return lesson_data
+
 @app.get("/lessons/{lesson_id}")
-def get_lesson(lesson_id: int, db: Session = Depends(get_db)):
+def get_lesson(
+    lesson_id: int,
+    request: Request,
+    rendered: bool = Query(default=False, description="Include the pre-rendered HTML body"),
+    tier: str = Depends(get_access_tier),
+    db: Session = Depends(get_db)
+):
     try:
         print(f"\nFetching lesson with ID: {lesson_id}")
-        lesson = db.query(models.Lesson)\
-            .filter(models.Lesson.id == lesson_id)\
-            .first()
-            
-        if lesson is None:
-            print(f"Lesson {lesson_id} not found")
-            raise HTTPException(status_code=404, detail="Lesson not found")
-        
-        print(f"Found lesson: {lesson.title}")
-        
-        # Convert to dict for consistent serialization
-        lesson_data = {
-            "id": lesson.id,
-            "title": lesson.title,
-            "description": lesson.description,
-            "content": lesson.content,
-            "content_sections": lesson.content_sections or [],
-            "code_samples": lesson.code_samples or [],
-            "key_points": lesson.key_points,
-            "order": lesson.order,
-            "difficulty": lesson.difficulty.value if lesson.difficulty else "beginner",
-            "lesson_type": lesson.lesson_type.value if lesson.lesson_type else "theory",
-            "estimated_time": lesson.estimated_time,
-            "learning_objectives": lesson.learning_objectives,
-            "is_premium": lesson.is_premium,
-            "course_id": lesson.course_id
-        }
-        
-        return lesson_data
+        if lesson_locked(db, tier, lesson_id):
+            raise HTTPException(status_code=403, detail="This lesson requires premium access")
+        return cached_catalog_response(
+            request,
+            catalog_key("lesson", lesson_id, "rendered" if rendered else "raw"),
+            lambda: _load_lesson(db, lesson_id, rendered)
+        )
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error fetching lesson {lesson_id}: {str(e)}")
         print(traceback.format_exc())
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/rendering/highlight.css")
+def get_highlight_css():
+    """Stylesheet for the highlighted code in rendered lessons"""
+    return Response(
+        highlight_css(),
+        media_type="text/css",
+        headers={"Cache-Control": "public, max-age=86400"}
+    )
+
+def _load_lesson_resources(db: Session, lesson_id: int) -> dict:
+    index = get_catalog_index()
+    if index is not None:
+        return {"resources": [resource.to_dict() for resource in index.lesson_resources(lesson_id)]}
+    
+    resources = db.query(models.Resource)\
+        .filter(models.Resource.lesson_id == lesson_id)\
+        .all()
+        
+    resources_data = [
+        {
+            "id": resource.id,
+            "title": resource.title,
+            "type": resource.type,
+            "content": resource.content,
+            "description": resource.description if hasattr(resource, 'description') else None,
+            "size": resource.size,
+            "media_type": resource.media_type,
+            "filename": resource.filename,
+            "download_url": f"/resources/{resource.id}/download"
+        }
+        for resource in resources
+    ]
+    
+    print(f"Found {len(resources_data)} resources")
+    return {"resources": resources_data}
+
 @app.get("/lessons/{lesson_id}/resources")
-def get_lesson_resources(lesson_id: int, db: Session = Depends(get_db)):
+def get_lesson_resources(
+    lesson_id: int,
+    request: Request,
+    tier: str = Depends(get_access_tier),
+    db: Session = Depends(get_db)
+):
     try:
         print(f"\nFetching resources for lesson ID: {lesson_id}")
-        resources = db.query(models.Resource)\
-            .filter(models.Resource.lesson_id == lesson_id)\
-            .all()
-            
-        resources_data = [
-            {
-                "id": resource.id,
-                "title": resource.title,
-                "type": resource.type,
-                "content": resource.content,
-                "description": resource.description if hasattr(resource, 'description') else None
-            }
-            for resource in resources
-        ]
-        
-        print(f"Found {len(resources_data)} resources")
-        return {"resources": resources_data}
+        if lesson_locked(db, tier, lesson_id):
+            raise HTTPException(status_code=403, detail="This lesson requires premium access")
+        return cached_catalog_response(
+            request,
+            catalog_key("lesson_resources", lesson_id),
+            lambda: _load_lesson_resources(db, lesson_id)
+        )
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error fetching resources for lesson {lesson_id}: {str(e)}")
         print(traceback.format_exc())
@@ -228,6 +444,29 @@ def get_lesson_resources(lesson_id: int, db: Session = Depends(get_db)):
 def get_lesson_navigation(lesson_id: int, db: Session = Depends(get_db)):
     try:
         print(f"\nFetching navigation for lesson ID: {lesson_id}")
+        
+        # Served from the precomputed index; fall back to the database for
+        # lessons added since the last catalog refresh
+        navigation_index = get_navigation_index()
+        links = navigation_index.get(lesson_id) if navigation_index else None
+        if links is not None:
+            return links
+
+        # A published catalog never falls back to the draft tables
+        if parse_published_version(current_catalog_version()) is not None:
+            index = get_catalog_index()
+            record = index.lesson(lesson_id)
+            if record is None:
+                raise HTTPException(status_code=404, detail="Lesson not found")
+            siblings = index.course_lessons(record.course_id)
+            position = siblings.index(record)
+            prev_record = siblings[position - 1] if position > 0 else None
+            next_record = siblings[position + 1] if position + 1 < len(siblings) else None
+            return {
+                "previous": {"id": prev_record.id, "title": prev_record.title} if prev_record else None,
+                "next": {"id": next_record.id, "title": next_record.title} if next_record else None
+            }
+        
         current_lesson = db.query(models.Lesson)\
             .filter(models.Lesson.id == lesson_id)\
             .first()
@@ -240,18 +479,20 @@ def get_lesson_navigation(lesson_id: int, db: Session = Depends(get_db)):
         prev_lesson = db.query(models.Lesson)\
             .filter(
                 models.Lesson.course_id == current_lesson.course_id,
-                models.Lesson.order < current_lesson.order
+                tuple_(models.Lesson.sort_key, models.Lesson.id)
+                < (current_lesson.sort_key, current_lesson.id)
             )\
-            .order_by(models.Lesson.order.desc())\
+            .order_by(models.Lesson.sort_key.desc(), models.Lesson.id.desc())\
             .first()
         
         # Find next lesson in same course
         next_lesson = db.query(models.Lesson)\
             .filter(
                 models.Lesson.course_id == current_lesson.course_id,
-                models.Lesson.order > current_lesson.order
+                tuple_(models.Lesson.sort_key, models.Lesson.id)
+                > (current_lesson.sort_key, current_lesson.id)
             )\
-            .order_by(models.Lesson.order.asc())\
+            .order_by(models.Lesson.sort_key.asc(), models.Lesson.id.asc())\
             .first()
         
         navigation_data = {
@@ -268,41 +509,88 @@ def get_lesson_navigation(lesson_id: int, db: Session = Depends(get_db)):
         print("Navigation data:", navigation_data)
         return navigation_data
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error fetching lesson navigation for lesson {lesson_id}: {str(e)}")
         print(traceback.format_exc())
         raise HTTPException(status_code=500, detail=str(e))
 
+def _load_course_lessons(db: Session, course_id: int, limit: Optional[int], cursor: Optional[str]) -> dict:
+    index = get_catalog_index()
+    if index is not None:
+        lessons = index.course_lessons(course_id)
+        if limit is not None:
+            lessons = paginate_sorted(lessons, limit, cursor, order_attr="sort_key")
+        return {
+            "lessons": [lesson.outline() for lesson in lessons],
+            "next_cursor": next_cursor(lessons, limit, order_attr="sort_key") if limit is not None else None
+        }
+    
+    query = db.query(models.Lesson)\
+        .filter(models.Lesson.course_id == course_id)
+    
+    # Without a limit the whole course is returned, as before
+    if limit is None:
+        lessons = query.order_by(models.Lesson.sort_key, models.Lesson.id).all()
+    else:
+        lessons = paginate(
+            query,
+            models.Lesson.sort_key,
+            models.Lesson.id,
+            limit=limit,
+            cursor=cursor
+        ).all()
+        
+    print(f"Found {len(lessons)} lessons")
+    
+    # Convert to list of dicts
+    lessons_data = [
+        {
+            "id": lesson.id,
+            "title": lesson.title,
+            "description": lesson.description,
+            "content": lesson.content,
+            "order": lesson.order,
+            "difficulty": lesson.difficulty.value if lesson.difficulty else "beginner",
+            "lesson_type": lesson.lesson_type.value if lesson.lesson_type else "theory",
+            "estimated_time": lesson.estimated_time,
+            "learning_objectives": lesson.learning_objectives,
+            "is_premium": lesson.is_premium
+        }
+        for lesson in lessons
+    ]
+    
+    return {
+        "lessons": lessons_data,
+        "next_cursor": next_cursor(lessons, limit, order_attr="sort_key") if limit is not None else None
+    }
+
+def _redact_course_lessons(db: Session, page: dict, tier: str) -> dict:
+    return {**page, "lessons": redact_lessons(db, page["lessons"], tier)}
+
 @app.get("/courses/{course_id}/lessons")
-def get_course_lessons(course_id: int, db: Session = Depends(get_db)):
+def get_course_lessons(
+    request: Request,
+    course_id: int,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    tier: str = Depends(get_access_tier),
+    db: Session = Depends(get_db)
+):
     try:
         print(f"\nFetching lessons for course ID: {course_id}")
-        lessons = db.query(models.Lesson)\
-            .filter(models.Lesson.course_id == course_id)\
-            .order_by(models.Lesson.order)\
-            .all()
-            
-        print(f"Found {len(lessons)} lessons")
-        
-        # Convert to list of dicts
-        lessons_data = [
-            {
-                "id": lesson.id,
-                "title": lesson.title,
-                "description": lesson.description,
-                "content": lesson.content,
-                "order": lesson.order,
-                "difficulty": lesson.difficulty.value if lesson.difficulty else "beginner",
-                "lesson_type": lesson.lesson_type.value if lesson.lesson_type else "theory",
-                "estimated_time": lesson.estimated_time,
-                "learning_objectives": lesson.learning_objectives,
-                "is_premium": lesson.is_premium
-            }
-            for lesson in lessons
-        ]
-        
-        return {"lessons": lessons_data}
+        # Pages redacted while entitlements are rebuilt are not cached
+        key = catalog_key("course_lessons", course_id, limit, cursor, tier) \
+            if get_entitlements() is not None else None
+        return cached_catalog_response(
+            request,
+            key,
+            lambda: _redact_course_lessons(db, _load_course_lessons(db, course_id, limit, cursor), tier)
+        )
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error fetching lessons for course {course_id}: {str(e)}")
         print(traceback.format_exc())
@@ -320,8 +608,10 @@ def update_lesson_progress(
     Update progress for a specific lesson for the authenticated user.
     """
     try:
-        # Check if lesson exists
-        lesson = db.query(Lesson).filter(Lesson.id == lesson_id).first()
+        # Check the lesson is in the catalog readers see
+        catalog = get_catalog_index()
+        lesson = catalog.lesson(lesson_id) if catalog is not None \
+            else db.query(Lesson.id).filter(Lesson.id == lesson_id).first()
         if not lesson:
             raise HTTPException(status_code=404, detail="Lesson not found")
         
@@ -335,6 +625,8 @@ def update_lesson_progress(
         
         return progress
     
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error updating lesson progress: {str(e)}")
         db.rollback()
@@ -362,6 +654,65 @@ def get_lesson_progress(
         print(f"Error fetching lesson progress: {str(e)}")
         raise HTTPException(status_code=500, detail="Could not retrieve lesson progress")
 
+@app.post("/progress/batch", response_model=schemas.ProgressBatchResult)
+def update_progress_batch(
+    batch: schemas.ProgressBatchRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Apply many progress changes in one transaction, e.g. an offline
+    client's queue. The change with the latest client_timestamp wins per
+    lesson; older ones come back as "stale" with the stored progress.
+    """
+    try:
+        progress_tracker = ProgressTracker(db)
+        results = progress_tracker.apply_progress_batch(
+            user_id=current_user.id,
+            updates=[update.model_dump() for update in batch.updates]
+        )
+        
+        return {"results": results}
+    
+    except Exception as e:
+        print(f"Error applying progress batch: {str(e)}")
+        db.rollback()
+        raise HTTPException(status_code=500, detail="Could not update lesson progress")
+
+@app.get("/progress/lessons", response_model=Dict[int, Optional[schemas.UserProgressRead]])
+def get_lessons_progress(
+    ids: Optional[str] = Query(default=None, description="Comma-separated lesson IDs"),
+    course_id: Optional[int] = None,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Progress for many lessons at once, by ID list or for a whole course,
+    as a map of lesson ID to progress (null when not started).
+    """
+    lesson_ids = None
+    if ids is not None:
+        try:
+            lesson_ids = {int(part) for part in ids.split(",") if part.strip()}
+        except ValueError:
+            raise HTTPException(status_code=400, detail="ids must be comma-separated integers")
+        if len(lesson_ids) > 500:
+            raise HTTPException(status_code=400, detail="At most 500 lesson IDs per request")
+    if lesson_ids is None and course_id is None:
+        raise HTTPException(status_code=400, detail="Pass ids or course_id")
+
+    try:
+        progress_tracker = ProgressTracker(db)
+        return progress_tracker.get_lessons_progress(
+            user_id=current_user.id,
+            lesson_ids=lesson_ids,
+            course_id=course_id
+        )
+    
+    except Exception as e:
+        print(f"Error fetching lessons progress: {str(e)}")
+        raise HTTPException(status_code=500, detail="Could not retrieve lesson progress")
+
 @app.get("/courses/{course_id}/progress", response_model=dict)
 def get_course_progress(
     course_id: int,
@@ -373,9 +724,13 @@ def get_course_progress(
     """
     try:
         progress_tracker = ProgressTracker(db)
-        course_progress = progress_tracker.get_course_progress(
-            user_id=current_user.id,
-            course_id=course_id
+        # Dashboards fire this from several components at once; share one computation
+        course_progress = get_singleflight().do(
+            f"progress:{current_user.id}:{course_id}",
+            lambda: progress_tracker.get_course_progress(
+                user_id=current_user.id,
+                course_id=course_id
+            )
         )
         
         return course_progress
@@ -394,8 +749,11 @@ def get_all_courses_progress(
     """
     try:
         progress_tracker = ProgressTracker(db)
-        all_courses_progress = progress_tracker.get_all_courses_progress(
-            user_id=current_user.id
+        all_courses_progress = get_singleflight().do(
+            f"progress:{current_user.id}:all",
+            lambda: progress_tracker.get_all_courses_progress(
+                user_id=current_user.id
+            )
         )
         
         return all_courses_progress
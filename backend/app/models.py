@@ -1,12 +1,13 @@
 # backend/app/models.py
 from sqlalchemy import (
     Boolean, Column, Integer, String, Text, ForeignKey, 
-    Enum, JSON, DateTime, Table, UniqueConstraint
+    Enum, JSON, DateTime, Table, UniqueConstraint, Index
 )
 from sqlalchemy.orm import declarative_base, relationship
 from datetime import datetime
 import enum
-from passlib.hash import bcrypt
+
+from .utils.ordering import key_for_order
 
 Base = declarative_base()
 
@@ -48,6 +49,7 @@ class Course(Base):
     __tablename__ = "courses"
     
     id = Column(Integer, primary_key=True, index=True)
+    slug = Column(String, unique=True, index=True, nullable=True)
     title = Column(String, index=True)
     description = Column(String)
     order = Column(Integer)
@@ -64,10 +66,17 @@ class Course(Base):
     
     lessons = relationship("Lesson", back_populates="course")
 
+def _default_sort_key(context) -> str:
+    return key_for_order(context.get_current_parameters().get("order"))
+
 class Lesson(Base):
     __tablename__ = "lessons"
+    __table_args__ = (
+        Index("ix_lessons_course_sort_key", "course_id", "sort_key"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
+    slug = Column(String, unique=True, index=True, nullable=True)
     title = Column(String, index=True)
     description = Column(String)
     summary = Column(String)
@@ -76,6 +85,9 @@ class Lesson(Base):
     code_samples = Column(JSON)
     key_points = Column(Text)
     order = Column(Integer)
+    # Position within the course (utils.ordering); lists sort by (sort_key, id).
+    # Mixed-case keys must compare byte by byte, not by the database locale
+    sort_key = Column(String().with_variant(String(collation="C"), "postgresql"), default=_default_sort_key)
     difficulty = Column(Enum(DifficultyLevel), default=DifficultyLevel.BEGINNER)
     lesson_type = Column(Enum(LessonType), default=LessonType.THEORY)
     content_format = Column(Enum(ContentFormat), default=ContentFormat.TEXT)
@@ -87,6 +99,8 @@ class Lesson(Base):
     practical_application = Column(Text)
     is_premium = Column(Boolean, default=False)
     course_id = Column(Integer, ForeignKey("courses.id"))
+    # Content hash of the lesson's current RenderedArtifact
+    rendered_hash = Column(String(64), nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -104,10 +118,16 @@ class Resource(Base):
     __tablename__ = "resources"
     
     id = Column(Integer, primary_key=True, index=True)
+    slug = Column(String, unique=True, index=True, nullable=True)
     title = Column(String)
     type = Column(String)
-    content = Column(Text)
+    # Legacy inline content; files are in the blob store (python -m app.storage offload)
+    content = Column(Text, nullable=True)
     description = Column(String)
+    blob_hash = Column(String(64), nullable=True, index=True)
+    size = Column(Integer, nullable=True)
+    media_type = Column(String, nullable=True)
+    filename = Column(String, nullable=True)
     lesson_id = Column(Integer, ForeignKey("lessons.id"))
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -141,20 +161,29 @@ class User(Base):
     
     def set_password(self, password):
         """Hash and set the password"""
+        from passlib.hash import bcrypt  # imported lazily; slow and rarely used
         self.hashed_password = bcrypt.hash(password)
     
     def check_password(self, password):
         """Verify a password against the stored hash"""
+        from passlib.hash import bcrypt
         return bcrypt.verify(password, self.hashed_password)
 
 class UserProgress(Base):
     __tablename__ = "user_progress"
+    __table_args__ = (
+        Index("ix_user_progress_user_lesson", "user_id", "lesson_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
     lesson_id = Column(Integer, ForeignKey("lessons.id"))
     is_completed = Column(Boolean, default=False)
     completed_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+    # Client clock time of the latest applied change (last-writer-wins in batch sync)
+    client_updated_at = Column(DateTime, nullable=True)
     
     user = relationship("User", back_populates="progress")
     lesson = relationship("Lesson")
@@ -162,4 +191,82 @@ class UserProgress(Base):
     def mark_completed(self):
         """Mark the lesson as completed"""
         self.is_completed = True
-        self.completed_at = datetime.utcnow()
\ No newline at end of file
+        self.completed_at = datetime.utcnow()
+
+
+class CatalogChange(Base):
+    """
+    Append-only log of catalog writes; the id doubles as the sync position
+    """
+    __tablename__ = "catalog_changes"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    entity = Column(String(20), nullable=False)  # "course", "lesson" or "resource"
+    entity_id = Column(Integer, nullable=False)
+    op = Column(String(10), nullable=False)  # "upsert" or "delete"
+    changed_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+class RenderedArtifact(Base):
+    """
+    Lesson body rendered to HTML once per content version; lessons with
+    identical content share a row
+    """
+    __tablename__ = "rendered_artifacts"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    content_hash = Column(String(64), unique=True, index=True, nullable=False)
+    renderer_version = Column(Integer, nullable=False)
+    html = Column(Text)
+    sections = Column(JSON)
+    code_samples = Column(JSON)
+    toc = Column(JSON)
+    word_count = Column(Integer)
+    reading_time_minutes = Column(Integer)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class CatalogVersion(Base):
+    """
+    A published catalog: an immutable list of row payloads that readers
+    are served from while editors keep changing the live (draft) tables
+    """
+    __tablename__ = "catalog_versions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    parent_id = Column(Integer, ForeignKey("catalog_versions.id"), nullable=True)
+    # Last catalog_changes entry included, so the next publish copies this
+    # version and re-reads only rows changed since
+    change_id = Column(Integer, nullable=False, default=0)
+    note = Column(String, nullable=True)
+    published_by = Column(Integer, ForeignKey("users.id"), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class CatalogVersionRow(Base):
+    """
+    One row of a published version; versions share unchanged payloads
+    """
+    __tablename__ = "catalog_version_rows"
+
+    version_id = Column(Integer, ForeignKey("catalog_versions.id"), primary_key=True)
+    entity = Column(String(20), primary_key=True)  # "course", "lesson" or "resource"
+    entity_id = Column(Integer, primary_key=True)
+    row_hash = Column(String(64), nullable=False, index=True)
+    # Lessons only: keeps the rendered artifact alive while a version uses it
+    rendered_hash = Column(String(64), nullable=True, index=True)
+
+class CatalogRowPayload(Base):
+    """Content-addressed row payloads, stored once however many versions use them"""
+    __tablename__ = "catalog_row_payloads"
+
+    row_hash = Column(String(64), primary_key=True)
+    payload = Column(JSON, nullable=False)
+
+class CatalogState(Base):
+    """
+    Single-row pointer to the published version; publishing and rollback
+    only move it
+    """
+    __tablename__ = "catalog_state"
+
+    id = Column(Integer, primary_key=True)
+    published_version_id = Column(Integer, ForeignKey("catalog_versions.id"), nullable=True)
+    published_at = Column(DateTime, nullable=True)
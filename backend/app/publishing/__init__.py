@@ -0,0 +1,12 @@
+"""
+Published catalog versions (see publish.py): readers are served from the
+published version while editors change the draft tables, and publishing
+or rolling back is one pointer move.
+
+    python -m app.publishing publish [--note TEXT]
+    python -m app.publishing rollback [--to ID]
+    python -m app.publishing list
+"""
+from .publish import list_versions, prune_versions, publish, rollback
+
+__all__ = ["list_versions", "prune_versions", "publish", "rollback"]
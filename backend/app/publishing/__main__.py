@@ -0,0 +1,62 @@
+"""
+Publish the draft catalog, roll back, or list catalog versions.
+
+    python -m app.publishing publish [--note TEXT]
+    python -m app.publishing rollback [--to ID]
+    python -m app.publishing list [--limit N]
+    python -m app.publishing prune [--keep N]
+"""
+import argparse
+import sys
+
+from fastapi import HTTPException
+
+from ..database import SessionLocal
+from . import list_versions, prune_versions, publish, rollback
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Manage published catalog versions")
+    commands = parser.add_subparsers(dest="command", required=True)
+    publish_parser = commands.add_parser("publish", help="publish the draft catalog")
+    publish_parser.add_argument("--note", default=None, help="describe what changed")
+    rollback_parser = commands.add_parser("rollback", help="serve an earlier version")
+    rollback_parser.add_argument("--to", type=int, default=None, help="version id (default: the parent)")
+    list_parser = commands.add_parser("list", help="list the newest versions")
+    list_parser.add_argument("--limit", type=int, default=20)
+    prune_parser = commands.add_parser("prune", help="delete old versions")
+    prune_parser.add_argument("--keep", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        if args.command == "publish":
+            version = publish(db, note=args.note)
+            if version["created"]:
+                print(f"Published {version['version']}: " +
+                      ", ".join(f"{k}={v}" for k, v in version["rows"].items()))
+            else:
+                print(f"Nothing changed since {version['version']}")
+        elif args.command == "rollback":
+            version = rollback(db, args.to)
+            print(f"Now serving {version['version']}")
+        elif args.command == "list":
+            for version in list_versions(db, args.limit):
+                marker = "*" if version["published"] else " "
+                print(f"{marker} {version['version']:>6}  {version['created_at']:%Y-%m-%d %H:%M}  "
+                      f"parent={version['parent_id']}  {version['note'] or ''}")
+        else:
+            print(f"Deleted {prune_versions(db, args.keep)} versions")
+    except HTTPException as e:
+        print(f"Error: {e.detail}")
+        return 1
+    except Exception as e:
+        print(f"Error in {args.command}: {str(e)}")
+        return 1
+    finally:
+        db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
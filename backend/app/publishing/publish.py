@@ -0,0 +1,276 @@
+"""
+Publishing catalog versions.
+
+Editors write to the live courses, lessons and resources tables, which
+are the draft. publish() records the draft as a new immutable version and
+moves the catalog_state pointer to it in the same transaction, so readers
+(which are served from the published version only) see the whole edit or
+none of it. rollback() moves the pointer back.
+
+Versions are copy-on-write: a new version copies its parent's row list
+with one INSERT ... SELECT and re-reads only the rows the catalog change
+log says were written since. Payloads are content-addressed, so every
+version shares the rows it did not change.
+"""
+import hashlib
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from fastapi import HTTPException
+from sqlalchemy import delete, func, insert, literal, select, update
+from sqlalchemy.orm import Session
+
+from ..models import (
+    CatalogChange, CatalogRowPayload, CatalogState, CatalogVersion, CatalogVersionRow, Course, Lesson
+)
+from ..utils.catalog import published_version_id, published_version_label
+from ..utils.sync import ENTITIES, LOADERS
+
+CHUNK_SIZE = 500
+
+
+def _chunks(items: Sequence, size: int = CHUNK_SIZE) -> Iterator[Sequence]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if hasattr(value, "value"):
+        return value.value
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _published_rows(db: Session, entity: str, ids: Optional[List[int]] = None) -> List[Dict[str, Any]]:
+    """
+    The draft rows of `entity` as published payloads (the sync rows plus
+    sync.PUBLISHED_ONLY_FIELDS), plain JSON values only
+    """
+    rows = LOADERS[entity](db, ids)
+    if entity == "course":
+        query = select(Course.id, Course.tags)
+        extras = {"tags": dict(db.execute(query if ids is None else query.where(Course.id.in_(ids))).all())}
+    elif entity == "lesson":
+        query = select(Lesson.id, Lesson.rendered_hash, Lesson.interactive_elements)
+        extras = {"rendered_hash": {}, "interactive_elements": {}}
+        for lesson_id, rendered_hash, interactive_elements in db.execute(
+            query if ids is None else query.where(Lesson.id.in_(ids))
+        ):
+            extras["rendered_hash"][lesson_id] = rendered_hash
+            extras["interactive_elements"][lesson_id] = interactive_elements
+    else:
+        extras = {}
+    for row in rows:
+        for field, values in extras.items():
+            row[field] = values.get(row["id"])
+    return json.loads(json.dumps(rows, default=_json_default))
+
+
+def _row_hash(entity: str, payload: Dict[str, Any]) -> str:
+    canonical = json.dumps([entity, payload], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def _store_rows(db: Session, version_id: int, entity: str, rows: List[Dict[str, Any]]) -> None:
+    """Add `rows` to a version, inserting only payloads no version has yet"""
+    hashed = {_row_hash(entity, row): row for row in rows}
+    existing = set()
+    for chunk in _chunks(list(hashed)):
+        existing.update(db.execute(
+            select(CatalogRowPayload.row_hash).where(CatalogRowPayload.row_hash.in_(chunk))
+        ).scalars())
+    new_payloads = [{"row_hash": row_hash, "payload": row}
+                    for row_hash, row in hashed.items() if row_hash not in existing]
+    if new_payloads:
+        db.execute(insert(CatalogRowPayload), new_payloads)
+    if hashed:
+        db.execute(insert(CatalogVersionRow), [
+            {
+                "version_id": version_id,
+                "entity": entity,
+                "entity_id": row["id"],
+                "row_hash": row_hash,
+                "rendered_hash": row.get("rendered_hash"),
+            }
+            for row_hash, row in hashed.items()
+        ])
+
+
+def _changed_ids(db: Session, after: int, through: int) -> Dict[str, List[int]]:
+    changed: Dict[str, List[int]] = {entity: [] for entity in ENTITIES}
+    for entity, entity_id in db.execute(
+        select(CatalogChange.entity, CatalogChange.entity_id)
+        .where(CatalogChange.id > after, CatalogChange.id <= through)
+        .distinct()
+    ):
+        if entity in changed:
+            changed[entity].append(entity_id)
+    return changed
+
+
+def publish(db: Session, note: Optional[str] = None, user_id: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Publish the draft catalog as a new version and point readers at it.
+    Returns the published version; when the draft has not changed since
+    the published version, that version is returned with created=False.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        # One consistent view of the draft for every table read below
+        db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+
+    state = db.execute(select(CatalogState).where(CatalogState.id == 1).with_for_update()).scalar()
+    latest_change, oldest_change = db.execute(
+        select(func.max(CatalogChange.id), func.min(CatalogChange.id))
+    ).one()
+    latest_change = latest_change or 0
+    parent = db.get(CatalogVersion, state.published_version_id) \
+        if state is not None and state.published_version_id is not None else None
+
+    if parent is not None and parent.change_id == latest_change:
+        db.rollback()
+        return {**_describe(db, parent, published=True), "created": False}
+
+    version = CatalogVersion(
+        parent_id=parent.id if parent is not None else None,
+        change_id=latest_change,
+        note=note,
+        published_by=user_id,
+        created_at=datetime.utcnow()
+    )
+    db.add(version)
+    db.flush()
+
+    # Copy the parent when the change log still reaches back to it
+    incremental = parent is not None and parent.change_id <= latest_change and (
+        oldest_change is None or parent.change_id >= oldest_change - 1
+    )
+    rewritten: Dict[str, int] = {}
+    if incremental:
+        columns = ("version_id", "entity", "entity_id", "row_hash", "rendered_hash")
+        db.execute(insert(CatalogVersionRow).from_select(columns, select(
+            literal(version.id), CatalogVersionRow.entity, CatalogVersionRow.entity_id,
+            CatalogVersionRow.row_hash, CatalogVersionRow.rendered_hash
+        ).where(CatalogVersionRow.version_id == parent.id)))
+        for entity, ids in _changed_ids(db, parent.change_id, latest_change).items():
+            for chunk in _chunks(ids):
+                db.execute(delete(CatalogVersionRow).where(
+                    CatalogVersionRow.version_id == version.id,
+                    CatalogVersionRow.entity == entity,
+                    CatalogVersionRow.entity_id.in_(chunk)
+                ))
+                # Rows deleted from the draft are simply not re-added
+                _store_rows(db, version.id, entity, _published_rows(db, entity, list(chunk)))
+            rewritten[entity] = len(ids)
+    else:
+        for entity in ENTITIES:
+            rows = _published_rows(db, entity)
+            _store_rows(db, version.id, entity, rows)
+            rewritten[entity] = len(rows)
+
+    now = datetime.utcnow()
+    if state is None:
+        db.add(CatalogState(id=1, published_version_id=version.id, published_at=now))
+    else:
+        state.published_version_id = version.id
+        state.published_at = now
+    db.commit()
+    print(f"Published catalog {published_version_label(version.id)} "
+          f"({'incremental' if incremental else 'full'}: {rewritten})")
+    return {**_describe(db, version, published=True), "created": True, "rewritten": rewritten}
+
+
+def rollback(db: Session, version_id: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Point readers at `version_id`, by default the published version's parent.
+    The draft is not touched; the next publish starts from the version
+    rolled back to.
+    """
+    current = published_version_id(db)
+    if version_id is None:
+        if current is None:
+            raise HTTPException(status_code=409, detail="Nothing is published")
+        version_id = db.get(CatalogVersion, current).parent_id
+        if version_id is None:
+            raise HTTPException(status_code=409, detail="The published version has no parent")
+    target = db.get(CatalogVersion, version_id)
+    if target is None:
+        raise HTTPException(status_code=404, detail="Catalog version not found")
+
+    db.execute(update(CatalogState).where(CatalogState.id == 1).values(
+        published_version_id=target.id, published_at=datetime.utcnow()
+    ))
+    db.commit()
+    print(f"Rolled catalog back to {published_version_label(target.id)}")
+    return _describe(db, target, published=True)
+
+
+def _row_counts(db: Session, version_ids: Iterable[int]) -> Dict[int, Dict[str, int]]:
+    counts: Dict[int, Dict[str, int]] = {}
+    for version_id, entity, count in db.execute(
+        select(CatalogVersionRow.version_id, CatalogVersionRow.entity, func.count())
+        .where(CatalogVersionRow.version_id.in_(list(version_ids)))
+        .group_by(CatalogVersionRow.version_id, CatalogVersionRow.entity)
+    ):
+        counts.setdefault(version_id, {})[entity] = count
+    return counts
+
+
+def _describe(
+    db: Session,
+    version: CatalogVersion,
+    published: bool,
+    rows: Optional[Dict[str, int]] = None
+) -> Dict[str, Any]:
+    if rows is None:
+        rows = _row_counts(db, [version.id]).get(version.id, {})
+    return {
+        "id": version.id,
+        "version": published_version_label(version.id),
+        "parent_id": version.parent_id,
+        "change_id": version.change_id,
+        "note": version.note,
+        "published_by": version.published_by,
+        "created_at": version.created_at,
+        "published": published,
+        "rows": {entity: rows.get(entity, 0) for entity in ENTITIES},
+    }
+
+
+def list_versions(db: Session, limit: int = 20) -> List[Dict[str, Any]]:
+    """The newest versions first"""
+    current = published_version_id(db)
+    versions = db.execute(
+        select(CatalogVersion).order_by(CatalogVersion.id.desc()).limit(limit)
+    ).scalars().all()
+    counts = _row_counts(db, [version.id for version in versions])
+    return [_describe(db, version, version.id == current, counts.get(version.id, {})) for version in versions]
+
+
+def prune_versions(db: Session, keep: int = 20) -> int:
+    """
+    Delete all but the newest `keep` versions (never the published one)
+    and the payloads no remaining version uses. Returns how many versions
+    were deleted.
+    """
+    current = published_version_id(db)
+    kept = set(db.execute(
+        select(CatalogVersion.id).order_by(CatalogVersion.id.desc()).limit(keep)
+    ).scalars())
+    if current is not None:
+        kept.add(current)
+    doomed = [version_id for version_id in db.execute(select(CatalogVersion.id)).scalars()
+              if version_id not in kept]
+    if not doomed:
+        return 0
+
+    for chunk in _chunks(doomed):
+        db.execute(update(CatalogVersion).where(CatalogVersion.parent_id.in_(chunk)).values(parent_id=None))
+        db.execute(delete(CatalogVersionRow).where(CatalogVersionRow.version_id.in_(chunk)))
+        db.execute(delete(CatalogVersion).where(CatalogVersion.id.in_(chunk)))
+    db.execute(delete(CatalogRowPayload).where(
+        CatalogRowPayload.row_hash.notin_(select(CatalogVersionRow.row_hash))
+    ))
+    db.commit()
+    return len(doomed)
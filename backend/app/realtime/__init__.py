@@ -0,0 +1,40 @@
+"""
+Live per-user events, pushed instead of polled.
+
+Event types: "progress" (lesson progress changed), "run" (code run
+finished) and "grading" (submission graded). Clients receive "resync"
+when they fell behind and should refetch.
+"""
+from typing import Any, Dict, Optional
+
+from ..core.config import settings
+from .broker import Broker, LocalBroker, Subscription
+
+_broker: Optional[Broker] = None
+
+
+def get_broker() -> Broker:
+    global _broker
+    if _broker is None:
+        _broker = LocalBroker(
+            buffer_size=settings.REALTIME_CLIENT_BUFFER,
+            replay_seconds=settings.REALTIME_REPLAY_SECONDS
+        )
+    return _broker
+
+
+def set_broker(broker: Broker) -> None:
+    """Swap in another fan-out, e.g. one that spans worker processes"""
+    global _broker
+    _broker = broker
+
+
+def publish(user_id: int, event_type: str, data: Dict[str, Any]) -> None:
+    """Push an event to a user's open channels; never raises"""
+    try:
+        get_broker().publish(user_id, event_type, data)
+    except Exception as e:
+        print(f"Error publishing {event_type} event: {str(e)}")
+
+
+__all__ = ["Broker", "LocalBroker", "Subscription", "get_broker", "publish", "set_broker"]
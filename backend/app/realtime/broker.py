@@ -0,0 +1,130 @@
+"""
+Per-user event fan-out for the live channel (SSE and WebSocket).
+
+publish() may be called from any thread, including the threadpool that
+runs sync endpoints, and never blocks: each subscriber has a bounded
+buffer. A subscriber that falls behind has its backlog replaced by a
+single "resync" event telling the client to refetch state.
+"""
+import asyncio
+import itertools
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict, Iterable, Optional, Set
+
+
+class Subscription:
+    def __init__(self, user_id: int, loop: asyncio.AbstractEventLoop, buffer_size: int):
+        self.user_id = user_id
+        self.loop = loop
+        self.buffer: Deque[Dict[str, Any]] = deque()
+        self.buffer_size = buffer_size
+        self._ready = asyncio.Event()
+
+    def push(self, event: Dict[str, Any]) -> None:
+        """Called on the subscriber's event loop"""
+        if len(self.buffer) >= self.buffer_size:
+            # The client refetches everything on resync, so the backlog is moot
+            self.buffer.clear()
+            self.buffer.append({"id": None, "type": "resync", "data": {}, "ts": time.time()})
+        self.buffer.append(event)
+        self._ready.set()
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Next event, or None after `timeout` seconds without one"""
+        if not self.buffer:
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        return self.buffer.popleft()
+
+
+class Broker:
+    """
+    Interface for the fan-out. A cross-worker backend would send published
+    events over its transport and call deliver() in every worker.
+    """
+    def publish(self, user_id: int, event_type: str, data: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    def subscribe(self, user_id: int, last_event_id: Optional[int] = None) -> Subscription:
+        raise NotImplementedError
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        raise NotImplementedError
+
+
+class LocalBroker(Broker):
+    """
+    In-process fan-out. Keeps a short per-user history so a client that
+    reconnects with Last-Event-ID within `replay_seconds` misses nothing.
+    Histories of users with no open channel are dropped once their last
+    event is older than that, so memory follows active users only.
+    """
+    def __init__(self, buffer_size: int = 100, history_size: int = 50, replay_seconds: float = 300):
+        self.buffer_size = buffer_size
+        self.history_size = history_size
+        self.replay_seconds = replay_seconds
+        self._subscriptions: Dict[int, Set[Subscription]] = defaultdict(set)
+        self._history: Dict[int, Deque[Dict[str, Any]]] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._next_sweep = time.time() + replay_seconds
+
+    def publish(self, user_id: int, event_type: str, data: Dict[str, Any]) -> None:
+        event = {"id": next(self._ids), "type": event_type, "data": data, "ts": time.time()}
+        self.deliver(user_id, event)
+
+    def _sweep(self, now: float) -> None:
+        """Drop expired histories of users without subscribers; called with the lock held"""
+        cutoff = now - self.replay_seconds
+        for user_id in [user_id for user_id, history in self._history.items()
+                        if history[-1]["ts"] < cutoff and user_id not in self._subscriptions]:
+            del self._history[user_id]
+        self._next_sweep = now + self.replay_seconds
+
+    def deliver(self, user_id: int, event: Dict[str, Any]) -> None:
+        with self._lock:
+            now = time.time()
+            if now >= self._next_sweep:
+                self._sweep(now)
+            history = self._history.get(user_id)
+            if history is None:
+                history = self._history[user_id] = deque(maxlen=self.history_size)
+            history.append(event)
+            subscribers = list(self._subscriptions.get(user_id, ()))
+
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.push, event)
+            except RuntimeError:
+                # The subscriber's loop has closed
+                self.unsubscribe(subscription)
+
+    def subscribe(self, user_id: int, last_event_id: Optional[int] = None) -> Subscription:
+        subscription = Subscription(user_id, asyncio.get_running_loop(), self.buffer_size)
+        with self._lock:
+            self._subscriptions[user_id].add(subscription)
+            missed: Iterable[Dict[str, Any]] = ()
+            if last_event_id is not None:
+                cutoff = time.time() - self.replay_seconds
+                missed = [e for e in self._history.get(user_id, ())
+                          if e["id"] > last_event_id and e["ts"] >= cutoff]
+        for event in missed:
+            subscription.push(event)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscribers = self._subscriptions.get(subscription.user_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscriptions[subscription.user_id]
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return sum(len(s) for s in self._subscriptions.values())
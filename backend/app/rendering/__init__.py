@@ -0,0 +1,20 @@
+"""
+Publish-time rendering of lesson bodies to HTML (see artifacts.py).
+
+    python -m app.rendering    # render lessons imported before the render stage
+"""
+from .artifacts import (
+    RENDERER_VERSION, content_hash, get_rendered_lesson, render_lesson, render_lessons
+)
+from .markdown import highlight_css, render_markdown, sanitize
+
+__all__ = [
+    "RENDERER_VERSION",
+    "content_hash",
+    "get_rendered_lesson",
+    "highlight_css",
+    "render_lesson",
+    "render_lessons",
+    "render_markdown",
+    "sanitize",
+]
@@ -0,0 +1,29 @@
+"""
+Render lessons whose stored rendering is missing or out of date.
+
+    python -m app.rendering
+"""
+import sys
+
+from ..database import SessionLocal
+from .artifacts import render_lessons
+
+
+def main() -> int:
+    db = SessionLocal()
+    try:
+        rendered = render_lessons(db)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"Error rendering lessons: {str(e)}")
+        return 1
+    finally:
+        db.close()
+
+    print(f"Rendered {rendered} lessons")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
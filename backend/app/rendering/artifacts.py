@@ -0,0 +1,186 @@
+"""
+Render stage for lesson bodies.
+
+A lesson's content, content_sections and code_samples are rendered to
+sanitized HTML with highlighted code, a table of contents and a reading
+time estimate, and stored in rendered_artifacts under a hash of the
+inputs and RENDERER_VERSION. Lessons point at their artifact through
+lessons.rendered_hash, so reads never render and identical content is
+rendered once.
+"""
+import hashlib
+import json
+import math
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..models import CatalogVersionRow, Lesson, RenderedArtifact
+from .markdown import highlight_code, render_markdown, slugify_anchor
+
+# Bump to re-render every lesson after changing the output format
+RENDERER_VERSION = 1
+
+WORDS_PER_MINUTE = 200
+CODE_LINES_PER_MINUTE = 20
+# Sections carry no language of their own
+DEFAULT_CODE_LANGUAGE = "python"
+
+
+def content_hash(content: Optional[str], sections: Optional[List], samples: Optional[List]) -> str:
+    payload = json.dumps(
+        {"v": RENDERER_VERSION, "content": content or "", "sections": sections or [],
+         "samples": samples or []},
+        sort_keys=True, separators=(",", ":")
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def render_lesson(
+    content: Optional[str],
+    sections: Optional[List[Dict[str, Any]]],
+    samples: Optional[List[Dict[str, Any]]]
+) -> Dict[str, Any]:
+    """Render one lesson body; pure function of its inputs"""
+    toc: List[Dict] = []
+    anchors = set()
+    words = len((content or "").split())
+    code_lines = 0
+
+    html = render_markdown(content or "", toc, anchors)
+
+    rendered_sections = []
+    for section in sorted(sections or [], key=lambda s: s.get("order", 0)):
+        title = section.get("title", "")
+        anchor = slugify_anchor(title, anchors)
+        toc.append({"level": 2, "title": title, "anchor": anchor})
+        body = section.get("content", "")
+        if section.get("type") == "code":
+            section_html = highlight_code(body, DEFAULT_CODE_LANGUAGE)
+            code_lines += len(body.splitlines())
+        else:
+            section_html = render_markdown(body, toc, anchors)
+            words += len(body.split())
+        rendered_sections.append({
+            "title": title,
+            "type": section.get("type"),
+            "order": section.get("order"),
+            "anchor": anchor,
+            "html": section_html,
+        })
+
+    rendered_samples = []
+    for sample in samples or []:
+        code = sample.get("code", "")
+        code_lines += len(code.splitlines())
+        rendered_samples.append({
+            "title": sample.get("title"),
+            "language": sample.get("language"),
+            "description": sample.get("description"),
+            "html": highlight_code(code, sample.get("language")),
+        })
+
+    return {
+        "html": html,
+        "sections": rendered_sections,
+        "code_samples": rendered_samples,
+        "toc": toc,
+        "word_count": words,
+        "reading_time_minutes": max(1, math.ceil(
+            words / WORDS_PER_MINUTE + code_lines / CODE_LINES_PER_MINUTE
+        )),
+    }
+
+
+def render_lessons(db: Session, lesson_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Render lessons whose content (or RENDERER_VERSION) changed since they
+    were last rendered, in the caller's transaction. Returns the number of
+    lessons pointed at a new artifact. Artifacts no lesson points at any
+    more are deleted.
+    """
+    query = select(
+        Lesson.id, Lesson.content, Lesson.content_sections, Lesson.code_samples,
+        Lesson.rendered_hash, Lesson.updated_at
+    )
+    if lesson_ids is not None:
+        query = query.where(Lesson.id.in_(list(lesson_ids)))
+
+    pending: Dict[str, Any] = {}
+    updates = []
+    for row in db.execute(query):
+        digest = content_hash(row.content, row.content_sections, row.code_samples)
+        if digest == row.rendered_hash:
+            continue
+        pending.setdefault(digest, row)
+        # Rendering is not an edit: keep updated_at
+        updates.append({"id": row.id, "rendered_hash": digest, "updated_at": row.updated_at})
+    if not updates:
+        return 0
+
+    stored = set(db.execute(
+        select(RenderedArtifact.content_hash).where(RenderedArtifact.content_hash.in_(list(pending)))
+    ).scalars())
+    for digest, row in pending.items():
+        if digest not in stored:
+            db.add(RenderedArtifact(
+                content_hash=digest,
+                renderer_version=RENDERER_VERSION,
+                **render_lesson(row.content, row.content_sections, row.code_samples)
+            ))
+    db.flush()
+    db.execute(update(Lesson), updates)
+    # Published catalog versions keep their lessons' renderings alive
+    db.execute(delete(RenderedArtifact).where(
+        RenderedArtifact.content_hash.notin_(
+            select(Lesson.rendered_hash).where(Lesson.rendered_hash.isnot(None))
+        ),
+        RenderedArtifact.content_hash.notin_(
+            select(CatalogVersionRow.rendered_hash).where(CatalogVersionRow.rendered_hash.isnot(None))
+        )
+    ))
+    return len(updates)
+
+
+def _artifact_dict(artifact: RenderedArtifact) -> Dict[str, Any]:
+    return {
+        "content_hash": artifact.content_hash,
+        "html": artifact.html,
+        "sections": artifact.sections or [],
+        "code_samples": artifact.code_samples or [],
+        "toc": artifact.toc or [],
+        "word_count": artifact.word_count,
+        "reading_time_minutes": artifact.reading_time_minutes,
+    }
+
+
+def get_rendered_lesson(db: Session, lesson: Lesson) -> Dict[str, Any]:
+    """
+    The stored rendering of a lesson, rendering it first if the lesson
+    predates the render stage or was changed outside the importer.
+    Also accepts a LessonRecord from the in-memory catalog.
+    """
+    digest = content_hash(lesson.content, lesson.content_sections, lesson.code_samples)
+    if lesson.rendered_hash == digest:
+        artifact = db.query(RenderedArtifact)\
+            .filter(RenderedArtifact.content_hash == digest)\
+            .first()
+        if artifact is not None:
+            return _artifact_dict(artifact)
+
+    try:
+        render_lessons(db, [lesson.id])
+        db.commit()
+    except IntegrityError:
+        # A concurrent request stored the same artifact first
+        db.rollback()
+    artifact = db.query(RenderedArtifact)\
+        .filter(RenderedArtifact.content_hash == digest)\
+        .first()
+    if artifact is None:
+        return {"content_hash": digest, **render_lesson(
+            lesson.content, lesson.content_sections, lesson.code_samples
+        )}
+    return _artifact_dict(artifact)
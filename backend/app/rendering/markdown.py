@@ -0,0 +1,115 @@
+"""
+Markdown to sanitized HTML, with Pygments highlighting and heading anchors.
+
+Raw HTML in lesson Markdown is escaped by the parser, and the output is
+run through an allowlist sanitizer as well, so rendered lessons are safe
+to insert into the page as-is. Highlighted code uses Pygments CSS classes
+prefixed with "hl" (see highlight_css()).
+
+nh3, markdown-it and Pygments are imported on first use, so importing the
+app does not pay for them.
+"""
+import html
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Set
+
+HIGHLIGHT_CLASS = "hl"
+
+ALLOWED_TAGS = {
+    "a", "abbr", "b", "blockquote", "br", "code", "del", "div", "em", "h1", "h2",
+    "h3", "h4", "h5", "h6", "hr", "i", "img", "kbd", "li", "ol", "p", "pre", "s",
+    "span", "strong", "sub", "sup", "table", "tbody", "td", "th", "thead", "tr", "ul",
+}
+ALLOWED_ATTRIBUTES = {
+    "a": {"href", "title"},
+    "img": {"src", "alt", "title"},
+    "code": {"class"},
+    "pre": {"class"},
+    "span": {"class"},
+    "div": {"class"},
+    **{f"h{level}": {"id"} for level in range(1, 7)},
+}
+
+@lru_cache(maxsize=None)
+def _code_formatter():
+    from pygments.formatters import HtmlFormatter
+
+    return HtmlFormatter(nowrap=True, classprefix=f"{HIGHLIGHT_CLASS}-")
+
+
+def highlight_code(code: str, language: Optional[str]) -> str:
+    """A highlighted <pre> block; unknown languages are escaped as plain text"""
+    from pygments import highlight
+    from pygments.lexers import TextLexer, get_lexer_by_name
+    from pygments.util import ClassNotFound
+
+    try:
+        lexer = get_lexer_by_name(language or "text")
+    except ClassNotFound:
+        lexer = TextLexer()
+    language_class = f' class="language-{html.escape(language)}"' if language else ""
+    return (
+        f'<pre class="{HIGHLIGHT_CLASS}"><code{language_class}>'
+        f"{highlight(code, lexer, _code_formatter())}</code></pre>"
+    )
+
+
+def highlight_css() -> str:
+    """Stylesheet for highlighted code, scoped to its blocks"""
+    from pygments.formatters import HtmlFormatter
+
+    rules = HtmlFormatter(classprefix=f"{HIGHLIGHT_CLASS}-", style="monokai")\
+        .get_style_defs(f".{HIGHLIGHT_CLASS}").splitlines()
+    # Pygments also emits global pre/line-number rules that would restyle the page
+    return "\n".join(rule for rule in rules if rule.startswith(f".{HIGHLIGHT_CLASS}"))
+
+
+def _fence(code: str, language: str, attrs: str) -> str:
+    return highlight_code(code, language.strip() or None)
+
+
+@lru_cache(maxsize=None)
+def _parser():
+    from markdown_it import MarkdownIt
+
+    return MarkdownIt("commonmark", {"html": False, "highlight": _fence}).enable("table").enable("strikethrough")
+
+
+def sanitize(markup: str) -> str:
+    import nh3
+
+    return nh3.clean(
+        markup,
+        tags=ALLOWED_TAGS,
+        attributes=ALLOWED_ATTRIBUTES,
+        url_schemes={"http", "https", "mailto"},
+        link_rel="noopener noreferrer",
+    )
+
+
+def slugify_anchor(text: str, taken: Set[str]) -> str:
+    """A heading anchor that is unique among `taken`, which it is added to"""
+    base = re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-") or "section"
+    anchor, suffix = base, 2
+    while anchor in taken:
+        anchor, suffix = f"{base}-{suffix}", suffix + 1
+    taken.add(anchor)
+    return anchor
+
+
+def render_markdown(text: str, toc: List[Dict], anchors: Set[str], level_offset: int = 0) -> str:
+    """
+    Render Markdown to sanitized HTML, giving headings unique ids and
+    appending them to `toc` as {"level", "title", "anchor"}
+    """
+    md = _parser()
+    tokens = md.parse(text or "")
+    for index, token in enumerate(tokens):
+        if token.type != "heading_open":
+            continue
+        title = tokens[index + 1].content if index + 1 < len(tokens) else ""
+        anchor = slugify_anchor(title, anchors)
+        token.attrSet("id", anchor)
+        toc.append({"level": int(token.tag[1]) + level_offset, "title": title, "anchor": anchor})
+    return sanitize(md.renderer.render(tokens, md.options, {}))
@@ -0,0 +1,139 @@
+from fastapi import APIRouter, Body, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Callable, List
+
+from .. import schemas
+from ..database import get_db
+from ..auth.dependencies import get_admin_user
+from ..models import User
+from ..publishing import list_versions, publish, rollback
+from ..utils.catalog import refresh_catalog_version
+from ..utils.catalog_writes import (
+    CatalogChanges, create_courses, create_lessons, delete_lessons, finish_writes,
+    move_lessons, update_lessons
+)
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(get_admin_user)])
+
+MAX_BATCH = 1000
+
+
+def _write(db: Session, what: str, apply: Callable[[CatalogChanges, datetime], object]) -> dict:
+    """
+    Run one catalog write in a single transaction and report what it
+    changed. This worker moves to the new catalog version before
+    answering; the others pick it up on their next version poll. Once a
+    catalog is published, writes only change the draft and readers see
+    them after the next publish.
+    """
+    changes = CatalogChanges()
+    now = datetime.utcnow()
+    try:
+        apply(changes, now)
+        finish_writes(db, changes, now)
+        db.commit()
+    except HTTPException:
+        db.rollback()
+        raise
+    except Exception as e:
+        db.rollback()
+        print(f"Error in admin {what}: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Could not {what}")
+
+    try:
+        version = refresh_catalog_version(db)
+    except Exception as e:
+        print(f"Error refreshing catalog version after admin {what}: {str(e)}")
+        version = None
+    return changes.result(version)
+
+
+@router.post("/courses", response_model=schemas.CatalogWriteResult)
+def bulk_create_courses(
+    courses: List[schemas.CourseCreate] = Body(min_length=1, max_length=MAX_BATCH),
+    db: Session = Depends(get_db)
+):
+    """Create courses in one statement"""
+    return _write(db, "create courses", lambda changes, now: create_courses(db, courses, changes, now))
+
+
+@router.post("/lessons", response_model=schemas.CatalogWriteResult)
+def bulk_create_lessons(
+    lessons: List[schemas.LessonCreate] = Body(min_length=1, max_length=MAX_BATCH),
+    db: Session = Depends(get_db)
+):
+    """Create lessons in one statement; each is placed by its order"""
+    return _write(db, "create lessons", lambda changes, now: create_lessons(db, lessons, changes, now))
+
+
+@router.patch("/lessons", response_model=schemas.CatalogWriteResult)
+def bulk_update_lessons(
+    updates: List[schemas.LessonBulkUpdate] = Body(min_length=1, max_length=MAX_BATCH),
+    db: Session = Depends(get_db)
+):
+    """
+    Partially update lessons. Only the given fields are written, and
+    lessons they would not change are left alone.
+    """
+    return _write(db, "update lessons", lambda changes, now: update_lessons(db, updates, changes, now))
+
+
+@router.post("/lessons/delete", response_model=schemas.CatalogWriteResult)
+def bulk_delete_lessons(body: schemas.LessonIds, db: Session = Depends(get_db)):
+    """Delete lessons with their resources; unknown ids are ignored"""
+    return _write(db, "delete lessons", lambda changes, now: delete_lessons(db, body.ids, changes, now))
+
+
+@router.post("/lessons/reorder", response_model=schemas.CatalogWriteResult)
+def reorder_lessons(body: schemas.LessonReorder, db: Session = Depends(get_db)):
+    """
+    Move lessons within or between courses. A move rewrites only the
+    moved lesson's position, so reorganizing a course does not rewrite it.
+    """
+    return _write(db, "reorder lessons", lambda changes, now: move_lessons(db, body.moves, changes, now))
+
+
+def _move_pointer(db: Session, what: str, apply: Callable[[], dict]) -> dict:
+    """Publish or roll back, then move this worker to the version now served"""
+    try:
+        version = apply()
+    except HTTPException:
+        db.rollback()
+        raise
+    except Exception as e:
+        db.rollback()
+        print(f"Error in admin {what}: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Could not {what}")
+
+    try:
+        refresh_catalog_version(db)
+    except Exception as e:
+        print(f"Error refreshing catalog version after admin {what}: {str(e)}")
+    return version
+
+
+@router.get("/catalog/versions", response_model=List[schemas.CatalogVersionRead])
+def get_catalog_versions(limit: int = Query(20, ge=1, le=200), db: Session = Depends(get_db)):
+    """Published catalog versions, newest first"""
+    return list_versions(db, limit)
+
+
+@router.post("/catalog/publish", response_model=schemas.CatalogVersionRead)
+def publish_catalog(
+    body: schemas.CatalogPublish,
+    admin: User = Depends(get_admin_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Publish the draft catalog. Readers switch to it all at once; until
+    then they keep seeing the previous version, however many writes the
+    draft has had.
+    """
+    return _move_pointer(db, "publish catalog", lambda: publish(db, note=body.note, user_id=admin.id))
+
+
+@router.post("/catalog/rollback", response_model=schemas.CatalogVersionRead)
+def rollback_catalog(body: schemas.CatalogRollback, db: Session = Depends(get_db)):
+    """Serve an earlier version again (by default the published one's parent)"""
+    return _move_pointer(db, "roll back catalog", lambda: rollback(db, body.version_id))
@@ -0,0 +1,144 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+from sqlalchemy.orm import Session
+from typing import Any, Dict, Optional
+import hashlib
+
+from ..cache import cached_catalog, catalog_key
+from ..cache.responses import serialize_payload
+from ..database import get_db
+from ..models import Course, User
+from ..auth.dependencies import get_access_tier, get_optional_current_user
+from ..utils.catalog_index import get_catalog_index
+from ..utils.entitlements import redact_lessons
+from ..utils.http import etag_matches
+from ..utils.progress import ProgressTracker
+
+router = APIRouter(prefix="/courses", tags=["courses"])
+
+CATALOG_FIELDS = ("course", "lessons", "navigation")
+BUNDLE_FIELDS = CATALOG_FIELDS + ("progress",)
+
+
+def _link(id: int, title: str) -> Dict[str, Any]:
+    return {"id": id, "title": title}
+
+
+def _etag(catalog_hash: str, fields, tier: str) -> str:
+    # Only given to bodies without a user's progress: same catalog, parts
+    # and lesson locks, same bytes
+    return f'"{catalog_hash}-{".".join(fields)}-{tier}"'
+
+
+def _course_neighbours(db: Session, course_id: int) -> Dict[str, Optional[Dict[str, Any]]]:
+    index = get_catalog_index()
+    if index is not None:
+        courses = index.courses
+    else:
+        courses = db.query(Course.id, Course.title).order_by(Course.order, Course.id).all()
+    ids = [course.id for course in courses]
+    position = ids.index(course_id) if course_id in ids else None
+    if position is None:
+        return {"previous_course": None, "next_course": None}
+    return {
+        "previous_course": _link(courses[position - 1].id, courses[position - 1].title)
+        if position > 0 else None,
+        "next_course": _link(courses[position + 1].id, courses[position + 1].title)
+        if position + 1 < len(courses) else None,
+    }
+
+
+def _load_catalog_part(db: Session, course_id: int) -> Dict[str, Any]:
+    """The part of the bundle that is the same for everyone, with its ETag"""
+    # The catalog endpoints' loaders, so the bundle matches them
+    from ..main import _load_course, _load_course_lessons
+
+    course = _load_course(db, course_id)
+    lessons = [
+        # The outline leaves lesson bodies to the lesson page
+        {key: value for key, value in lesson.items() if key != "content"}
+        for lesson in _load_course_lessons(db, course_id, None, None)["lessons"]
+    ]
+    part = {
+        "course": course,
+        "lessons": lessons,
+        "navigation": {
+            "first_lesson": _link(lessons[0]["id"], lessons[0]["title"]) if lessons else None,
+            **_course_neighbours(db, course_id),
+        },
+    }
+    return {"part": part, "etag": hashlib.sha256(serialize_payload(part)).hexdigest()[:32]}
+
+
+def _parse_fields(fields: Optional[str]) -> tuple:
+    if fields is None:
+        return BUNDLE_FIELDS
+    selected = tuple(field.strip() for field in fields.split(",") if field.strip())
+    unknown = [field for field in selected if field not in BUNDLE_FIELDS]
+    if unknown or not selected:
+        raise HTTPException(
+            status_code=400,
+            detail=f"fields must be a comma-separated subset of {', '.join(BUNDLE_FIELDS)}"
+        )
+    # Canonical order, so equivalent selections share an ETag
+    return tuple(field for field in BUNDLE_FIELDS if field in selected)
+
+
+@router.get("/{course_id}/bundle")
+def get_course_bundle(
+    course_id: int,
+    request: Request,
+    fields: Optional[str] = Query(
+        default=None, description="Comma-separated parts to return: course, lessons, navigation, progress"
+    ),
+    current_user: Optional[User] = Depends(get_optional_current_user),
+    tier: str = Depends(get_access_tier),
+    db: Session = Depends(get_db)
+):
+    """
+    Everything the course page needs in one round trip: the course, its
+    lesson outline, navigation and, for a signed-in user, their progress
+    (null otherwise). Lessons the caller may not open are marked locked.
+
+    Responses without progress carry an ETag and answer If-None-Match
+    with 304. Responses with progress carry the catalog part's ETag in
+    X-Catalog-ETag (the ETag of fields=course,lessons,navigation), so a
+    client can keep the catalog part, revalidate it on its own and ask
+    for fields=progress alone.
+    """
+    selected = _parse_fields(fields)
+    try:
+        catalog = cached_catalog(
+            catalog_key("course_bundle", course_id),
+            lambda: _load_catalog_part(db, course_id)
+        )
+        body: Dict[str, Any] = {field: catalog["part"][field] for field in selected if field in CATALOG_FIELDS}
+        if "lessons" in body:
+            body["lessons"] = redact_lessons(db, body["lessons"], tier)
+        etag = _etag(catalog["etag"], selected, tier)
+
+        if "progress" not in selected or current_user is None:
+            if "progress" in selected:
+                body["progress"] = None
+            headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Authorization"}
+            if etag_matches(request.headers.get("if-none-match", ""), etag):
+                return Response(status_code=304, headers=headers)
+            return JSONResponse(jsonable_encoder(body), headers=headers)
+
+        lesson_order = [lesson["id"] for lesson in catalog["part"]["lessons"]]
+        body["progress"] = ProgressTracker(db).get_course_progress_detail(
+            user_id=current_user.id,
+            course_id=course_id,
+            lesson_order=lesson_order
+        )
+        return JSONResponse(jsonable_encoder(body), headers={
+            "X-Catalog-ETag": _etag(catalog["etag"], CATALOG_FIELDS, tier),
+            "Cache-Control": "private, no-store",
+            "Vary": "Authorization",
+        })
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error building bundle for course {course_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Could not load course")
@@ -0,0 +1,126 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, Dict, Any, Optional
+import asyncio
+import json
+import secrets
+
+from ..core.config import settings
+from ..database import SessionLocal
+from ..models import User
+from ..auth.dependencies import get_current_user, user_from_token
+from ..cache import get_cache
+from ..realtime import get_broker
+
+router = APIRouter(tags=["events"])
+
+def _ticket_key(ticket: str) -> str:
+    return f"events:ticket:{ticket}"
+
+def _authenticate(authorization: Optional[str], ticket: Optional[str]) -> Optional[int]:
+    """
+    The user id behind an Authorization header or a one-time ticket.
+    Bearer tokens are never accepted in the URL, where access logs and
+    proxies would keep them.
+    """
+    if ticket:
+        # Atomic, so two connections racing with one ticket cannot both use it
+        return get_cache().pop(_ticket_key(ticket))
+    if not authorization or not authorization.lower().startswith("bearer "):
+        return None
+    # A short-lived session: streams stay open for hours and must not pin a pooled connection
+    db = SessionLocal()
+    try:
+        user = user_from_token(authorization[7:], db)
+        return user.id if user is not None else None
+    finally:
+        db.close()
+
+@router.post("/events/ticket")
+def create_events_ticket(current_user: User = Depends(get_current_user)):
+    """
+    A one-time ticket for opening /events or /ws from a browser, which
+    cannot set headers on EventSource or WebSocket. It is valid for
+    settings.REALTIME_TICKET_SECONDS and is safe to put in the URL.
+    """
+    ticket = secrets.token_urlsafe(24)
+    get_cache().set(_ticket_key(ticket), current_user.id, settings.REALTIME_TICKET_SECONDS)
+    return {"ticket": ticket, "expires_in": settings.REALTIME_TICKET_SECONDS}
+
+def _format_sse(event: Dict[str, Any]) -> str:
+    lines = [f"event: {event['type']}"]
+    if event.get("id") is not None:
+        lines.append(f"id: {event['id']}")
+    lines.append(f"data: {json.dumps(event['data'], default=str)}")
+    return "\n".join(lines) + "\n\n"
+
+async def _sse_stream(request: Request, user_id: int, last_event_id: Optional[int]) -> AsyncIterator[str]:
+    # Subscribed once the response starts streaming, so a response that never
+    # starts (the client left first) leaves no subscription behind
+    subscription = get_broker().subscribe(user_id, last_event_id)
+    try:
+        yield "retry: 5000\n\n"
+        while not await request.is_disconnected():
+            event = await subscription.get(timeout=settings.REALTIME_HEARTBEAT_SECONDS)
+            # Comments keep proxies from closing an idle stream
+            yield _format_sse(event) if event is not None else ": keep-alive\n\n"
+    finally:
+        get_broker().unsubscribe(subscription)
+
+@router.get("/events")
+async def stream_events(
+    request: Request,
+    ticket: Optional[str] = Query(default=None),
+    authorization: Optional[str] = Header(default=None),
+    last_event_id: Optional[int] = Header(default=None)
+):
+    """
+    Server-Sent Events stream of the user's progress, code-run and grading
+    events. EventSource cannot set headers, so browsers pass a ticket from
+    POST /events/ticket as ?ticket=. Reconnects resume after Last-Event-ID.
+    """
+    user_id = await run_in_threadpool(_authenticate, authorization, ticket)
+    if user_id is None:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+
+    return StreamingResponse(
+        _sse_stream(request, user_id, last_event_id),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",  # disable proxy buffering (nginx)
+        }
+    )
+
+@router.websocket("/ws")
+async def events_websocket(websocket: WebSocket, ticket: Optional[str] = None):
+    """
+    WebSocket fallback carrying the same events as /events, one JSON
+    object per message. Authenticates like /events.
+    """
+    user_id = await run_in_threadpool(_authenticate, websocket.headers.get("authorization"), ticket)
+    if user_id is None:
+        await websocket.close(code=1008)
+        return
+
+    await websocket.accept()
+    subscription = get_broker().subscribe(user_id)
+
+    async def drain_client() -> None:
+        # Clients do not send anything meaningful; reading detects disconnects
+        while True:
+            await websocket.receive_text()
+
+    reader = asyncio.create_task(drain_client())
+    try:
+        while not reader.done():
+            event = await subscription.get(timeout=settings.REALTIME_HEARTBEAT_SECONDS)
+            await websocket.send_json(
+                event if event is not None else {"type": "ping"}, mode="text"
+            )
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        reader.cancel()
+        get_broker().unsubscribe(subscription)
@@ -0,0 +1,70 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from .. import schemas
+from ..database import get_db
+from ..models import Lesson, User
+from ..auth.dependencies import get_current_user
+from ..execution import ExecutionRejected, get_execution_service
+from ..utils.catalog_index import get_catalog_index
+from ..utils.entitlements import lesson_locked, tier_for_user
+from ..realtime import publish
+
+router = APIRouter(tags=["execution"])
+
+def _load_code_samples(db: Session, lesson_id: int, tier: str) -> list:
+    """The lesson's code samples, or the HTTP error to answer with; runs in the threadpool"""
+    catalog = get_catalog_index()
+    row = catalog.lesson(lesson_id) if catalog is not None else db.query(Lesson.code_samples)\
+        .filter(Lesson.id == lesson_id)\
+        .first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Lesson not found")
+    if lesson_locked(db, tier, lesson_id):
+        raise HTTPException(status_code=403, detail="This lesson requires premium access")
+    return row.code_samples or []
+
+@router.post("/lessons/{lesson_id}/run", response_model=schemas.CodeRunResult)
+async def run_lesson_code(
+    lesson_id: int,
+    run: schemas.CodeRunRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Run one of a lesson's code samples, as written or as edited by the
+    learner, in the sandbox. Output of unmodified samples is served from
+    the result cache.
+    """
+    # Database work stays off the event loop
+    samples = await run_in_threadpool(_load_code_samples, db, lesson_id, tier_for_user(current_user))
+    if run.sample_index >= len(samples):
+        raise HTTPException(status_code=404, detail="Code sample not found")
+
+    sample = samples[run.sample_index]
+    code = run.code if run.code is not None else sample.get("code", "")
+    cacheable = code.strip() == (sample.get("code") or "").strip()
+
+    try:
+        result = await get_execution_service().run(
+            user_id=current_user.id,
+            code=code,
+            language=sample.get("language"),
+            engine_name=run.engine,
+            cacheable=cacheable
+        )
+    except ExecutionRejected as e:
+        headers = {"Retry-After": str(e.retry_after)} if e.retry_after else None
+        raise HTTPException(status_code=e.status_code, detail=e.detail, headers=headers)
+    except Exception as e:
+        print(f"Error running code for lesson {lesson_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Could not run code")
+
+    # Other tabs and devices of the same learner see the output too
+    publish(current_user.id, "run", {
+        "lesson_id": lesson_id,
+        "sample_index": run.sample_index,
+        "result": result
+    })
+    return result
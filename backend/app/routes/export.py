@@ -0,0 +1,146 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from typing import Iterator, Optional
+from datetime import datetime
+import json
+import zlib
+
+from ..database import SessionLocal
+from ..models import Lesson, User, UserProgress
+from ..auth.dependencies import get_admin_user
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+# Rows fetched per round trip from the server-side cursor
+EXPORT_BATCH_SIZE = 1000
+
+LESSON_EXPORT_COLUMNS = (
+    Lesson.id,
+    Lesson.course_id,
+    Lesson.title,
+    Lesson.description,
+    Lesson.summary,
+    Lesson.content,
+    Lesson.content_sections,
+    Lesson.code_samples,
+    Lesson.key_points,
+    Lesson.order,
+    Lesson.sort_key,
+    Lesson.difficulty,
+    Lesson.lesson_type,
+    Lesson.content_format,
+    Lesson.estimated_time,
+    Lesson.learning_objectives,
+    Lesson.is_premium,
+    Lesson.created_at,
+    Lesson.updated_at,
+)
+
+PROGRESS_EXPORT_COLUMNS = (
+    UserProgress.id,
+    UserProgress.user_id,
+    UserProgress.lesson_id,
+    UserProgress.is_completed,
+    UserProgress.completed_at,
+    UserProgress.created_at,
+    UserProgress.updated_at,
+)
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def _stream_ndjson(statement, gzip: bool) -> Iterator[bytes]:
+    """
+    Stream rows of a select as NDJSON in constant memory.
+    Runs in Starlette's threadpool and owns its own session, since the
+    request-scoped session is closed before the body is streamed.
+    """
+    db = SessionLocal()
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if gzip else None
+    try:
+        result = db.execute(
+            statement.execution_options(stream_results=True, yield_per=EXPORT_BATCH_SIZE)
+        )
+        for rows in result.mappings().partitions():
+            chunk = "".join(
+                json.dumps(dict(row), default=_json_default) + "\n"
+                for row in rows
+            ).encode()
+            if compressor:
+                chunk = compressor.compress(chunk)
+            if chunk:
+                yield chunk
+        if compressor:
+            yield compressor.flush()
+    except Exception as e:
+        # Headers are already sent; truncating the stream is all we can do
+        print(f"Error streaming export: {str(e)}")
+        raise
+    finally:
+        db.close()
+
+
+def _export_response(statement, filename: str, gzip: bool) -> StreamingResponse:
+    headers = {
+        "Content-Disposition": f'attachment; filename="{filename}"',
+        # Pass this back as updated_since on the next incremental pull
+        "X-Export-Started-At": datetime.utcnow().isoformat(),
+    }
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+
+    return StreamingResponse(
+        _stream_ndjson(statement, gzip),
+        media_type="application/x-ndjson",
+        headers=headers
+    )
+
+
+@router.get("/lessons.ndjson")
+def export_lessons(
+    updated_since: Optional[datetime] = None,
+    after_id: int = 0,
+    course_id: Optional[int] = None,
+    gzip: bool = False,
+    current_user: User = Depends(get_admin_user)
+):
+    """
+    Export the lesson catalog as NDJSON, one lesson per line ordered by id.
+    To resume an interrupted export pass the id of the last complete line
+    as after_id; for incremental pulls pass updated_since.
+    """
+    statement = select(*LESSON_EXPORT_COLUMNS)\
+        .where(Lesson.id > after_id)\
+        .order_by(Lesson.id)
+    if updated_since is not None:
+        statement = statement.where(Lesson.updated_at >= updated_since)
+    if course_id is not None:
+        statement = statement.where(Lesson.course_id == course_id)
+
+    return _export_response(statement, "lessons.ndjson", gzip)
+
+
+@router.get("/progress.ndjson")
+def export_progress(
+    updated_since: Optional[datetime] = None,
+    after_id: int = 0,
+    gzip: bool = False,
+    current_user: User = Depends(get_admin_user)
+):
+    """
+    Export all user progress as NDJSON, one record per line ordered by id.
+    Supports the same after_id checkpoints and updated_since filter as the
+    lesson export.
+    """
+    statement = select(*PROGRESS_EXPORT_COLUMNS)\
+        .where(UserProgress.id > after_id)\
+        .order_by(UserProgress.id)
+    if updated_since is not None:
+        statement = statement.where(UserProgress.updated_at >= updated_since)
+
+    return _export_response(statement, "progress.ndjson", gzip)
@@ -0,0 +1,78 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from .. import schemas
+from ..database import get_db
+from ..models import Lesson, User
+from ..auth.dependencies import get_current_user
+from ..execution import ExecutionRejected
+from ..grading import GradingError, get_grading_service, load_exercise_spec
+from ..utils.catalog_index import get_catalog_index
+from ..utils.entitlements import lesson_locked, tier_for_user
+from ..utils.progress import ProgressTracker
+from ..realtime import publish
+
+router = APIRouter(tags=["grading"])
+
+def _load_exercise(db: Session, lesson_id: int, tier: str) -> schemas.ExerciseSpec:
+    """The lesson's exercise, or the HTTP error to answer with; runs in the threadpool"""
+    catalog = get_catalog_index()
+    row = catalog.lesson(lesson_id) if catalog is not None else db.query(Lesson.interactive_elements)\
+        .filter(Lesson.id == lesson_id)\
+        .first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Lesson not found")
+    if lesson_locked(db, tier, lesson_id):
+        raise HTTPException(status_code=403, detail="This lesson requires premium access")
+
+    try:
+        spec = load_exercise_spec(row.interactive_elements)
+    except ValueError as e:
+        print(f"Invalid exercise on lesson {lesson_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail="This exercise is misconfigured")
+    if spec is None:
+        raise HTTPException(status_code=404, detail="This lesson has no exercise")
+    return spec
+
+@router.post("/lessons/{lesson_id}/submit", response_model=schemas.GradingResult)
+async def submit_exercise(
+    lesson_id: int,
+    submission: schemas.ExerciseSubmission,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Grade a solution to the lesson's exercise. Passing every test marks
+    the lesson complete.
+    """
+    # Database work stays off the event loop
+    spec = await run_in_threadpool(_load_exercise, db, lesson_id, tier_for_user(current_user))
+
+    try:
+        result = await get_grading_service().grade(current_user.id, spec, submission.code)
+    except ExecutionRejected as e:
+        headers = {"Retry-After": str(e.retry_after)} if e.retry_after else None
+        raise HTTPException(status_code=e.status_code, detail=e.detail, headers=headers)
+    except GradingError as e:
+        print(f"Grading failed for lesson {lesson_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail="This exercise is misconfigured")
+
+    if result["passed"]:
+        try:
+            result["progress"] = await run_in_threadpool(
+                ProgressTracker(db).update_lesson_progress,
+                user_id=current_user.id,
+                lesson_id=lesson_id,
+                is_completed=True
+            )
+        except Exception as e:
+            print(f"Error recording progress for lesson {lesson_id}: {str(e)}")
+            db.rollback()
+
+    publish(current_user.id, "grading", {
+        "lesson_id": lesson_id,
+        "passed": result["passed"],
+        "score": result.get("score")
+    })
+    return result
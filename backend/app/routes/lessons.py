@@ -1,11 +1,11 @@
 # backend/app/routes/lessons.py
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from typing import Optional
 
 from ..database import get_db
 from ..models import Lesson, User
-from ..auth.dependencies import get_current_user, get_optional_current_user
+from ..auth.dependencies import get_access_tier, get_current_user
+from ..utils.entitlements import lesson_locked
 from .. import schemas
 
 router = APIRouter(prefix="/lessons", tags=["lessons"])
@@ -14,7 +14,7 @@ router = APIRouter(prefix="/lessons", tags=["lessons"])
 async def get_lesson(
     lesson_id: int,
     db: Session = Depends(get_db),
-    current_user: Optional[User] = Depends(get_optional_current_user)
+    tier: str = Depends(get_access_tier)
 ):
     """
     Get lesson by ID. Premium lessons require authentication.
@@ -24,7 +24,7 @@ async def get_lesson(
         raise HTTPException(status_code=404, detail="Lesson not found")
     
     # Check premium access
-    if lesson.is_premium and (not current_user or not current_user.is_premium):
+    if lesson_locked(db, tier, lesson_id):
         raise HTTPException(
             status_code=403,
             detail="This lesson requires premium access"
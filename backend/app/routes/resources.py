@@ -0,0 +1,107 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import FileResponse, Response
+from sqlalchemy.orm import Session
+from urllib.parse import quote
+import os
+
+from ..core.config import settings
+from ..database import get_db
+from ..models import Resource
+from ..auth.dependencies import get_access_tier
+from ..storage import INLINE_MEDIA_TYPE, get_blob_store
+from ..utils.catalog_index import get_catalog_index
+from ..utils.entitlements import TIER_ANONYMOUS, lesson_locked
+from ..utils.http import etag_matches
+
+router = APIRouter(prefix="/resources", tags=["resources"])
+
+# Larger reads than FileResponse's 64KB default for datasets and videos
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Shown in the browser rather than saved
+INLINE_MEDIA_PREFIXES = ("video/", "audio/", "image/", "text/", "application/pdf")
+
+
+def _content_disposition(disposition: str, filename: str) -> str:
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"{disposition}; filename*=utf-8''{quoted}"
+    return f'{disposition}; filename="{filename}"'
+
+
+@router.api_route("/{resource_id}/download", methods=["GET", "HEAD"])
+def download_resource(
+    resource_id: int,
+    request: Request,
+    tier: str = Depends(get_access_tier),
+    db: Session = Depends(get_db)
+):
+    """
+    Download a resource's file. Supports Range requests (resumable
+    downloads, video seeking) and conditional requests on the ETag, which
+    is the content hash and so never changes for the same bytes.
+    """
+    try:
+        catalog = get_catalog_index()
+        row = catalog.resource(resource_id) if catalog is not None else db.query(
+            Resource.blob_hash, Resource.content, Resource.media_type, Resource.filename,
+            Resource.title, Resource.lesson_id
+        ).filter(Resource.id == resource_id).first()
+        if row is None:
+            raise HTTPException(status_code=404, detail="Resource not found")
+        if lesson_locked(db, tier, row.lesson_id):
+            raise HTTPException(status_code=403, detail="This resource requires premium access")
+
+        # Premium files must not be kept by shared caches
+        premium = lesson_locked(db, TIER_ANONYMOUS, row.lesson_id)
+        cache_control = "private, no-cache" if premium else "public, no-cache"
+
+        if row.blob_hash is None:
+            # Not offloaded yet (python -m app.storage offload)
+            if row.content is None:
+                raise HTTPException(status_code=404, detail="Resource has no content")
+            return Response(
+                row.content, media_type=INLINE_MEDIA_TYPE, headers={"Cache-Control": cache_control}
+            )
+
+        etag = f'"{row.blob_hash}"'
+        headers = {"ETag": etag, "Cache-Control": cache_control}
+        if etag_matches(request.headers.get("if-none-match", ""), etag):
+            return Response(status_code=304, headers=headers)
+
+        media_type = row.media_type or "application/octet-stream"
+        filename = row.filename or row.title
+        disposition = "inline" if media_type.startswith(INLINE_MEDIA_PREFIXES) else "attachment"
+
+        store = get_blob_store()
+        if settings.BLOB_ACCEL_REDIRECT_PREFIX:
+            # nginx serves the file (sendfile, ranges) from an internal location
+            return Response(media_type=media_type, headers={
+                **headers,
+                "Content-Disposition": _content_disposition(disposition, filename),
+                "X-Accel-Redirect": f"{settings.BLOB_ACCEL_REDIRECT_PREFIX.rstrip('/')}/"
+                                    f"{store.relative_path(row.blob_hash)}",
+            })
+
+        path = store.path(row.blob_hash)
+        try:
+            stat_result = os.stat(path)
+        except FileNotFoundError:
+            print(f"Blob {row.blob_hash} for resource {resource_id} is missing from the store")
+            raise HTTPException(status_code=404, detail="Resource file not found")
+
+        response = FileResponse(
+            path,
+            media_type=media_type,
+            filename=filename,
+            content_disposition_type=disposition,
+            headers=headers,
+            stat_result=stat_result,
+        )
+        response.chunk_size = DOWNLOAD_CHUNK_SIZE
+        return response
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error downloading resource {resource_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Could not download resource")
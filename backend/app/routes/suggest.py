@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Query
+
+from ..utils.suggest import get_suggest_index
+
+router = APIRouter(tags=["search"])
+
+@router.get("/suggest")
+async def suggest(
+    q: str = "",
+    limit: int = Query(default=8, ge=1, le=20)
+):
+    """
+    Typeahead suggestions for course and lesson titles.
+    Served entirely from the in-memory index; never touches the database.
+    """
+    index = get_suggest_index()
+    if index is None:
+        return {"query": q, "suggestions": []}
+
+    return {
+        "query": q,
+        "suggestions": index.suggest(q, limit=limit)
+    }
@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+
+from .. import schemas
+from ..database import get_db
+from ..models import User
+from ..auth.dependencies import get_current_user
+from ..utils.entitlements import tier_for_user
+from ..utils.sync import build_sync
+
+router = APIRouter(tags=["sync"])
+
+@router.get("/sync", response_model=schemas.SyncResponse)
+def sync(
+    since: Optional[str] = Query(default=None, description="Token from the previous sync"),
+    limit: int = Query(default=500, ge=1, le=2000),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Catalog and progress changes since the last sync, for offline-capable
+    clients. Call without `since` for the initial download.
+    """
+    try:
+        return build_sync(db, current_user.id, since, limit, tier=tier_for_user(current_user))
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error building sync for user {current_user.id}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Could not sync")
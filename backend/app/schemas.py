@@ -2,25 +2,30 @@
 from pydantic import BaseModel, EmailStr, Field, field_validator, model_validator
 from typing import List, Optional, Dict, Any
 from datetime import datetime
-from .models import DifficultyLevel, LessonType
-import json
+from .models import DifficultyLevel, LessonType, ContentFormat, CourseCategory
 
+# Lesson bodies are validated against these when written and stored as
+# native JSON, so reads pass the stored lists through unchanged
 class ContentSection(BaseModel):
     title: str
     content: str
     order: int
     type: str  # 'text', 'code', 'exercise', etc.
 
+    model_config = {"extra": "forbid"}
+
 class CodeSample(BaseModel):
     title: str
     code: str
     language: str
     description: Optional[str] = None
 
+    model_config = {"extra": "forbid"}
+
 class ResourceBase(BaseModel):
     title: str
     type: str
-    content: str
+    content: Optional[str] = None
     description: Optional[str] = None
 
 class ResourceCreate(ResourceBase):
@@ -40,8 +45,8 @@ class LessonBase(BaseModel):
     description: str
     summary: str
     content: str
-    content_sections: Optional[List[Dict[str, Any]]] = []
-    code_samples: Optional[List[Dict[str, Any]]] = []
+    content_sections: List[ContentSection] = []
+    code_samples: List[CodeSample] = []
     key_points: Optional[str] = None
     order: int
     difficulty: DifficultyLevel
@@ -60,8 +65,8 @@ class LessonUpdate(BaseModel):
     description: Optional[str] = None
     summary: Optional[str] = None
     content: Optional[str] = None
-    content_sections: Optional[List[Dict[str, Any]]] = None
-    code_samples: Optional[List[Dict[str, Any]]] = None
+    content_sections: Optional[List[ContentSection]] = None
+    code_samples: Optional[List[CodeSample]] = None
     key_points: Optional[str] = None
     order: Optional[int] = None
     difficulty: Optional[DifficultyLevel] = None
@@ -72,11 +77,76 @@ class LessonUpdate(BaseModel):
     is_premium: Optional[bool] = None
     prerequisite_ids: Optional[List[int]] = None
 
+class LessonBulkUpdate(LessonUpdate):
+    id: int
+
+class LessonMove(BaseModel):
+    """
+    Place a lesson right after `after_id` or right before `before_id`, or
+    at the end of the course when neither is given. With `course_id` the
+    lesson moves to that course.
+    """
+    lesson_id: int
+    course_id: Optional[int] = None
+    after_id: Optional[int] = None
+    before_id: Optional[int] = None
+
+    @model_validator(mode='after')
+    def check_anchor(self):
+        if self.after_id is not None and self.before_id is not None:
+            raise ValueError("give after_id or before_id, not both")
+        if self.lesson_id in (self.after_id, self.before_id):
+            raise ValueError("a lesson cannot be placed next to itself")
+        return self
+
+class LessonReorder(BaseModel):
+    moves: List[LessonMove] = Field(min_length=1, max_length=1000)
+
+class LessonIds(BaseModel):
+    ids: List[int] = Field(min_length=1, max_length=1000)
+
+class EntityChanges(BaseModel):
+    created: List[int] = []
+    updated: List[int] = []
+    deleted: List[int] = []
+
+class CatalogWriteResult(BaseModel):
+    courses: EntityChanges
+    lessons: EntityChanges
+    resources: EntityChanges
+    # API paths whose responses changed, for purging caches in front of the API
+    paths: List[str]
+    # Catalog version after the write; this worker's caches and indexes already use it
+    catalog_version: Optional[str] = None
+
+class CatalogPublish(BaseModel):
+    note: Optional[str] = Field(default=None, max_length=500)
+
+class CatalogRollback(BaseModel):
+    # Default: the published version's parent
+    version_id: Optional[int] = None
+
+class CatalogVersionRead(BaseModel):
+    id: int
+    version: str
+    parent_id: Optional[int] = None
+    change_id: int
+    note: Optional[str] = None
+    published_by: Optional[int] = None
+    created_at: Optional[datetime] = None
+    published: bool
+    rows: Dict[str, int]
+    # publish only: False when the draft had not changed
+    created: Optional[bool] = None
+    # publish only: rows copied from the draft per entity
+    rewritten: Optional[Dict[str, int]] = None
+
 class LessonRead(BaseModel):
     id: int
     title: str
     description: str
-    content: str
+    # None, with no sections or samples, when the lesson is locked
+    content: Optional[str]
     content_sections: List[Dict[str, Any]] = []
     code_samples: List[Dict[str, Any]] = []
     key_points: Optional[str] = None
@@ -88,32 +158,15 @@ class LessonRead(BaseModel):
     is_premium: bool
     course_id: int
     prerequisites: List[int] = []
-
-    @field_validator('content_sections', mode='before')
-    @classmethod
-    def parse_content_sections(cls, v):
-        if isinstance(v, str):
-            try:
-                return json.loads(v)
-            except json.JSONDecodeError:
-                return []
-        return v
-
-    @field_validator('code_samples', mode='before')
-    @classmethod
-    def parse_code_samples(cls, v):
-        if isinstance(v, str):
-            try:
-                return json.loads(v)
-            except json.JSONDecodeError:
-                return []
-        return v
+    locked: bool = False
 
     @field_validator('prerequisites', mode='before')
     @classmethod
     def parse_prerequisites(cls, v):
         if v and isinstance(v, list):
-            return [prereq.id for prereq in v if hasattr(prereq, 'id')]
+            # Lesson objects from the ORM, or ids from the in-memory catalog
+            return [prereq if isinstance(prereq, int) else prereq.id
+                    for prereq in v if isinstance(prereq, int) or hasattr(prereq, 'id')]
         return []
 
     @field_validator('difficulty', mode='before')
@@ -139,6 +192,39 @@ class CourseBase(BaseModel):
 class CourseCreate(CourseBase):
     pass
 
+class ResourceImport(BaseModel):
+    slug: Optional[str] = None
+    title: str
+    type: str
+    # Inline text, or a file (relative to the lesson file) such as a dataset or video
+    content: Optional[str] = None
+    file: Optional[str] = None
+    description: Optional[str] = None
+
+    @model_validator(mode='after')
+    def check_source(self):
+        if (self.content is None) == (self.file is None):
+            raise ValueError("a resource needs exactly one of content or file")
+        return self
+
+class LessonImport(LessonBase):
+    """A lesson as authored in the content directory, keyed by a stable slug"""
+    slug: str
+    summary: Optional[str] = None
+    content_format: ContentFormat = ContentFormat.TEXT
+    prerequisites: List[str] = []  # slugs of prerequisite lessons
+    resources: List[ResourceImport] = []
+
+class CourseImport(CourseBase):
+    """A course as authored in the content directory, keyed by a stable slug"""
+    slug: str
+    category: CourseCategory = CourseCategory.SPARK
+    tags: List[str] = []
+    prerequisites: List[str] = []
+    target_audience: Optional[str] = None
+    learning_outcomes: List[str] = []
+    lessons: List[LessonImport] = []
+
 class CourseRead(CourseBase):
     id: int
     created_at: datetime
@@ -159,10 +245,45 @@ class UserProgressRead(UserProgressBase):
     id: int
     user_id: int
     completed_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
 
+class ProgressUpdate(BaseModel):
+    lesson_id: int
+    is_completed: bool = True
+    # When the change happened on the client; the latest change wins
+    client_timestamp: datetime
+
+class ProgressBatchRequest(BaseModel):
+    updates: List[ProgressUpdate] = Field(min_length=1, max_length=500)
+
+class ProgressUpdateResult(BaseModel):
+    lesson_id: int
+    # "applied", "stale" (a newer change is already stored) or "not_found"
+    status: str
+    progress: Optional[UserProgressRead] = None
+
+class ProgressBatchResult(BaseModel):
+    results: List[ProgressUpdateResult]
+
+class SyncChanges(BaseModel):
+    upserted: List[Dict[str, Any]] = []
+    deleted: List[int] = []
+
+class SyncResponse(BaseModel):
+    # Pass back as ?since= on the next sync
+    token: str
+    # True when the client must replace its local copy instead of merging
+    reset: bool
+    # More changes are waiting; sync again right away
+    has_more: bool
+    courses: SyncChanges
+    lessons: SyncChanges
+    resources: SyncChanges
+    progress: List[UserProgressRead]
+
 class UserBase(BaseModel):
     username: str = Field(min_length=3, max_length=50)
     email: EmailStr
@@ -182,4 +303,55 @@ class UserRead(UserBase):
 class UserUpdate(BaseModel):
     username: Optional[str] = Field(default=None, min_length=3, max_length=50)
     email: Optional[EmailStr] = None
-    is_active: Optional[bool] = None
\ No newline at end of file
+    is_active: Optional[bool] = None
+
+class CodeRunRequest(BaseModel):
+    """Run a lesson's code sample, or an edited version of it"""
+    code: Optional[str] = Field(default=None, max_length=50_000)
+    sample_index: int = Field(default=0, ge=0)
+    engine: Optional[str] = None
+
+class CodeRunResult(BaseModel):
+    status: str  # 'ok', 'error', 'timeout', 'memory_limit', 'file_limit', 'killed', 'crashed'
+    stdout: str = ""
+    stderr: str = ""
+    error: Optional[str] = None
+    truncated: bool = False
+    duration_ms: float = 0
+    engine: str
+    cached: bool = False
+    stages: Optional[List[Dict[str, Any]]] = None  # Spark stage timings
+
+class ExerciseTest(BaseModel):
+    """One check: `expression` is evaluated after the submission runs"""
+    name: str
+    expression: str
+    setup: Optional[str] = None  # statements run before the expression
+    expected: Optional[Any] = None  # defaults to the reference solution's value
+    tolerance: Optional[float] = None  # for numeric comparisons
+    hidden: bool = False  # do not reveal expected/actual values
+
+class ExerciseSpec(BaseModel):
+    """Stored under interactive_elements["exercise"] on exercise lessons"""
+    reference_solution: Optional[str] = None
+    tests: List[ExerciseTest] = Field(min_length=1)
+    engine: Optional[str] = None  # e.g. "spark"; defaults to plain Python
+
+class ExerciseSubmission(BaseModel):
+    code: str = Field(max_length=50_000)
+
+class ExerciseTestResult(BaseModel):
+    name: str
+    passed: bool
+    status: str
+    expected: Optional[Any] = None
+    actual: Optional[Any] = None
+    error: Optional[str] = None
+    duration_ms: float = 0
+
+class GradingResult(BaseModel):
+    passed: bool
+    score: float
+    tests: List[ExerciseTestResult]
+    cached: bool = False
+    progress: Optional[UserProgressRead] = None
@@ -0,0 +1,232 @@
+"""
+Production server for the Spark Tutorial API.
+
+    python -m app.serve --workers 4 --preload --max-requests 5000
+
+A small pre-fork supervisor: the master binds the listening socket,
+optionally imports the app once so workers share its memory, and forks N
+uvicorn workers that accept on the shared socket. Workers are recycled
+after a jittered number of requests, crashed workers are replaced, and
+SIGTERM/SIGINT drain in-flight requests before exiting.
+"""
+import argparse
+import os
+import random
+import signal
+import socket
+import sys
+import time
+from typing import Dict
+
+APP_PATH = "app.main:app"
+
+# A worker that dies this soon after starting counts as a crash, not a recycle
+MIN_WORKER_LIFETIME_SECONDS = 2.0
+
+
+def default_workers() -> int:
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    return int(os.getenv("WEB_CONCURRENCY", cpus))
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the API with multiple worker processes")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=default_workers(),
+                        help="worker processes (default: CPUs available, or WEB_CONCURRENCY)")
+    parser.add_argument("--preload", action="store_true",
+                        help="import the app in the master before forking workers")
+    parser.add_argument("--max-requests", type=int, default=int(os.getenv("MAX_REQUESTS", "0")),
+                        help="recycle a worker after this many requests (0 disables)")
+    parser.add_argument("--max-requests-jitter", type=int,
+                        default=int(os.getenv("MAX_REQUESTS_JITTER", "0")),
+                        help="random extra requests per worker so they do not recycle together")
+    parser.add_argument("--graceful-timeout", type=int, default=int(os.getenv("GRACEFUL_TIMEOUT", "30")),
+                        help="seconds to drain in-flight requests on shutdown")
+    parser.add_argument("--backlog", type=int, default=2048)
+    parser.add_argument("--log-level", default=os.getenv("LOG_LEVEL", "info"))
+    parser.add_argument("--no-access-log", action="store_true")
+    return parser.parse_args(argv)
+
+
+def bind_socket(host: str, port: int, backlog: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def describe_event_loop() -> str:
+    """
+    uvicorn's "auto" settings pick uvloop and httptools when installed
+    """
+    parts = []
+    for module, fallback in (("uvloop", "asyncio"), ("httptools", "h11")):
+        try:
+            __import__(module)
+            parts.append(module)
+        except ImportError:
+            parts.append(fallback)
+    return " + ".join(parts)
+
+
+def run_worker(sock: socket.socket, args: argparse.Namespace, app) -> None:
+    """
+    Body of a forked worker; never returns
+    """
+    import uvicorn
+
+    # Default signal handling; uvicorn installs its own graceful handlers
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    random.seed()
+
+    # Pooled connections inherited from the master must not be shared
+    # across processes; drop them without closing the parent's sockets
+    from .database import engine
+    engine.dispose(close=False)
+
+    limit = None
+    if args.max_requests > 0:
+        limit = args.max_requests + random.randint(0, max(args.max_requests_jitter, 0))
+
+    config = uvicorn.Config(
+        app if app is not None else APP_PATH,
+        loop="auto",
+        http="auto",
+        lifespan="on",
+        log_level=args.log_level,
+        access_log=not args.no_access_log,
+        limit_max_requests=limit,
+        timeout_graceful_shutdown=args.graceful_timeout,
+    )
+    server = uvicorn.Server(config)
+    exit_code = 0
+    try:
+        server.run(sockets=[sock])
+    except Exception as e:
+        print(f"Worker {os.getpid()} crashed: {str(e)}")
+        exit_code = 1
+    finally:
+        os._exit(exit_code)
+
+
+class Supervisor:
+    """
+    Forks and babysits worker processes
+    """
+    def __init__(self, args: argparse.Namespace, sock: socket.socket, app=None):
+        self.args = args
+        self.sock = sock
+        self.app = app
+        self.workers: Dict[int, float] = {}  # pid -> start time
+        self.stopping = False
+        self.crash_backoff = 0.0
+
+    def spawn(self) -> None:
+        pid = os.fork()
+        if pid == 0:
+            run_worker(self.sock, self.args, self.app)
+        self.workers[pid] = time.monotonic()
+        print(f"Started worker {pid}")
+
+    def handle_stop(self, signum, frame) -> None:
+        if not self.stopping:
+            print(f"Received {signal.Signals(signum).name}; draining workers...")
+        self.stopping = True
+
+    def reap(self) -> None:
+        while self.workers:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                self.workers.clear()
+                return
+            if pid == 0:
+                return
+
+            started = self.workers.pop(pid, None)
+            if started is None:
+                continue
+            code = os.waitstatus_to_exitcode(status)
+            lifetime = time.monotonic() - started
+
+            if self.stopping:
+                print(f"Worker {pid} exited ({code})")
+            elif code == 0 and lifetime >= MIN_WORKER_LIFETIME_SECONDS:
+                print(f"Worker {pid} recycled after {lifetime:.0f}s")
+                self.crash_backoff = 0.0
+            else:
+                # Back off so a broken deploy does not fork-bomb the host
+                self.crash_backoff = min(max(self.crash_backoff * 2, 0.5), 30.0)
+                print(f"Worker {pid} died ({code}); restarting in {self.crash_backoff:.1f}s")
+                time.sleep(self.crash_backoff)
+
+    def stop_workers(self) -> None:
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                self.workers.pop(pid, None)
+
+        deadline = time.monotonic() + self.args.graceful_timeout + 5
+        while self.workers and time.monotonic() < deadline:
+            self.reap()
+            time.sleep(0.1)
+
+        for pid in list(self.workers):
+            print(f"Worker {pid} did not drain in time; killing")
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        while self.workers:
+            self.reap()
+            time.sleep(0.05)
+
+    def run(self) -> int:
+        signal.signal(signal.SIGTERM, self.handle_stop)
+        signal.signal(signal.SIGINT, self.handle_stop)
+
+        while not self.stopping:
+            while len(self.workers) < self.args.workers and not self.stopping:
+                self.spawn()
+            time.sleep(0.5)
+            self.reap()
+
+        self.stop_workers()
+        self.sock.close()
+        print("All workers stopped")
+        return 0
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if args.workers < 1:
+        print("--workers must be at least 1")
+        return 2
+
+    sock = bind_socket(args.host, args.port, args.backlog)
+    print(f"Listening on {args.host}:{args.port} with {args.workers} workers "
+          f"({describe_event_loop()})")
+
+    app = None
+    if args.preload:
+        from .main import app
+        # Connections opened while importing must not leak into workers
+        from .database import engine
+        engine.dispose()
+        print("Application preloaded in master")
+
+    return Supervisor(args, sock, app).run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,10 @@
+"""
+Static snapshots of the anonymous catalog endpoints (see build.py), for
+serving from a CDN, nginx or SnapshotMiddleware instead of the workers.
+
+    python -m app.snapshot [--full]
+"""
+from .build import build_snapshot, load_manifest, snapshot_key
+from .middleware import SnapshotMiddleware
+
+__all__ = ["SnapshotMiddleware", "build_snapshot", "load_manifest", "snapshot_key"]
@@ -0,0 +1,37 @@
+"""
+Build the static snapshot of the current catalog version.
+
+    python -m app.snapshot [--dir snapshots] [--full]
+"""
+import argparse
+import sys
+
+from ..database import SessionLocal
+from .build import build_snapshot
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Snapshot the anonymous catalog endpoints to static files")
+    parser.add_argument("--dir", default=None, help="snapshot directory (default: SNAPSHOT_DIR)")
+    parser.add_argument("--full", action="store_true", help="rebuild every file instead of reusing unchanged ones")
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        report = build_snapshot(db, args.dir, full=args.full)
+    except Exception as e:
+        print(f"Error building snapshot: {str(e)}")
+        return 1
+    finally:
+        db.close()
+
+    if report["up_to_date"]:
+        print(f"Snapshot {report['version']} is up to date")
+    else:
+        print(f"Snapshot {report['version']}: {report['files']} files, "
+              f"{report['written']} written, {report['reused']} reused")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
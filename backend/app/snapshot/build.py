@@ -0,0 +1,227 @@
+"""
+Static snapshot of the anonymous catalog endpoints.
+
+Catalog reads that do not depend on the caller are rendered to
+<SNAPSHOT_DIR>/<catalog version>/<key>.json, with .json.gz and .json.br
+variants, and listed in manifest.json with their SHA-256:
+
+    courses                    GET /courses
+    courses/<id>               GET /courses/{id}
+    courses/<id>/lessons       GET /courses/{id}/lessons         as an anonymous caller sees it
+    lessons/<id>               GET /lessons/{id}                 free lessons only
+    lessons/<id>.rendered      GET /lessons/{id}?rendered=true   free lessons only
+    lessons/<id>/navigation    GET /lessons/{id}/navigation      free lessons only
+    lessons/<id>/resources     GET /lessons/{id}/resources       free lessons only
+
+Bodies are produced by the API's own loaders and serializer, so they are
+byte-for-byte what the API returns. <SNAPSHOT_DIR>/current links to the
+newest snapshot for a CDN or nginx in front of the API.
+
+Once a catalog is published, the snapshot is of the published version.
+
+Builds are incremental: every body is still produced from the catalog,
+but a file whose bytes match the previous snapshot is hard-linked from it
+instead of being compressed and written again.
+"""
+import hashlib
+import json
+import os
+import re
+import shutil
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple, Union
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ..cache.responses import compress_variants, serialize_payload
+from ..core.config import settings
+from ..models import Course, Lesson
+from ..utils.catalog import compute_catalog_version, pin_catalog_version, unpin_catalog_version
+from ..utils.catalog_index import get_catalog_index
+from ..utils.entitlements import TIER_ANONYMOUS, build_entitlements
+
+MANIFEST_NAME = "manifest.json"
+CURRENT_LINK = "current"
+VARIANT_SUFFIXES = {"identity": ".json", "gzip": ".json.gz", "br": ".json.br"}
+
+_SNAPSHOT_PATHS = re.compile(
+    r"^/(courses|courses/\d+|courses/\d+/lessons|lessons/\d+|lessons/\d+/(navigation|resources))$"
+)
+
+
+def snapshot_key(path: str, query: str) -> Optional[str]:
+    """The snapshot entry answering a request, or None if there is none"""
+    if not _SNAPSHOT_PATHS.match(path):
+        return None
+    key = path.strip("/")
+    if not query:
+        return key
+    if query == "rendered=true" and key.startswith("lessons/") and key.count("/") == 1:
+        return f"{key}.rendered"
+    return None
+
+
+def varies_by_tier(key: str) -> bool:
+    """Whether signed-in callers may get a different body than the snapshot"""
+    return key.startswith("courses/") and key.endswith("/lessons")
+
+
+def variant_path(directory: Path, key: str, encoding: str) -> Path:
+    return directory / f"{key}{VARIANT_SUFFIXES[encoding]}"
+
+
+def load_manifest(directory: Path) -> Optional[Dict[str, Any]]:
+    try:
+        with open(directory / MANIFEST_NAME, encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, NotADirectoryError, ValueError):
+        return None
+
+
+def _payloads(db: Session) -> Iterator[Tuple[str, Any]]:
+    # The API's loaders, so snapshot bodies match live responses
+    from ..main import (
+        _load_course, _load_course_lessons, _load_courses, _load_lesson, _load_lesson_resources,
+        _redact_course_lessons
+    )
+    from ..utils.navigation import build_navigation_index
+
+    index = get_catalog_index()
+    course_ids = sorted(course.id for course in index.courses) if index is not None \
+        else db.execute(select(Course.id).order_by(Course.id)).scalars().all()
+
+    yield "courses", _load_courses(db, 0, 100, None)
+    for course_id in course_ids:
+        yield f"courses/{course_id}", _load_course(db, course_id)
+        yield f"courses/{course_id}/lessons", _redact_course_lessons(
+            _load_course_lessons(db, course_id, None, None), TIER_ANONYMOUS
+        )
+
+    navigation = build_navigation_index(db)
+    entitlements = build_entitlements(db)
+    lesson_ids = sorted(lesson.id for lesson in index.lessons) if index is not None \
+        else db.execute(select(Lesson.id).order_by(Lesson.id)).scalars().all()
+    free_lessons = [
+        lesson_id for lesson_id in lesson_ids if not entitlements.lesson_locked(TIER_ANONYMOUS, lesson_id)
+    ]
+    for lesson_id in free_lessons:
+        yield f"lessons/{lesson_id}", _load_lesson(db, lesson_id)
+        yield f"lessons/{lesson_id}.rendered", _load_lesson(db, lesson_id, rendered=True)
+        yield f"lessons/{lesson_id}/navigation", navigation.get(lesson_id)
+        yield f"lessons/{lesson_id}/resources", _load_lesson_resources(db, lesson_id)
+
+
+def _reuse(previous_dir: Path, target_dir: Path, key: str, encodings: Dict[str, int]) -> bool:
+    """Hard-link a previous snapshot's files for `key`; False if any is gone"""
+    sources = [variant_path(previous_dir, key, encoding) for encoding in encodings]
+    if not all(source.is_file() for source in sources):
+        return False
+    for encoding, source in zip(encodings, sources):
+        destination = variant_path(target_dir, key, encoding)
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.link(source, destination)
+        except OSError:
+            shutil.copyfile(source, destination)
+    return True
+
+
+def _write(target_dir: Path, key: str, body: bytes) -> Dict[str, int]:
+    encodings = {}
+    for encoding, data in compress_variants(body).items():
+        destination = variant_path(target_dir, key, encoding)
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        destination.write_bytes(data)
+        encodings[encoding] = len(data)
+    return encodings
+
+
+def _point_current(root: Path, version: str) -> None:
+    link = root / CURRENT_LINK
+    tmp_link = root / f".{CURRENT_LINK}-{os.getpid()}"
+    if tmp_link.is_symlink():
+        tmp_link.unlink()
+    os.symlink(version, tmp_link)
+    os.replace(tmp_link, link)
+
+
+def _prune(root: Path, keep: int, current: str) -> None:
+    snapshots = sorted(
+        (path for path in root.iterdir()
+         if path.is_dir() and not path.is_symlink() and not path.name.startswith(".")),
+        key=lambda path: path.stat().st_mtime,
+        reverse=True,
+    )
+    for path in snapshots[max(keep, 1):]:
+        if path.name != current:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def build_snapshot(
+    db: Session,
+    root: Optional[Union[str, Path]] = None,
+    full: bool = False
+) -> Dict[str, Any]:
+    """
+    Build the snapshot of the current catalog version and point `current`
+    at it. With full=True nothing is reused from the previous snapshot.
+    Returns the version and how many files were written or reused.
+    """
+    root = Path(root or settings.SNAPSHOT_DIR)
+    root.mkdir(parents=True, exist_ok=True)
+    version = compute_catalog_version(db)
+    target_dir = root / version
+
+    if not full and load_manifest(target_dir) is not None:
+        _point_current(root, version)
+        return {"version": version, "files": 0, "written": 0, "reused": 0, "up_to_date": True}
+
+    previous = None if full else load_manifest(root / CURRENT_LINK)
+    previous_dir = (root / CURRENT_LINK).resolve()
+    previous_files = previous["files"] if previous else {}
+
+    build_dir = root / f".{version}-{os.getpid()}"
+    shutil.rmtree(build_dir, ignore_errors=True)
+    build_dir.mkdir()
+    files: Dict[str, Dict[str, Any]] = {}
+    written = reused = 0
+    # Loaders read the catalog index of this version, building it if needed
+    pin = pin_catalog_version(version)
+    try:
+        for key, payload in _payloads(db):
+            body = serialize_payload(payload)
+            digest = hashlib.sha256(body).hexdigest()
+            entry = previous_files.get(key)
+            if entry and entry["sha256"] == digest and _reuse(previous_dir, build_dir, key, entry["encodings"]):
+                encodings = entry["encodings"]
+                reused += 1
+            else:
+                encodings = _write(build_dir, key, body)
+                written += 1
+            files[key] = {"sha256": digest, "encodings": encodings}
+
+        # A snapshot must hold exactly one catalog version
+        if compute_catalog_version(db) != version:
+            raise RuntimeError("Catalog changed during the snapshot build; run it again")
+
+        with open(build_dir / MANIFEST_NAME, "w", encoding="utf-8") as f:
+            json.dump({
+                "version": version,
+                "built_at": datetime.utcnow().isoformat(),
+                "files": files,
+            }, f, separators=(",", ":"))
+
+        shutil.rmtree(target_dir, ignore_errors=True)
+        os.replace(build_dir, target_dir)
+    except BaseException:
+        shutil.rmtree(build_dir, ignore_errors=True)
+        raise
+    finally:
+        unpin_catalog_version(pin)
+
+    _point_current(root, version)
+    _prune(root, settings.SNAPSHOT_KEEP, version)
+    return {"version": version, "files": len(files), "written": written, "reused": reused,
+            "up_to_date": False}
@@ -0,0 +1,86 @@
+"""
+Serve snapshotted catalog responses from disk.
+
+Only the snapshot of the catalog version this worker currently sees is
+used, so a stale snapshot is never served: until `python -m app.snapshot`
+has run for a new version, requests fall through to the routes.
+"""
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from ..core.compression import choose_encoding, supported_encodings
+from ..core.config import settings
+from ..utils.catalog import current_catalog_version
+from ..utils.http import etag_matches
+from .build import load_manifest, snapshot_key, variant_path, varies_by_tier
+
+# How long a missing snapshot is remembered before looking again
+MISSING_RECHECK_SECONDS = 5
+
+
+class SnapshotMiddleware:
+    """
+    Answers GET/HEAD requests that have a snapshot entry before they reach
+    a route; does nothing unless settings.SNAPSHOT_SERVE is set
+    """
+    def __init__(self, app: ASGIApp, root: Optional[str] = None):
+        self.app = app
+        self.enabled = settings.SNAPSHOT_SERVE
+        self.root = Path(root or settings.SNAPSHOT_DIR)
+        self._manifest: Optional[Dict[str, Any]] = None
+        self._missing: Tuple[Optional[str], float] = (None, 0.0)
+
+    def manifest(self, version: str) -> Optional[Dict[str, Any]]:
+        if self._manifest is not None and self._manifest["version"] == version:
+            return self._manifest
+        missing_version, checked_at = self._missing
+        if missing_version == version and time.monotonic() - checked_at < MISSING_RECHECK_SECONDS:
+            return None
+
+        manifest = load_manifest(self.root / version)
+        if manifest is None:
+            self._missing = (version, time.monotonic())
+        else:
+            self._manifest = manifest
+        return manifest
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if not self.enabled or scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+
+        key = snapshot_key(scope["path"], scope.get("query_string", b"").decode("latin-1"))
+        if key and varies_by_tier(key) and any(name == b"authorization" for name, _ in scope["headers"]):
+            # Lesson lists are redacted per access tier; the snapshot is the anonymous one
+            key = None
+        version = current_catalog_version()
+        manifest = self.manifest(version) if key and version else None
+        entry = manifest["files"].get(key) if manifest else None
+        if entry is None:
+            await self.app(scope, receive, send)
+            return
+
+        response = self.respond(version, key, entry, Headers(scope=scope))
+        await response(scope, receive, send)
+
+    def respond(self, version: str, key: str, entry: Dict[str, Any], request_headers: Headers) -> Response:
+        compressed = [e for e in supported_encodings() if e in entry["encodings"]]
+        headers = {"ETag": f'"{entry["sha256"]}"', "X-Catalog-Version": version}
+        if compressed:
+            headers["Vary"] = "Accept-Encoding"
+        if etag_matches(request_headers.get("if-none-match", ""), headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+
+        encoding = choose_encoding(request_headers.get("accept-encoding", ""), compressed) if compressed else None
+        if encoding is not None:
+            headers["Content-Encoding"] = encoding
+        return FileResponse(
+            variant_path(self.root / version, key, encoding or "identity"),
+            media_type="application/json",
+            headers=headers,
+        )
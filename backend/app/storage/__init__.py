@@ -0,0 +1,68 @@
+"""
+Storage for downloadable resource files (see blobs.py).
+
+    python -m app.storage offload   # move inline Resource.content into the store
+    python -m app.storage gc        # delete blobs no resource references
+"""
+import mimetypes
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from ..core.config import settings
+from .blobs import BlobInfo, BlobStore
+
+_store: Optional[BlobStore] = None
+_store_lock = threading.Lock()
+
+# Inline resource content is text authored in the catalog
+INLINE_MEDIA_TYPE = "text/plain; charset=utf-8"
+
+
+def get_blob_store() -> BlobStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = BlobStore(settings.BLOB_STORE_DIR)
+    return _store
+
+
+def guess_media_type(filename: Optional[str]) -> str:
+    media_type, _ = mimetypes.guess_type(filename or "")
+    return media_type or "application/octet-stream"
+
+
+def store_resource_file(path: Path) -> Dict[str, Any]:
+    """Resource columns for a file, stored in the blob store"""
+    info = get_blob_store().put_file(path)
+    return {
+        "blob_hash": info.hash,
+        "size": info.size,
+        "media_type": guess_media_type(path.name),
+        "filename": path.name,
+        "content": None,
+    }
+
+
+def store_resource_text(text: str, filename: Optional[str] = None) -> Dict[str, Any]:
+    """Resource columns for inline text content, stored in the blob store"""
+    info = get_blob_store().put_bytes(text.encode("utf-8"))
+    return {
+        "blob_hash": info.hash,
+        "size": info.size,
+        "media_type": INLINE_MEDIA_TYPE,
+        "filename": filename,
+        "content": None,
+    }
+
+
+__all__ = [
+    "BlobInfo",
+    "BlobStore",
+    "INLINE_MEDIA_TYPE",
+    "get_blob_store",
+    "guess_media_type",
+    "store_resource_file",
+    "store_resource_text",
+]
@@ -0,0 +1,96 @@
+"""
+Blob store maintenance.
+
+    python -m app.storage offload   # move inline Resource.content into the store
+    python -m app.storage gc        # delete blobs no resource or catalog version references
+"""
+import sys
+from datetime import datetime
+
+from sqlalchemy import select, update
+
+from ..database import SessionLocal
+from ..models import CatalogRowPayload, CatalogVersionRow, Resource
+from ..utils.sync import record_catalog_changes
+from . import get_blob_store, store_resource_text
+
+OFFLOAD_BATCH_SIZE = 500
+
+
+def offload() -> int:
+    """Store inline resource content as blobs, a batch per transaction"""
+    db = SessionLocal()
+    moved = 0
+    try:
+        while True:
+            rows = db.execute(
+                select(Resource.id, Resource.content)
+                .where(Resource.blob_hash.is_(None), Resource.content.isnot(None))
+                .order_by(Resource.id)
+                .limit(OFFLOAD_BATCH_SIZE)
+            ).all()
+            if not rows:
+                break
+            now = datetime.utcnow()
+            # Bumping updated_at changes the catalog version, so cached
+            # resource listings pick up the download metadata
+            db.execute(update(Resource), [
+                {"id": row.id, "updated_at": now, **store_resource_text(row.content)}
+                for row in rows
+            ])
+            record_catalog_changes(db, "resource", [row.id for row in rows], now=now)
+            db.commit()
+            moved += len(rows)
+    except Exception as e:
+        db.rollback()
+        print(f"Error offloading resources: {str(e)}")
+        return 1
+    finally:
+        db.close()
+
+    print(f"Moved {moved} resources to the blob store")
+    return 0
+
+
+def gc() -> int:
+    """
+    Delete blobs that no resource or published catalog version references;
+    run while no import is in progress
+    """
+    db = SessionLocal()
+    try:
+        referenced = set(db.execute(
+            select(Resource.blob_hash).where(Resource.blob_hash.isnot(None)).distinct()
+        ).scalars())
+        for payload in db.execute(select(CatalogRowPayload.payload).where(
+            CatalogRowPayload.row_hash.in_(
+                select(CatalogVersionRow.row_hash).where(CatalogVersionRow.entity == "resource")
+            )
+        )).scalars():
+            if payload.get("blob_hash"):
+                referenced.add(payload["blob_hash"])
+    finally:
+        db.close()
+
+    store = get_blob_store()
+    removed = 0
+    for blob_hash in list(store.iter_hashes()):
+        if blob_hash not in referenced:
+            store.delete(blob_hash)
+            removed += 1
+    print(f"Deleted {removed} unreferenced blobs, kept {len(referenced)}")
+    return 0
+
+
+COMMANDS = {"offload": offload, "gc": gc}
+
+
+def main(argv) -> int:
+    if len(argv) != 1 or argv[0] not in COMMANDS:
+        print(__doc__.strip())
+        return 2
+    return COMMANDS[argv[0]]()
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,101 @@
+"""
+Content-addressed blob store on the local filesystem.
+
+Blobs are stored once per SHA-256 of their bytes under
+<root>/<aa>/<bb>/<hash>, so identical files uploaded for different
+resources share one copy. Writes stream into a temporary file in the
+store and are renamed into place, so readers never see partial blobs and
+concurrent writers of the same content are harmless.
+"""
+import hashlib
+import io
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import BinaryIO, Iterator, NamedTuple, Union
+
+CHUNK_SIZE = 1024 * 1024
+
+_HASH_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+class BlobInfo(NamedTuple):
+    hash: str
+    size: int
+
+
+class BlobStore:
+    def __init__(self, root: Union[str, Path]):
+        self.root = Path(root)
+        self._tmp = self.root / "tmp"
+
+    def relative_path(self, blob_hash: str) -> str:
+        """Path of a blob relative to the store root"""
+        if not _HASH_RE.match(blob_hash or ""):
+            raise ValueError(f"Invalid blob hash: {blob_hash!r}")
+        return f"{blob_hash[:2]}/{blob_hash[2:4]}/{blob_hash}"
+
+    def path(self, blob_hash: str) -> Path:
+        return self.root / self.relative_path(blob_hash)
+
+    def exists(self, blob_hash: str) -> bool:
+        return self.path(blob_hash).is_file()
+
+    def open(self, blob_hash: str) -> BinaryIO:
+        return open(self.path(blob_hash), "rb")
+
+    def put_stream(self, stream: BinaryIO) -> BlobInfo:
+        """Store everything read from `stream`, hashing it on the way in"""
+        self._tmp.mkdir(parents=True, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=self._tmp)
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                while True:
+                    chunk = stream.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+                    tmp.write(chunk)
+                    size += len(chunk)
+                tmp.flush()
+                os.fsync(tmp.fileno())
+
+            blob_hash = digest.hexdigest()
+            target = self.path(blob_hash)
+            if target.exists():
+                os.unlink(tmp_path)
+            else:
+                target.parent.mkdir(parents=True, exist_ok=True)
+                os.chmod(tmp_path, 0o644)
+                os.replace(tmp_path, target)
+            return BlobInfo(blob_hash, size)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def put_file(self, path: Union[str, Path]) -> BlobInfo:
+        with open(path, "rb") as source:
+            return self.put_stream(source)
+
+    def put_bytes(self, data: bytes) -> BlobInfo:
+        blob_hash = hashlib.sha256(data).hexdigest()
+        if self.exists(blob_hash):
+            return BlobInfo(blob_hash, len(data))
+        return self.put_stream(io.BytesIO(data))
+
+    def delete(self, blob_hash: str) -> None:
+        try:
+            self.path(blob_hash).unlink()
+        except FileNotFoundError:
+            pass
+
+    def iter_hashes(self) -> Iterator[str]:
+        if not self.root.is_dir():
+            return
+        for path in self.root.glob("??/??/*"):
+            if _HASH_RE.match(path.name):
+                yield path.name
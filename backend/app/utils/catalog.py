@@ -0,0 +1,161 @@
+"""
+Catalog versioning utilities for the Spark Tutorial platform.
+This module tracks the catalog version so in-memory indexes can be
+rebuilt whenever courses, lessons or resources change. Once a catalog
+has been published (app.publishing) the version is the published
+version's label, read from a one-row pointer; before that it is a cheap
+fingerprint of the live tables.
+
+Requests pin the version they started on (pin_catalog_version), so one
+request never mixes two catalogs.
+"""
+import asyncio
+import hashlib
+from contextvars import ContextVar, Token
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from ..database import SessionLocal
+from ..models import (
+    CatalogRowPayload, CatalogState, CatalogVersionRow, Course, Lesson, Resource
+)
+
+CatalogListener = Callable[[str], None]
+
+_listeners: List[CatalogListener] = []
+_current_version: Optional[str] = None
+_pinned_version: ContextVar[Optional[str]] = ContextVar("pinned_catalog_version", default=None)
+
+PUBLISHED_PREFIX = "v"
+
+
+def published_version_label(version_id: int) -> str:
+    return f"{PUBLISHED_PREFIX}{version_id}"
+
+
+def parse_published_version(version: Optional[str]) -> Optional[int]:
+    """The published version id a catalog version names, or None for a fingerprint"""
+    if version and version.startswith(PUBLISHED_PREFIX) and version[len(PUBLISHED_PREFIX):].isdigit():
+        return int(version[len(PUBLISHED_PREFIX):])
+    return None
+
+
+def published_version_id(db: Session) -> Optional[int]:
+    return db.execute(
+        select(CatalogState.published_version_id).where(CatalogState.id == 1)
+    ).scalar()
+
+
+def load_version_rows(db: Session, version_id: int) -> Dict[str, List[Dict[str, Any]]]:
+    """Every row payload of a published version, by entity"""
+    rows: Dict[str, List[Dict[str, Any]]] = {"course": [], "lesson": [], "resource": []}
+    for entity, payload in db.execute(
+        select(CatalogVersionRow.entity, CatalogRowPayload.payload)
+        .join(CatalogRowPayload, CatalogRowPayload.row_hash == CatalogVersionRow.row_hash)
+        .where(CatalogVersionRow.version_id == version_id)
+    ):
+        rows.setdefault(entity, []).append(payload)
+    return rows
+
+
+def compute_catalog_version(db: Session) -> str:
+    """
+    The published version's label, or without one a fingerprint of the
+    catalog from row counts and the latest update timestamps
+    """
+    version_id = published_version_id(db)
+    if version_id is not None:
+        return published_version_label(version_id)
+
+    parts = []
+    for model in (Course, Lesson, Resource):
+        count, last_updated = db.query(
+            func.count(model.id),
+            func.max(model.updated_at)
+        ).one()
+        parts.append(f"{model.__tablename__}:{count}:{last_updated}")
+    return hashlib.sha1("|".join(parts).encode()).hexdigest()[:12]
+
+
+def current_catalog_version(pinned: bool = True) -> Optional[str]:
+    """
+    Return the catalog version pinned by the current request, or else (or
+    with pinned=False) the last one seen by this process
+    """
+    return (_pinned_version.get() if pinned else None) or _current_version
+
+
+def pin_catalog_version(version: Optional[str] = None) -> Token:
+    """
+    Pin a catalog version (default: the current one) for the current
+    context until unpin_catalog_version(token)
+    """
+    return _pinned_version.set(version or _current_version)
+
+
+def unpin_catalog_version(token: Token) -> None:
+    _pinned_version.reset(token)
+
+
+def on_catalog_change(listener: CatalogListener) -> None:
+    """
+    Register a callback invoked with the new version whenever the catalog changes
+    """
+    if listener not in _listeners:
+        _listeners.append(listener)
+
+
+def set_catalog_version(version: str) -> bool:
+    """
+    Record a catalog version and notify listeners if it changed
+    """
+    global _current_version
+    if version == _current_version:
+        return False
+
+    _current_version = version
+    # Listeners build for the new version, whatever the caller is pinned to
+    token = _pinned_version.set(version)
+    try:
+        _notify(version)
+    finally:
+        _pinned_version.reset(token)
+    return True
+
+
+def _notify(version: str) -> None:
+    for listener in list(_listeners):
+        try:
+            listener(version)
+        except Exception as e:
+            print(f"Error in catalog listener {listener!r}: {str(e)}")
+
+
+def refresh_catalog_version(db: Optional[Session] = None) -> str:
+    """
+    Recompute the catalog version from the database and notify on change
+    """
+    session = db or SessionLocal()
+    try:
+        version = compute_catalog_version(session)
+    finally:
+        if db is None:
+            session.close()
+
+    set_catalog_version(version)
+    return version
+
+
+async def watch_catalog_version(interval_seconds: float) -> None:
+    """
+    Poll the catalog version in the background until cancelled
+    """
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await run_in_threadpool(refresh_catalog_version)
+        except Exception as e:
+            print(f"Error refreshing catalog version: {str(e)}")
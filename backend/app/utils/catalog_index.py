@@ -0,0 +1,360 @@
+"""
+Read-only in-memory catalog for the Spark Tutorial platform.
+Courses, lessons and resources are loaded in bulk, once per catalog
+version, into compact frozen records instead of ORM instances, and the
+catalog read endpoints answer from them without touching the database.
+A new version is built off to the side and swapped in by rebinding one
+reference, so readers see either the old catalog or the new one.
+
+Once a catalog is published (app.publishing) the index is built from the
+published version's rows instead of the live tables, and it is the only
+place readers get the catalog from: a worker without the index for the
+version a request is pinned to builds it before answering rather than
+reading the draft.
+"""
+from dataclasses import dataclass
+from itertools import groupby
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ..cache import get_singleflight
+from ..database import SessionLocal
+from ..models import Course, Lesson, Resource, lesson_prerequisites
+from .catalog import current_catalog_version, load_version_rows, parse_published_version
+from .pagination import nulls_first_key
+
+
+@dataclass(frozen=True, slots=True)
+class CourseRecord:
+    id: int
+    title: str
+    description: str
+    order: int
+    is_premium: bool
+    tags: Optional[List[str]] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "title": self.title,
+            "description": self.description,
+            "order": self.order,
+            "is_premium": self.is_premium,
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class LessonRecord:
+    id: int
+    course_id: int
+    title: str
+    description: str
+    content: str
+    # Stored JSON lists, shared by every reader: never mutate them
+    content_sections: List[Dict[str, Any]]
+    code_samples: List[Dict[str, Any]]
+    key_points: Optional[str]
+    order: int
+    sort_key: str
+    difficulty: str
+    lesson_type: str
+    estimated_time: int
+    learning_objectives: str
+    is_premium: bool
+    rendered_hash: Optional[str]
+    prerequisite_ids: Tuple[int, ...]
+    # Exercise specs and other widgets; never returned as-is (hidden tests)
+    interactive_elements: Optional[Dict[str, Any]] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The lesson as returned by GET /lessons/{id}"""
+        return {
+            "id": self.id,
+            "title": self.title,
+            "description": self.description,
+            "content": self.content,
+            "content_sections": self.content_sections,
+            "code_samples": self.code_samples,
+            "key_points": self.key_points,
+            "order": self.order,
+            "difficulty": self.difficulty,
+            "lesson_type": self.lesson_type,
+            "estimated_time": self.estimated_time,
+            "learning_objectives": self.learning_objectives,
+            "is_premium": self.is_premium,
+            "course_id": self.course_id,
+        }
+
+    def outline(self) -> Dict[str, Any]:
+        """The lesson as listed by GET /courses/{id}/lessons"""
+        return {
+            "id": self.id,
+            "title": self.title,
+            "description": self.description,
+            "content": self.content,
+            "order": self.order,
+            "difficulty": self.difficulty,
+            "lesson_type": self.lesson_type,
+            "estimated_time": self.estimated_time,
+            "learning_objectives": self.learning_objectives,
+            "is_premium": self.is_premium,
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class ResourceRecord:
+    id: int
+    lesson_id: int
+    title: str
+    type: str
+    content: Optional[str]
+    description: Optional[str]
+    size: Optional[int]
+    media_type: Optional[str]
+    filename: Optional[str]
+    blob_hash: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "title": self.title,
+            "type": self.type,
+            "content": self.content,
+            "description": self.description,
+            "size": self.size,
+            "media_type": self.media_type,
+            "filename": self.filename,
+            "download_url": f"/resources/{self.id}/download",
+        }
+
+
+class CatalogIndex:
+    """
+    Immutable catalog of one version: courses sorted by (order, id) and
+    lessons by (sort_key, id), with lookups by id
+    """
+    __slots__ = (
+        "version", "courses", "lessons", "courses_by_id", "lessons_by_id",
+        "lessons_by_course", "resources_by_lesson", "resources_by_id",
+    )
+
+    def __init__(
+        self,
+        courses: Tuple[CourseRecord, ...],
+        lessons: Tuple[LessonRecord, ...],
+        resources: Tuple[ResourceRecord, ...],
+        version: Optional[str] = None
+    ):
+        self.version = version
+        self.courses = courses
+        self.lessons = lessons
+        self.courses_by_id = {course.id: course for course in courses}
+        self.lessons_by_id = {lesson.id: lesson for lesson in lessons}
+        # lessons is sorted by (sort_key, id), so each course's lessons are too
+        by_course: Dict[int, List[LessonRecord]] = {}
+        for lesson in lessons:
+            by_course.setdefault(lesson.course_id, []).append(lesson)
+        self.lessons_by_course = {course_id: tuple(group) for course_id, group in by_course.items()}
+        self.resources_by_lesson = {
+            lesson_id: tuple(group)
+            for lesson_id, group in groupby(resources, key=lambda resource: resource.lesson_id)
+        }
+        self.resources_by_id = {resource.id: resource for resource in resources}
+
+    def course(self, course_id: int) -> Optional[CourseRecord]:
+        return self.courses_by_id.get(course_id)
+
+    def lesson(self, lesson_id: int) -> Optional[LessonRecord]:
+        return self.lessons_by_id.get(lesson_id)
+
+    def course_lessons(self, course_id: int) -> Tuple[LessonRecord, ...]:
+        return self.lessons_by_course.get(course_id, ())
+
+    def lesson_resources(self, lesson_id: int) -> Tuple[ResourceRecord, ...]:
+        return self.resources_by_lesson.get(lesson_id, ())
+
+    def resource(self, resource_id: int) -> Optional[ResourceRecord]:
+        return self.resources_by_id.get(resource_id)
+
+
+def _build_from_version(db: Session, version_id: int, version: str) -> CatalogIndex:
+    """Load a published version from its stored row payloads"""
+    rows = load_version_rows(db, version_id)
+    courses = tuple(sorted(
+        (
+            CourseRecord(row["id"], row["title"], row["description"], row["order"],
+                         row["is_premium"], row.get("tags"))
+            for row in rows["course"]
+        ),
+        key=lambda course: nulls_first_key(course.order, course.id)
+    ))
+    lessons = tuple(sorted(
+        (
+            LessonRecord(
+                id=row["id"],
+                course_id=row["course_id"],
+                title=row["title"],
+                description=row["description"],
+                content=row["content"],
+                content_sections=row["content_sections"] or [],
+                code_samples=row["code_samples"] or [],
+                key_points=row["key_points"],
+                order=row["order"],
+                sort_key=row["sort_key"],
+                difficulty=row["difficulty"],
+                lesson_type=row["lesson_type"],
+                estimated_time=row["estimated_time"],
+                learning_objectives=row["learning_objectives"],
+                is_premium=row["is_premium"],
+                rendered_hash=row.get("rendered_hash"),
+                prerequisite_ids=tuple(row["prerequisites"]),
+                interactive_elements=row.get("interactive_elements"),
+            )
+            for row in rows["lesson"]
+        ),
+        key=lambda lesson: nulls_first_key(lesson.sort_key, lesson.id)
+    ))
+    resources = tuple(sorted(
+        (
+            ResourceRecord(
+                row["id"], row["lesson_id"], row["title"], row["type"], row["content"],
+                row["description"], row["size"], row["media_type"], row["filename"],
+                row["blob_hash"]
+            )
+            for row in rows["resource"]
+        ),
+        key=lambda resource: (resource.lesson_id, resource.id)
+    ))
+    return CatalogIndex(courses, lessons, resources, version=version)
+
+
+def build_catalog_index(db: Session, version: Optional[str] = None) -> CatalogIndex:
+    """
+    Load the whole catalog with one column query per table; no ORM
+    instances are created. A published version is loaded from its rows.
+    """
+    version_id = parse_published_version(version)
+    if version_id is not None:
+        return _build_from_version(db, version_id, version)
+
+    courses = tuple(
+        CourseRecord(row.id, row.title, row.description, row.order, row.is_premium, row.tags)
+        for row in db.execute(
+            select(Course.id, Course.title, Course.description, Course.order, Course.is_premium,
+                   Course.tags)
+            .order_by(Course.order.nulls_first(), Course.id)
+        )
+    )
+
+    prerequisites: Dict[int, List[int]] = {}
+    for lesson_id, prerequisite_id in db.execute(
+        select(lesson_prerequisites.c.lesson_id, lesson_prerequisites.c.prerequisite_id)
+        .order_by(lesson_prerequisites.c.lesson_id, lesson_prerequisites.c.prerequisite_id)
+    ):
+        prerequisites.setdefault(lesson_id, []).append(prerequisite_id)
+
+    lessons = tuple(
+        LessonRecord(
+            id=row.id,
+            course_id=row.course_id,
+            title=row.title,
+            description=row.description,
+            content=row.content,
+            content_sections=row.content_sections or [],
+            code_samples=row.code_samples or [],
+            key_points=row.key_points,
+            order=row.order,
+            sort_key=row.sort_key,
+            difficulty=row.difficulty.value if row.difficulty else "beginner",
+            lesson_type=row.lesson_type.value if row.lesson_type else "theory",
+            estimated_time=row.estimated_time,
+            learning_objectives=row.learning_objectives,
+            is_premium=row.is_premium,
+            rendered_hash=row.rendered_hash,
+            prerequisite_ids=tuple(prerequisites.get(row.id, ())),
+            interactive_elements=row.interactive_elements,
+        )
+        for row in db.execute(
+            select(
+                Lesson.id, Lesson.course_id, Lesson.title, Lesson.description, Lesson.content,
+                Lesson.content_sections, Lesson.code_samples, Lesson.key_points, Lesson.order,
+                Lesson.sort_key, Lesson.difficulty, Lesson.lesson_type, Lesson.estimated_time,
+                Lesson.learning_objectives, Lesson.is_premium, Lesson.rendered_hash,
+                Lesson.interactive_elements
+            ).order_by(Lesson.sort_key.nulls_first(), Lesson.id)
+        )
+    )
+
+    resources = tuple(
+        ResourceRecord(
+            row.id, row.lesson_id, row.title, row.type, row.content, row.description,
+            row.size, row.media_type, row.filename, row.blob_hash
+        )
+        for row in db.execute(
+            select(
+                Resource.id, Resource.lesson_id, Resource.title, Resource.type, Resource.content,
+                Resource.description, Resource.size, Resource.media_type, Resource.filename,
+                Resource.blob_hash
+            ).order_by(Resource.lesson_id, Resource.id)
+        )
+    )
+    return CatalogIndex(courses, lessons, resources, version=version)
+
+
+_index: Optional[CatalogIndex] = None
+# The index replaced last, for requests still pinned to its version
+_previous: Optional[CatalogIndex] = None
+
+
+def get_catalog_index() -> Optional[CatalogIndex]:
+    """
+    The in-memory catalog of the version the current request is pinned
+    to. For an unpublished catalog this is None while it is not built
+    (callers then read the database); a published version is built on
+    first use instead, since the live tables hold the draft.
+    """
+    version = current_catalog_version()
+    for index in (_index, _previous):
+        if index is not None and index.version is not None and index.version == version:
+            return index
+    if parse_published_version(version) is None:
+        return None
+    index = _load(version)
+    if version == current_catalog_version(pinned=False):
+        _install(index)
+    return index
+
+
+def _load(version: Optional[str]) -> CatalogIndex:
+    """Build a version in a private session, once however many callers want it"""
+    def build() -> CatalogIndex:
+        db = SessionLocal()
+        try:
+            return build_catalog_index(db, version=version)
+        finally:
+            db.close()
+    return get_singleflight().do(f"catalog-index:{version}", build)
+
+
+def _install(index: CatalogIndex) -> None:
+    global _index, _previous
+    if _index is index:
+        return
+    if _index is not None and _index.version != index.version:
+        _previous = _index
+    _index = index
+
+
+def rebuild_catalog_index(version: Optional[str] = None) -> CatalogIndex:
+    """
+    Build a new catalog in a private session and swap it in atomically
+    """
+    current = _index
+    if current is not None and version is not None and current.version == version:
+        # Already built on first use
+        return current
+    index = _load(version)
+    _install(index)
+    return index
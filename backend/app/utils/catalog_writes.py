@@ -0,0 +1,437 @@
+"""
+Catalog writes behind the admin API.
+
+Each operation runs as set-based statements in the caller's transaction
+and records what it changed in a CatalogChanges: the rows created,
+updated and deleted, and the API paths whose responses are now
+different. Lesson moves rewrite only the moved lesson's fractional
+sort_key (utils.ordering); the integer `order` is left as authored.
+"""
+from datetime import datetime
+from itertools import groupby
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.orm import Session
+
+from .. import schemas
+from ..models import Course, Lesson, Resource, UserProgress, lesson_prerequisites
+from ..rendering import render_lessons
+from .ordering import MAX_KEY_LENGTH, key_between, key_for_order, spread_keys
+from .sync import ENTITIES, record_catalog_changes
+
+# Lesson columns compared before an update, so no-op updates are not reported
+LESSON_UPDATE_FIELDS = tuple(
+    field for field in schemas.LessonUpdate.model_fields if field != "prerequisite_ids"
+) + ("sort_key",)
+
+# What GET /lessons/{id}/navigation shows for a lesson: each neighbour's id and title
+Navigation = Tuple[Optional[Tuple[int, str]], Optional[Tuple[int, str]]]
+
+
+class CatalogChanges:
+    """Rows a write touched, per entity, and the API paths it changed"""
+
+    def __init__(self):
+        self.ids: Dict[str, Dict[str, Set[int]]] = {
+            entity: {"created": set(), "updated": set(), "deleted": set()} for entity in ENTITIES
+        }
+        self.paths: Set[str] = set()
+
+    def add(self, entity: str, op: str, ids: Iterable[int]) -> None:
+        self.ids[entity][op].update(ids)
+
+    def record(self, db: Session, now: datetime) -> None:
+        """Append everything to the catalog change log, for delta sync"""
+        for entity, ops in self.ids.items():
+            record_catalog_changes(db, entity, sorted(ops["created"] | ops["updated"]), now=now)
+            record_catalog_changes(db, entity, sorted(ops["deleted"]), op="delete", now=now)
+
+    def lesson_ids(self) -> Set[int]:
+        lessons = self.ids["lesson"]
+        return (lessons["created"] | lessons["updated"]) - lessons["deleted"]
+
+    def result(self, catalog_version: Optional[str]) -> Dict[str, Any]:
+        plural = {"course": "courses", "lesson": "lessons", "resource": "resources"}
+        return {
+            **{plural[entity]: {op: sorted(ids) for op, ids in ops.items()}
+               for entity, ops in self.ids.items()},
+            "paths": sorted(self.paths),
+            "catalog_version": catalog_version,
+        }
+
+
+def _lesson_paths(lesson_id: int) -> List[str]:
+    return [f"/lessons/{lesson_id}", f"/lessons/{lesson_id}/navigation", f"/lessons/{lesson_id}/resources"]
+
+
+def _course_lesson_paths(course_id: int) -> List[str]:
+    return [f"/courses/{course_id}/lessons", f"/courses/{course_id}/bundle"]
+
+
+def _navigation(db: Session, course_ids: Iterable[int]) -> Dict[int, Navigation]:
+    """Every lesson's neighbours in the given courses, in one query"""
+    course_ids = list(course_ids)
+    if not course_ids:
+        return {}
+    rows = db.execute(
+        select(Lesson.id, Lesson.title, Lesson.course_id)
+        .where(Lesson.course_id.in_(course_ids))
+        .order_by(Lesson.course_id, Lesson.sort_key, Lesson.id)
+    ).all()
+    links: Dict[int, Navigation] = {}
+    for _, course_rows in groupby(rows, key=lambda row: row.course_id):
+        course_rows = list(course_rows)
+        for i, row in enumerate(course_rows):
+            previous = course_rows[i - 1] if i > 0 else None
+            following = course_rows[i + 1] if i + 1 < len(course_rows) else None
+            links[row.id] = (
+                (previous.id, previous.title) if previous else None,
+                (following.id, following.title) if following else None,
+            )
+    return links
+
+
+def _course_navigation(db: Session) -> Dict[int, Navigation]:
+    """Every course's neighbours, as shown in course bundles"""
+    rows = db.execute(select(Course.id, Course.title).order_by(Course.order, Course.id)).all()
+    return {
+        row.id: (
+            (rows[i - 1].id, rows[i - 1].title) if i > 0 else None,
+            (rows[i + 1].id, rows[i + 1].title) if i + 1 < len(rows) else None,
+        )
+        for i, row in enumerate(rows)
+    }
+
+
+class _NavigationDiff:
+    """Adds the navigation paths of lessons whose neighbours changed"""
+
+    def __init__(self, db: Session, changes: CatalogChanges, course_ids: Iterable[int]):
+        self.db = db
+        self.changes = changes
+        self.course_ids = set(course_ids)
+        self.before = _navigation(db, self.course_ids)
+
+    def finish(self) -> None:
+        after = _navigation(self.db, self.course_ids)
+        for lesson_id in set(self.before) | set(after):
+            if self.before.get(lesson_id) != after.get(lesson_id):
+                self.changes.paths.add(f"/lessons/{lesson_id}/navigation")
+        for course_id in self.course_ids:
+            self.changes.paths.update(_course_lesson_paths(course_id))
+        if self.course_ids:
+            self.changes.paths.add("/lessons")
+
+
+def _existing_ids(db: Session, model, ids: Iterable[int]) -> Set[int]:
+    ids = list(ids)
+    if not ids:
+        return set()
+    return set(db.execute(select(model.id).where(model.id.in_(ids))).scalars())
+
+
+def _require(db: Session, model, ids: Iterable[int], what: str, status_code: int = 404) -> None:
+    ids = set(ids)
+    missing = ids - _existing_ids(db, model, ids)
+    if missing:
+        raise HTTPException(status_code=status_code, detail=f"Unknown {what} ids: {sorted(missing)}")
+
+
+def _update_batches(db: Session, model, updates: List[Dict[str, Any]]) -> None:
+    # Group by key set: executemany needs uniform parameter sets
+    by_keys: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+    for params in updates:
+        by_keys.setdefault(tuple(sorted(params)), []).append(params)
+    for batch in by_keys.values():
+        db.execute(update(model), batch)
+
+
+def _set_prerequisites(db: Session, prerequisites: Dict[int, List[int]]) -> Set[int]:
+    """Replace the prerequisites of the given lessons; returns the lessons whose set changed"""
+    if not prerequisites:
+        return set()
+    _require(db, Lesson, {p for ids in prerequisites.values() for p in ids},
+             "prerequisite lesson", status_code=400)
+
+    table = lesson_prerequisites
+    existing: Dict[int, Set[int]] = {lesson_id: set() for lesson_id in prerequisites}
+    for lesson_id, prerequisite_id in db.execute(
+        select(table.c.lesson_id, table.c.prerequisite_id)
+        .where(table.c.lesson_id.in_(list(prerequisites)))
+    ):
+        existing[lesson_id].add(prerequisite_id)
+
+    changed = {lesson_id for lesson_id, ids in prerequisites.items() if set(ids) != existing[lesson_id]}
+    if changed:
+        db.execute(delete(table).where(table.c.lesson_id.in_(list(changed))))
+        rows = [
+            {"lesson_id": lesson_id, "prerequisite_id": prerequisite_id}
+            for lesson_id in changed
+            for prerequisite_id in sorted(set(prerequisites[lesson_id]))
+        ]
+        if rows:
+            db.execute(insert(table), rows)
+    return changed
+
+
+def create_courses(
+    db: Session,
+    courses: List[schemas.CourseCreate],
+    changes: CatalogChanges,
+    now: datetime
+) -> List[int]:
+    before = _course_navigation(db)
+    ids = db.execute(
+        insert(Course).returning(Course.id, sort_by_parameter_order=True),
+        [{**course.model_dump(), "created_at": now, "updated_at": now} for course in courses]
+    ).scalars().all()
+    changes.add("course", "created", ids)
+
+    after = _course_navigation(db)
+    changes.paths.add("/courses")
+    for course_id in ids:
+        changes.paths.add(f"/courses/{course_id}")
+    for course_id, links in after.items():
+        if before.get(course_id) != links:
+            changes.paths.add(f"/courses/{course_id}/bundle")
+    return ids
+
+
+def create_lessons(
+    db: Session,
+    lessons: List[schemas.LessonCreate],
+    changes: CatalogChanges,
+    now: datetime
+) -> List[int]:
+    course_ids = {lesson.course_id for lesson in lessons}
+    _require(db, Course, course_ids, "course", status_code=400)
+    navigation = _NavigationDiff(db, changes, course_ids)
+
+    rows = []
+    for lesson in lessons:
+        values = lesson.model_dump(exclude={"prerequisite_ids"}, mode="python")
+        rows.append({**values, "sort_key": key_for_order(lesson.order), "created_at": now, "updated_at": now})
+    ids = db.execute(insert(Lesson).returning(Lesson.id, sort_by_parameter_order=True), rows).scalars().all()
+
+    _set_prerequisites(db, {
+        lesson_id: lesson.prerequisite_ids
+        for lesson_id, lesson in zip(ids, lessons) if lesson.prerequisite_ids
+    })
+    changes.add("lesson", "created", ids)
+    for lesson_id in ids:
+        changes.paths.update(_lesson_paths(lesson_id))
+    navigation.finish()
+    return ids
+
+
+def update_lessons(
+    db: Session,
+    updates: List[schemas.LessonBulkUpdate],
+    changes: CatalogChanges,
+    now: datetime
+) -> List[int]:
+    """Apply partial updates; lessons whose values are unchanged are not written"""
+    if len({update.id for update in updates}) != len(updates):
+        raise HTTPException(status_code=400, detail="Each lesson may be updated once per request")
+    requested: Dict[int, Dict[str, Any]] = {}
+    prerequisites: Dict[int, List[int]] = {}
+    for lesson_update in updates:
+        values = lesson_update.model_dump(exclude_unset=True, exclude={"id", "prerequisite_ids"}, mode="python")
+        if "order" in values:
+            # An explicit order places the lesson like an import would
+            values["sort_key"] = key_for_order(values["order"])
+        requested[lesson_update.id] = values
+        if lesson_update.prerequisite_ids is not None:
+            prerequisites[lesson_update.id] = lesson_update.prerequisite_ids
+
+    columns = [getattr(Lesson, field) for field in LESSON_UPDATE_FIELDS]
+    current = {
+        row["id"]: row
+        for row in db.execute(
+            select(Lesson.id, Lesson.course_id, *columns).where(Lesson.id.in_(list(requested)))
+        ).mappings()
+    }
+    missing = set(requested) - set(current)
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Unknown lesson ids: {sorted(missing)}")
+
+    writes = []
+    for lesson_id, values in requested.items():
+        changed = {field: value for field, value in values.items() if current[lesson_id][field] != value}
+        if changed:
+            writes.append({"id": lesson_id, **changed, "updated_at": now})
+
+    # Titles and positions show up in the neighbours' navigation
+    navigation = _NavigationDiff(db, changes, {
+        current[params["id"]]["course_id"] for params in writes
+    })
+    _update_batches(db, Lesson, writes)
+    written = {params["id"] for params in writes}
+    updated = written | _set_prerequisites(db, prerequisites)
+    if updated - written:
+        # Prerequisite-only changes still move the lesson's updated_at; only
+        # the lesson itself and GET /lessons show prerequisites
+        db.execute(update(Lesson), [{"id": lesson_id, "updated_at": now} for lesson_id in updated - written])
+        changes.paths.add("/lessons")
+
+    changes.add("lesson", "updated", updated)
+    for lesson_id in updated:
+        changes.paths.update(_lesson_paths(lesson_id))
+    navigation.finish()
+    return sorted(updated)
+
+
+def delete_lessons(db: Session, ids: List[int], changes: CatalogChanges, now: datetime) -> List[int]:
+    """
+    Delete lessons with their resources and prerequisite links. Lessons
+    with learner progress are refused (409). Resource files stay in the
+    blob store until `python -m app.storage gc`.
+    """
+    rows = db.execute(select(Lesson.id, Lesson.course_id).where(Lesson.id.in_(ids))).all()
+    existing = [row.id for row in rows]
+    if not existing:
+        return []
+
+    with_progress = set(db.execute(
+        select(UserProgress.lesson_id).where(UserProgress.lesson_id.in_(existing)).distinct()
+    ).scalars())
+    if with_progress:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Lessons with learner progress cannot be deleted: {sorted(with_progress)}"
+        )
+
+    navigation = _NavigationDiff(db, changes, {row.course_id for row in rows})
+    table = lesson_prerequisites
+    dependents = set(db.execute(
+        select(table.c.lesson_id).where(table.c.prerequisite_id.in_(existing))
+    ).scalars()) - set(existing)
+    resources = db.execute(select(Resource.id).where(Resource.lesson_id.in_(existing))).scalars().all()
+
+    db.execute(delete(table).where(table.c.lesson_id.in_(existing) | table.c.prerequisite_id.in_(existing)))
+    db.execute(delete(Resource).where(Resource.lesson_id.in_(existing)))
+    db.execute(delete(Lesson).where(Lesson.id.in_(existing)))
+    if dependents:
+        # Their prerequisite lists shrank
+        db.execute(update(Lesson), [{"id": lesson_id, "updated_at": now} for lesson_id in dependents])
+
+    changes.add("resource", "deleted", resources)
+    changes.add("lesson", "deleted", existing)
+    changes.add("lesson", "updated", dependents)
+    for resource_id in resources:
+        changes.paths.add(f"/resources/{resource_id}/download")
+    for lesson_id in set(existing) | dependents:
+        changes.paths.update(_lesson_paths(lesson_id))
+    navigation.finish()
+    return sorted(existing)
+
+
+def _rebalance(course: List[List[Any]], rekeyed: Dict[int, str]) -> None:
+    """Give a course evenly spread keys, when a gap is used up"""
+    for entry, key in zip(course, spread_keys(len(course))):
+        if entry[0] != key:
+            entry[0] = key
+            rekeyed[entry[1]] = key
+
+
+def _key_at(course: List[List[Any]], position: int) -> Optional[str]:
+    """A key for inserting at `position`, or None if the neighbours leave no usable gap"""
+    before = course[position - 1][0] if position > 0 else None
+    after = course[position][0] if position < len(course) else None
+    if before is not None and after is not None and before >= after:
+        return None
+    key = key_between(before, after)
+    return key if len(key) <= MAX_KEY_LENGTH else None
+
+
+def move_lessons(
+    db: Session,
+    moves: List[schemas.LessonMove],
+    changes: CatalogChanges,
+    now: datetime
+) -> List[int]:
+    """
+    Apply moves in order. Each moved lesson gets a key between its new
+    neighbours' keys; other lessons are rewritten only in the rare case a
+    course's keys have to be spread out again.
+    """
+    lesson_ids = {move.lesson_id for move in moves}
+    anchor_ids = {anchor for move in moves for anchor in (move.after_id, move.before_id) if anchor is not None}
+    rows = db.execute(
+        select(Lesson.id, Lesson.course_id).where(Lesson.id.in_(list(lesson_ids | anchor_ids)))
+    ).all()
+    course_of = {row.id: row.course_id for row in rows}
+    missing = (lesson_ids | anchor_ids) - set(course_of)
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Unknown lesson ids: {sorted(missing)}")
+    target_courses = {move.course_id for move in moves if move.course_id is not None}
+    _require(db, Course, target_courses, "course", status_code=400)
+
+    course_ids = set(course_of.values()) | target_courses
+    navigation = _NavigationDiff(db, changes, course_ids)
+    # [sort_key, id] per course, in list order
+    courses: Dict[int, List[List[Any]]] = {course_id: [] for course_id in course_ids}
+    for row in db.execute(
+        select(Lesson.sort_key, Lesson.id, Lesson.course_id)
+        .where(Lesson.course_id.in_(list(course_ids)))
+        .order_by(Lesson.course_id, Lesson.sort_key, Lesson.id)
+    ):
+        courses[row.course_id].append([row.sort_key or key_for_order(0), row.id])
+
+    original_course = dict(course_of)
+    rekeyed: Dict[int, str] = {}
+    for move in moves:
+        anchor = move.after_id if move.after_id is not None else move.before_id
+        course_id = course_of[anchor] if anchor is not None else (move.course_id or course_of[move.lesson_id])
+        if move.course_id is not None and move.course_id != course_id:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Lesson {anchor} is not in course {move.course_id}"
+            )
+
+        source = courses[course_of[move.lesson_id]]
+        entry = next(entry for entry in source if entry[1] == move.lesson_id)
+        source.remove(entry)
+        course = courses[course_id]
+
+        ids = [other[1] for other in course]
+        if move.after_id is not None:
+            position = ids.index(move.after_id) + 1
+        elif move.before_id is not None:
+            position = ids.index(move.before_id)
+        else:
+            position = len(course)
+
+        key = _key_at(course, position)
+        if key is None:
+            # Equal keys (concurrent moves) or a gap used up: spread the course out
+            _rebalance(course, rekeyed)
+            key = _key_at(course, position)
+        entry[0] = key
+        course.insert(position, entry)
+        course_of[move.lesson_id] = course_id
+        rekeyed[move.lesson_id] = key
+
+    writes = []
+    for lesson_id, key in rekeyed.items():
+        params = {"id": lesson_id, "sort_key": key, "updated_at": now}
+        if lesson_id in original_course and course_of[lesson_id] != original_course[lesson_id]:
+            params["course_id"] = course_of[lesson_id]
+            # The lesson body names its course
+            changes.paths.add(f"/lessons/{lesson_id}")
+        writes.append(params)
+    _update_batches(db, Lesson, writes)
+
+    changes.add("lesson", "updated", rekeyed)
+    navigation.finish()
+    return sorted(rekeyed)
+
+
+def finish_writes(db: Session, changes: CatalogChanges, now: datetime) -> None:
+    """Render changed lesson bodies and log the changes, before the commit"""
+    lesson_ids = changes.lesson_ids()
+    if lesson_ids:
+        render_lessons(db, sorted(lesson_ids))
+    changes.record(db, now)
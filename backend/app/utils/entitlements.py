@@ -0,0 +1,187 @@
+"""
+Premium entitlements for the Spark Tutorial platform.
+Which lessons each access tier may open is computed once per catalog
+version into id bitmaps, so list endpoints redact premium items with one
+bit test each and access checks need neither user nor lesson queries.
+A lesson is premium when it or its course is marked premium.
+"""
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+
+from ..database import SessionLocal
+from ..models import Course, Lesson
+from .catalog import current_catalog_version
+from .catalog_index import get_catalog_index
+
+TIER_ANONYMOUS = "anonymous"
+TIER_FREE = "free"
+TIER_PREMIUM = "premium"
+TIERS = (TIER_ANONYMOUS, TIER_FREE, TIER_PREMIUM)
+
+# Blanked in lessons the caller may not open
+REDACTED_LESSON_FIELDS = {"content": None, "content_sections": [], "code_samples": []}
+
+
+def tier_for_user(user: Optional[Any]) -> str:
+    if user is None:
+        return TIER_ANONYMOUS
+    return TIER_PREMIUM if user.is_premium or user.is_superuser else TIER_FREE
+
+
+class IdBitmap:
+    """
+    Immutable set of non-negative ids, one bit per id up to the largest
+    """
+    __slots__ = ("_bits",)
+
+    def __init__(self, ids: Iterable[int]):
+        ids = list(ids)
+        bits = bytearray((max(ids) >> 3) + 1 if ids else 0)
+        for id in ids:
+            bits[id >> 3] |= 1 << (id & 7)
+        self._bits = bytes(bits)
+
+    def __contains__(self, id: int) -> bool:
+        index = id >> 3
+        return 0 <= index < len(self._bits) and bool(self._bits[index] & (1 << (id & 7)))
+
+
+class Entitlements:
+    """
+    Per-tier bitmaps of the lessons that tier may open, for one catalog version
+    """
+    __slots__ = ("version", "lessons", "unlocked")
+
+    def __init__(self, lessons: IdBitmap, unlocked: Dict[str, IdBitmap], version: Optional[str] = None):
+        self.version = version
+        self.lessons = lessons
+        self.unlocked = unlocked
+
+    def lesson_locked(self, tier: str, lesson_id: int) -> bool:
+        """False for unknown lessons, so the caller's 404 wins"""
+        return lesson_id in self.lessons and lesson_id not in self.unlocked[tier]
+
+
+def build_entitlements(db: Session, version: Optional[str] = None) -> Entitlements:
+    catalog = get_catalog_index()
+    if catalog is not None:
+        premium_courses = {course.id for course in catalog.courses if course.is_premium}
+        lessons = [(lesson.id, lesson.course_id, lesson.is_premium) for lesson in catalog.lessons]
+    else:
+        premium_courses = set(db.execute(select(Course.id).where(Course.is_premium.is_(True))).scalars())
+        lessons = db.execute(select(Lesson.id, Lesson.course_id, Lesson.is_premium)).all()
+
+    lesson_ids: List[int] = []
+    free_ids: List[int] = []
+    for lesson_id, course_id, is_premium in lessons:
+        lesson_ids.append(lesson_id)
+        if not is_premium and course_id not in premium_courses:
+            free_ids.append(lesson_id)
+
+    free = IdBitmap(free_ids)
+    everything = IdBitmap(lesson_ids)
+    return Entitlements(
+        everything,
+        {TIER_ANONYMOUS: free, TIER_FREE: free, TIER_PREMIUM: everything},
+        version=version
+    )
+
+
+_entitlements: Optional[Entitlements] = None
+
+
+def get_entitlements() -> Optional[Entitlements]:
+    """
+    The entitlements, or None while they are not built for the catalog
+    version this worker is on
+    """
+    entitlements = _entitlements
+    if entitlements is None or entitlements.version is None or entitlements.version != current_catalog_version():
+        return None
+    return entitlements
+
+
+def rebuild_entitlements(version: Optional[str] = None) -> Entitlements:
+    """
+    Build entitlements in a private session and swap them in atomically
+    """
+    global _entitlements
+    db = SessionLocal()
+    try:
+        entitlements = build_entitlements(db, version=version)
+    finally:
+        db.close()
+
+    _entitlements = entitlements
+    return entitlements
+
+
+def premium_lesson_ids(db: Session, lesson_ids: List[int]) -> Set[int]:
+    """
+    The lessons among `lesson_ids` that are premium themselves or through
+    their course, read from the flags; for while entitlements are rebuilt
+    """
+    catalog = get_catalog_index()
+    if catalog is not None:
+        premium = set()
+        for lesson_id in lesson_ids:
+            lesson = catalog.lesson(lesson_id)
+            course = catalog.course(lesson.course_id) if lesson is not None else None
+            if lesson is not None and (lesson.is_premium or (course is not None and course.is_premium)):
+                premium.add(lesson_id)
+        return premium
+
+    premium = set()
+    for start in range(0, len(lesson_ids), 500):
+        premium.update(db.execute(
+            select(Lesson.id)
+            .outerjoin(Course, Course.id == Lesson.course_id)
+            .where(Lesson.id.in_(lesson_ids[start:start + 500]),
+                   or_(Lesson.is_premium.is_(True), Course.is_premium.is_(True)))
+        ).scalars())
+    return premium
+
+
+def lesson_locked(db: Session, tier: str, lesson_id: int) -> bool:
+    """
+    Whether `tier` is denied a lesson. Answered from the bitmaps; only
+    while they are being rebuilt does it read the lesson and course flags.
+    """
+    if tier == TIER_PREMIUM:
+        return False
+    entitlements = get_entitlements()
+    if entitlements is not None:
+        return entitlements.lesson_locked(tier, lesson_id)
+    return lesson_id in premium_lesson_ids(db, [lesson_id])
+
+
+def redact_lessons(
+    db: Session,
+    lessons: List[Dict[str, Any]],
+    tier: str,
+    entitlements: Optional[Entitlements] = None
+) -> List[Dict[str, Any]]:
+    """
+    Lesson dicts with a "locked" flag, and the bodies of locked lessons
+    blanked. Without current entitlements the lesson and course flags
+    decide, read in one go for the whole list.
+    """
+    entitlements = entitlements or get_entitlements()
+    premium: Set[int] = set()
+    if tier != TIER_PREMIUM and entitlements is None:
+        premium = premium_lesson_ids(db, [lesson["id"] for lesson in lessons])
+    redacted = []
+    for lesson in lessons:
+        if tier == TIER_PREMIUM:
+            locked = False
+        elif entitlements is not None:
+            locked = entitlements.lesson_locked(tier, lesson["id"])
+        else:
+            locked = lesson["id"] in premium
+        if locked:
+            lesson = {**lesson, **{field: value for field, value in REDACTED_LESSON_FIELDS.items()
+                                   if field in lesson}}
+        redacted.append({**lesson, "locked": locked})
+    return redacted
@@ -0,0 +1,9 @@
+"""
+HTTP helpers shared by routes and middleware.
+"""
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Whether an If-None-Match header value matches a strong ETag"""
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
@@ -0,0 +1,73 @@
+"""
+Lesson navigation index for the Spark Tutorial platform.
+Previous/next links for every lesson are precomputed per catalog version
+so the lesson page does not need two ordered queries per view.
+"""
+from itertools import groupby
+from typing import Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from ..database import SessionLocal
+from ..models import Lesson
+from .catalog_index import get_catalog_index
+
+
+class NavigationIndex:
+    """
+    Immutable lesson_id -> {"previous": ..., "next": ...} mapping
+    """
+    def __init__(self, links: Dict[int, Dict], version: Optional[str] = None):
+        self.links = links
+        self.version = version
+
+    def get(self, lesson_id: int) -> Optional[Dict]:
+        return self.links.get(lesson_id)
+
+
+def build_navigation_index(db: Session, version: Optional[str] = None) -> NavigationIndex:
+    """
+    Link each lesson to its neighbours within the same course, by (sort_key, id)
+    """
+    catalog = get_catalog_index()
+    if catalog is not None:
+        rows = [lesson for course_id in sorted(catalog.lessons_by_course)
+                for lesson in catalog.course_lessons(course_id)]
+    else:
+        rows = db.query(Lesson.id, Lesson.title, Lesson.course_id)\
+            .order_by(Lesson.course_id, Lesson.sort_key, Lesson.id)\
+            .all()
+
+    links: Dict[int, Dict] = {}
+    for _, course_rows in groupby(rows, key=lambda row: row.course_id):
+        course_rows = list(course_rows)
+        for i, row in enumerate(course_rows):
+            prev_row = course_rows[i - 1] if i > 0 else None
+            next_row = course_rows[i + 1] if i + 1 < len(course_rows) else None
+            links[row.id] = {
+                "previous": {"id": prev_row.id, "title": prev_row.title} if prev_row else None,
+                "next": {"id": next_row.id, "title": next_row.title} if next_row else None
+            }
+    return NavigationIndex(links, version=version)
+
+
+_index: Optional[NavigationIndex] = None
+
+
+def get_navigation_index() -> Optional[NavigationIndex]:
+    return _index
+
+
+def rebuild_navigation_index(version: Optional[str] = None) -> NavigationIndex:
+    """
+    Build a new index in a private session and swap it in atomically
+    """
+    global _index
+    db = SessionLocal()
+    try:
+        index = build_navigation_index(db, version=version)
+    finally:
+        db.close()
+
+    _index = index
+    return index
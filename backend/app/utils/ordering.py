@@ -0,0 +1,71 @@
+"""
+Fractional ordering keys for the Spark Tutorial platform.
+Lessons are ordered within a course by a string sort_key compared
+byte-wise. A key can always be generated between two others, so moving a
+lesson rewrites only that lesson's key, never its neighbours'.
+
+Keys are base-62 fractions: "V" sorts between "0" and "z", "1V" between
+"1" and "2". No key ends in "0", so there is always room between two
+distinct keys.
+"""
+from typing import List, Optional
+
+DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+BASE = len(DIGITS)
+
+# Keys derived from an integer order: enough digits for any realistic
+# course, plus a middle digit so the key never ends in "0"
+ORDER_KEY_WIDTH = 4
+ORDER_KEY_SUFFIX = "V"
+
+# Keys grow by about one digit per six moves into the same gap; past this
+# the course's keys are regenerated
+MAX_KEY_LENGTH = 32
+
+
+def key_for_order(order: Optional[int]) -> str:
+    """The key of an integer position, so keys sort like the orders they came from"""
+    value = max(order or 0, 0)
+    digits = []
+    for _ in range(ORDER_KEY_WIDTH):
+        value, digit = divmod(value, BASE)
+        digits.append(DIGITS[digit])
+    if value:
+        raise ValueError(f"order {order} is too large for a sort key")
+    return "".join(reversed(digits)) + ORDER_KEY_SUFFIX
+
+
+def spread_keys(count: int) -> List[str]:
+    """`count` ascending keys, for regenerating a course's order"""
+    return [key_for_order(position + 1) for position in range(count)]
+
+
+def key_between(before: Optional[str], after: Optional[str]) -> str:
+    """
+    A key sorting strictly between `before` and `after`; None stands for
+    the start or the end of the list
+    """
+    before = before or ""
+    if after is not None and before >= after:
+        raise ValueError(f"{before!r} does not sort before {after!r}")
+    return _midpoint(before, after)
+
+
+def _midpoint(low: str, high: Optional[str]) -> str:
+    if high is not None:
+        # Keep the common prefix (low is padded with zeros)
+        common = 0
+        while common < len(high) and (low[common] if common < len(low) else "0") == high[common]:
+            common += 1
+        if common:
+            return high[:common] + _midpoint(low[common:], high[common:])
+
+    low_digit = DIGITS.index(low[0]) if low else 0
+    high_digit = DIGITS.index(high[0]) if high is not None else BASE
+    if high_digit - low_digit > 1:
+        return DIGITS[(low_digit + high_digit) // 2]
+    # Adjacent digits: the shorter `high` prefix sorts below `high`, else
+    # keep low's digit and go one digit deeper
+    if high is not None and len(high) > 1:
+        return high[:1]
+    return DIGITS[low_digit] + _midpoint(low[1:], None)
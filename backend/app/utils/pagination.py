@@ -0,0 +1,120 @@
+"""
+Keyset (cursor) pagination utilities for the Spark Tutorial platform.
+Cursors are opaque to clients and encode the (order, id) of the last row
+on a page, so the next page is a range scan instead of OFFSET.
+"""
+import base64
+import json
+from bisect import bisect_right
+from typing import Any, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Query
+
+
+def encode_cursor(order: Any, id: int) -> str:
+    """
+    Encode the sort key of the last row on a page as an opaque cursor
+    """
+    raw = json.dumps([order, id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, int]:
+    """
+    Decode a cursor produced by encode_cursor, raising 400 if it is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        order, id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(id, int):
+            raise ValueError("cursor id must be an integer")
+        return order, id
+    except (ValueError, TypeError, json.JSONDecodeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid cursor: {str(e)}")
+
+
+def nulls_first_key(order: Any, id: int) -> Tuple[bool, Any, int]:
+    """
+    Sort key for (order, id) that puts NULL orders first, as paginate()
+    does, without ever comparing None with a value
+    """
+    return (order is not None, 0 if order is None else order, id)
+
+
+def _check_limit(limit: int) -> None:
+    if limit < 1:
+        raise HTTPException(status_code=400, detail="limit must be at least 1")
+
+
+def paginate(
+    query: Query,
+    order_column,
+    id_column,
+    limit: int,
+    cursor: Optional[str] = None,
+    skip: int = 0
+) -> Query:
+    """
+    Order a query by (order, id) and select one page of it.
+    With a cursor the page starts strictly after the encoded row; without
+    one it falls back to skip/limit for backward compatibility. Rows with
+    a NULL order come first on every database.
+    """
+    _check_limit(limit)
+    query = query.order_by(order_column.nulls_first(), id_column)
+
+    if cursor:
+        last_order, last_id = decode_cursor(cursor)
+        if last_order is None:
+            # Still among the NULLs; every non-NULL row comes after them
+            query = query.filter(or_(
+                order_column.is_not(None),
+                and_(order_column.is_(None), id_column > last_id)
+            ))
+        else:
+            # Comparisons with NULL are never true, so the NULLs stay behind
+            query = query.filter(or_(
+                order_column > last_order,
+                and_(order_column == last_order, id_column > last_id)
+            ))
+    elif skip:
+        query = query.offset(skip)
+
+    return query.limit(limit)
+
+
+def paginate_sorted(
+    rows: Sequence[Any],
+    limit: int,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    order_attr: str = "order"
+) -> List[Any]:
+    """
+    paginate() for an in-memory sequence already sorted by nulls_first_key
+    """
+    _check_limit(limit)
+    start = skip
+    if cursor:
+        last_order, last_id = decode_cursor(cursor)
+        try:
+            start = bisect_right(
+                rows, nulls_first_key(last_order, last_id),
+                key=lambda row: nulls_first_key(getattr(row, order_attr), row.id)
+            )
+        except TypeError:
+            # NULLs never reach a comparison, so only a cursor from another listing can
+            raise HTTPException(status_code=400, detail="Invalid cursor: order has the wrong type")
+    return list(rows[start:start + limit])
+
+
+def next_cursor(rows: List[Any], limit: int, order_attr: str = "order") -> Optional[str]:
+    """
+    Build the cursor for the page after `rows`, or None on the last page
+    """
+    if not rows or len(rows) < limit:
+        return None
+    last = rows[-1]
+    return encode_cursor(getattr(last, order_attr), last.id)
@@ -4,13 +4,29 @@ Progress tracking utilities for the Spark Tutorial platform.
 This module provides functionality for tracking and managing user progress
 through courses and lessons.
 """
-from datetime import datetime
+from datetime import datetime, timezone
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import List, Dict, Optional
+from sqlalchemy import and_, func
+from typing import Iterable, List, Dict, Optional
 
 from ..models import User, Lesson, Course, UserProgress
 from ..schemas import UserProgressRead
+from ..realtime import publish
+from .catalog_index import get_catalog_index
+
+def _as_utc_naive(timestamp: datetime) -> datetime:
+    """Client timestamps may carry an offset; stored times are naive UTC"""
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp
+
+def _publish_progress(progress: UserProgress) -> None:
+    publish(progress.user_id, "progress", {
+        "lesson_id": progress.lesson_id,
+        "is_completed": progress.is_completed,
+        "completed_at": progress.completed_at.isoformat() if progress.completed_at else None,
+        "updated_at": progress.updated_at.isoformat() if progress.updated_at else None
+    })
 
 class ProgressTracker:
     """
@@ -40,23 +56,22 @@ class ProgressTracker:
         """
         Calculate user's progress in a specific course
         """
-        # Get total lessons in course
-        total_lessons = self.db.query(func.count(Lesson.id)).filter(
-            Lesson.course_id == course_id
-        ).scalar()
+        # Lessons of the published catalog, not the draft
+        lesson_ids = self._course_lesson_ids(course_id)
+        total_lessons = len(lesson_ids)
 
         # Get completed lessons
         completed_lessons = self.db.query(func.count(UserProgress.id)).filter(
             UserProgress.user_id == user_id,
             UserProgress.is_completed == True,
-            Lesson.course_id == course_id
-        ).join(Lesson).scalar()
+            UserProgress.lesson_id.in_(lesson_ids)
+        ).scalar()
 
         # Get last accessed lesson
         last_accessed = self.db.query(UserProgress).filter(
             UserProgress.user_id == user_id,
-            Lesson.course_id == course_id
-        ).join(Lesson).order_by(
+            UserProgress.lesson_id.in_(lesson_ids)
+        ).order_by(
             UserProgress.updated_at.desc()
         ).first()
 
@@ -75,7 +90,8 @@ class ProgressTracker:
         """
         Get progress for all courses a user has started
         """
-        courses = self.db.query(Course).all()
+        catalog = get_catalog_index()
+        courses = catalog.courses if catalog is not None else self.db.query(Course).all()
         return [
             {
                 "course_id": course.id,
@@ -85,6 +101,111 @@ class ProgressTracker:
             for course in courses
         ]
 
+    def _course_lesson_ids(self, course_id: int) -> List[int]:
+        catalog = get_catalog_index()
+        if catalog is not None:
+            return [lesson.id for lesson in catalog.course_lessons(course_id)]
+        return [lesson_id for (lesson_id,) in self.db.query(Lesson.id).filter(Lesson.course_id == course_id)]
+
+    def get_lessons_progress(
+        self,
+        user_id: int,
+        lesson_ids: Optional[Iterable[int]] = None,
+        course_id: Optional[int] = None
+    ) -> Dict[int, Optional[UserProgress]]:
+        """
+        Progress for many lessons in one query, keyed by lesson ID. Lessons
+        the user has not started map to None; unknown lessons are left out.
+        """
+        catalog = get_catalog_index()
+        if catalog is not None:
+            if lesson_ids is not None:
+                records = [catalog.lesson(lesson_id) for lesson_id in dict.fromkeys(lesson_ids)]
+                known = [record.id for record in records
+                         if record is not None and (course_id is None or record.course_id == course_id)]
+            elif course_id is not None:
+                known = [lesson.id for lesson in catalog.course_lessons(course_id)]
+            else:
+                known = [lesson.id for lesson in catalog.lessons]
+
+            result: Dict[int, Optional[UserProgress]] = dict.fromkeys(known)
+            # Oldest first, so the newest of any duplicate rows wins
+            for progress in self.db.query(UserProgress).filter(
+                UserProgress.user_id == user_id,
+                UserProgress.lesson_id.in_(known)
+            ).order_by(UserProgress.updated_at):
+                result[progress.lesson_id] = progress
+            return result
+
+        query = self.db.query(Lesson.id, UserProgress).outerjoin(
+            UserProgress,
+            and_(UserProgress.lesson_id == Lesson.id, UserProgress.user_id == user_id)
+        )
+        if lesson_ids is not None:
+            query = query.filter(Lesson.id.in_(list(lesson_ids)))
+        if course_id is not None:
+            query = query.filter(Lesson.course_id == course_id)
+
+        result = {}
+        for lesson_id, progress in query.order_by(UserProgress.updated_at):
+            if progress is not None or lesson_id not in result:
+                result[lesson_id] = progress
+        return result
+
+    def get_course_progress_detail(
+        self,
+        user_id: int,
+        course_id: int,
+        lesson_order: List[int]
+    ) -> Dict:
+        """
+        Course summary (as get_course_progress), per-lesson progress and the
+        lesson to resume, from one query. `lesson_order` is the course's
+        lesson IDs in display order.
+        """
+        lessons = self.get_lessons_progress(user_id, course_id=course_id)
+        started = [progress for progress in lessons.values() if progress is not None]
+        completed = sum(1 for progress in started if progress.is_completed)
+        last_accessed = max(started, key=lambda progress: progress.updated_at or datetime.min, default=None)
+        total = len(lessons)
+
+        return {
+            "summary": {
+                "total_lessons": total,
+                "completed_lessons": completed,
+                "completion_percentage": (completed / total * 100) if total > 0 else 0,
+                "last_accessed_lesson_id": last_accessed.lesson_id if last_accessed else None,
+                "last_accessed_at": last_accessed.updated_at if last_accessed else None
+            },
+            "lessons": {
+                lesson_id: UserProgressRead.model_validate(progress) if progress is not None else None
+                for lesson_id, progress in lessons.items()
+            },
+            "resume_lesson_id": next(
+                (lesson_id for lesson_id in lesson_order
+                 if lessons.get(lesson_id) is None or not lessons[lesson_id].is_completed),
+                None
+            )
+        }
+
+    def _apply(
+        self,
+        progress: Optional[UserProgress],
+        user_id: int,
+        lesson_id: int,
+        is_completed: bool,
+        client_timestamp: datetime
+    ) -> UserProgress:
+        now = datetime.utcnow()
+        if not progress:
+            progress = UserProgress(user_id=user_id, lesson_id=lesson_id)
+            self.db.add(progress)
+        progress.is_completed = is_completed
+        progress.completed_at = now if is_completed else None
+        progress.client_updated_at = client_timestamp
+        progress.updated_at = now
+        return progress
+
     def update_lesson_progress(
         self,
         user_id: int,
@@ -95,24 +216,76 @@ class ProgressTracker:
         Update or create progress record for a lesson
         """
         progress = self.get_user_lesson_progress(user_id, lesson_id)
-        
-        if not progress:
-            progress = UserProgress(
-                user_id=user_id,
-                lesson_id=lesson_id,
-                is_completed=is_completed,
-                completed_at=datetime.utcnow() if is_completed else None
-            )
-            self.db.add(progress)
-        else:
-            progress.is_completed = is_completed
-            progress.completed_at = datetime.utcnow() if is_completed else None
-            progress.updated_at = datetime.utcnow()
+        progress = self._apply(progress, user_id, lesson_id, is_completed, datetime.utcnow())
 
         self.db.commit()
         self.db.refresh(progress)
+        _publish_progress(progress)
         return progress
 
+    def apply_progress_batch(
+        self,
+        user_id: int,
+        updates: List[Dict]
+    ) -> List[Dict]:
+        """
+        Apply several progress changes (dicts with lesson_id, is_completed
+        and client_timestamp) in one transaction. Per lesson, the change
+        with the latest client timestamp wins, including against what is
+        already stored, so replaying an offline queue out of order is safe.
+        """
+        # Collapse the batch to the latest change per lesson
+        latest: Dict[int, Dict] = {}
+        for update in updates:
+            timestamp = _as_utc_naive(update["client_timestamp"])
+            current = latest.get(update["lesson_id"])
+            if current is None or timestamp >= current["client_timestamp"]:
+                latest[update["lesson_id"]] = {**update, "client_timestamp": timestamp}
+
+        existing = self.get_lessons_progress(user_id, lesson_ids=latest.keys())
+        outcomes: Dict[int, Dict] = {}
+        changed: List[UserProgress] = []
+        for lesson_id, update in latest.items():
+            if lesson_id not in existing:
+                outcomes[lesson_id] = {"lesson_id": lesson_id, "status": "not_found", "progress": None}
+                continue
+
+            progress = existing[lesson_id]
+            stored_at = None
+            if progress is not None:
+                stored_at = progress.client_updated_at or progress.updated_at
+            if stored_at is not None and update["client_timestamp"] <= stored_at:
+                outcomes[lesson_id] = {"lesson_id": lesson_id, "status": "stale", "progress": progress}
+                continue
+
+            progress = self._apply(
+                progress, user_id, lesson_id, update["is_completed"], update["client_timestamp"]
+            )
+            changed.append(progress)
+            outcomes[lesson_id] = {"lesson_id": lesson_id, "status": "applied", "progress": progress}
+
+        if changed:
+            self.db.flush()
+            # Commit expires every loaded row, the stale ones returned below included;
+            # reload them all in one query rather than one lazy load each
+            reload_ids = [progress.id for progress in changed] + [
+                outcome["progress"].id for outcome in outcomes.values()
+                if outcome["status"] == "stale"
+            ]
+            self.db.commit()
+            self.db.query(UserProgress).filter(UserProgress.id.in_(reload_ids)).all()
+            for progress in changed:
+                _publish_progress(progress)
+
+        # One result per submitted lesson, in submission order
+        seen = set()
+        results = []
+        for update in updates:
+            if update["lesson_id"] not in seen:
+                seen.add(update["lesson_id"])
+                results.append(outcomes[update["lesson_id"]])
+        return results
+
     def get_next_lesson(
         self, 
         user_id: int, 
@@ -134,6 +307,6 @@ class ProgressTracker:
         next_lesson = self.db.query(Lesson).filter(
             Lesson.course_id == course_id,
             ~Lesson.id.in_(completed_ids)
-        ).order_by(Lesson.order).first()
+        ).order_by(Lesson.sort_key, Lesson.id).first()
 
         return next_lesson
\ No newline at end of file
@@ -0,0 +1,236 @@
+"""
+Typeahead suggestions for the Spark Tutorial platform.
+This module keeps an in-memory prefix trie over course titles, lesson titles
+and key terms so the header search box can be served without database access.
+"""
+import re
+import unicodedata
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..database import SessionLocal
+from ..models import Course, Lesson, UserProgress
+from .catalog_index import get_catalog_index
+
+# Number of ranked entries kept on each trie node
+MAX_NODE_ENTRIES = 32
+
+# Fuzzy matching only kicks in once the query is long enough to be meaningful
+MIN_FUZZY_QUERY_LENGTH = 3
+
+STOP_WORDS = {"a", "an", "and", "for", "in", "of", "on", "the", "to", "with"}
+
+_WORD_RE = re.compile(r"[^\W_]+")
+
+
+def fold(text: str) -> str:
+    """
+    Case- and diacritic-fold text so "Évaluation" matches "evaluation"
+    """
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(stripped.casefold().split())
+
+
+def _words(text: Optional[str]) -> List[str]:
+    if not text:
+        return []
+    return [
+        word for word in _WORD_RE.findall(fold(text))
+        if len(word) > 1 and word not in STOP_WORDS and not word.isdigit()
+    ]
+
+
+class SuggestEntry:
+    """
+    A single suggestable course or lesson
+    """
+    __slots__ = ("kind", "id", "title", "course_id", "popularity", "words")
+
+    def __init__(self, kind: str, id: int, title: str, course_id: Optional[int],
+                 popularity: int, words: frozenset):
+        self.kind = kind
+        self.id = id
+        self.title = title
+        self.course_id = course_id
+        self.popularity = popularity
+        self.words = words
+
+    def to_dict(self) -> Dict:
+        return {
+            "type": self.kind,
+            "id": self.id,
+            "title": self.title,
+            "course_id": self.course_id
+        }
+
+
+class _TrieNode:
+    __slots__ = ("children", "own", "top")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.own: Set[int] = set()
+        self.top: Tuple[int, ...] = ()
+
+
+class SuggestIndex:
+    """
+    Immutable prefix index; rebuild and swap it rather than mutating in place.
+    Entry positions double as ranks: entries are stored most popular first.
+    """
+    def __init__(self, entries: List[SuggestEntry], version: Optional[str] = None):
+        self.version = version
+        self.entries = sorted(
+            entries,
+            key=lambda e: (-e.popularity, e.kind != "course", len(e.title), e.title)
+        )
+        self.root = _TrieNode()
+
+        for rank, entry in enumerate(self.entries):
+            for term in {fold(entry.title), *entry.words}:
+                self._insert(term, rank)
+        self._collect(self.root)
+
+    def _insert(self, term: str, rank: int) -> None:
+        node = self.root
+        for char in term:
+            node = node.children.setdefault(char, _TrieNode())
+        node.own.add(rank)
+
+    def _collect(self, node: _TrieNode) -> Tuple[int, ...]:
+        ranks = set(node.own)
+        for child in node.children.values():
+            ranks.update(self._collect(child))
+        node.top = tuple(sorted(ranks)[:MAX_NODE_ENTRIES])
+        return node.top
+
+    def _exact(self, prefix: str) -> Tuple[int, ...]:
+        node = self.root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return ()
+        return node.top
+
+    def _fuzzy(self, prefix: str) -> Dict[int, int]:
+        """
+        Walk the trie with a bounded Levenshtein row, returning rank -> distance
+        for every entry having a term whose prefix is within distance 1
+        """
+        matches: Dict[int, int] = {}
+        stack = [(self.root, list(range(len(prefix) + 1)))]
+        while stack:
+            node, row = stack.pop()
+            for char, child in node.children.items():
+                next_row = [row[0] + 1]
+                for i, query_char in enumerate(prefix, start=1):
+                    next_row.append(min(
+                        next_row[i - 1] + 1,
+                        row[i] + 1,
+                        row[i - 1] + (query_char != char)
+                    ))
+                if next_row[-1] <= 1:
+                    # Every term below this node matches; no need to descend
+                    for rank in child.top:
+                        if matches.get(rank, 2) > next_row[-1]:
+                            matches[rank] = next_row[-1]
+                elif min(next_row) <= 1:
+                    stack.append((child, next_row))
+        return matches
+
+    def suggest(self, query: str, limit: int = 8) -> List[Dict]:
+        """
+        Return up to `limit` suggestions, exact prefix matches first
+        """
+        folded = fold(query)
+        if not folded:
+            return []
+
+        matches: Dict[int, int] = {rank: 0 for rank in self._exact(folded)}
+
+        # "spark arch": last token as a prefix, earlier tokens as word prefixes
+        tokens = folded.split()
+        last, leading = tokens[-1], tokens[:-1]
+
+        def has_leading(rank: int) -> bool:
+            words = self.entries[rank].words
+            return all(any(w.startswith(t) for w in words) for t in leading)
+
+        if leading:
+            for rank in self._exact(last):
+                if has_leading(rank):
+                    matches.setdefault(rank, 0)
+
+        if len(matches) < limit and len(last) >= MIN_FUZZY_QUERY_LENGTH:
+            for rank, distance in self._fuzzy(last).items():
+                if has_leading(rank):
+                    matches.setdefault(rank, distance)
+
+        ranked = sorted(matches.items(), key=lambda item: (item[1], item[0]))
+        return [self.entries[rank].to_dict() for rank, _ in ranked[:limit]]
+
+
+def build_suggest_index(db: Session, version: Optional[str] = None) -> SuggestIndex:
+    """
+    Load titles, key terms and progress counts and build a fresh index
+    """
+    lesson_counts = dict(
+        db.query(UserProgress.lesson_id, func.count(UserProgress.id))
+        .group_by(UserProgress.lesson_id)
+        .all()
+    )
+
+    entries: List[SuggestEntry] = []
+    course_popularity: Dict[int, int] = {}
+
+    catalog = get_catalog_index()
+    lessons = catalog.lessons if catalog is not None else db.query(
+        Lesson.id, Lesson.title, Lesson.course_id, Lesson.key_points
+    ).all()
+    for lesson in lessons:
+        popularity = lesson_counts.get(lesson.id, 0)
+        course_popularity[lesson.course_id] = course_popularity.get(lesson.course_id, 0) + popularity
+        entries.append(SuggestEntry(
+            "lesson", lesson.id, lesson.title or "", lesson.course_id, popularity,
+            frozenset(_words(lesson.title) + _words(lesson.key_points))
+        ))
+
+    courses = catalog.courses if catalog is not None else db.query(Course.id, Course.title, Course.tags).all()
+    for course in courses:
+        tags = " ".join(course.tags) if isinstance(course.tags, list) else None
+        entries.append(SuggestEntry(
+            "course", course.id, course.title or "", None,
+            course_popularity.get(course.id, 0),
+            frozenset(_words(course.title) + _words(tags))
+        ))
+
+    return SuggestIndex(entries, version=version)
+
+
+_index: Optional[SuggestIndex] = None
+
+
+def get_suggest_index() -> Optional[SuggestIndex]:
+    """
+    Return the currently published index (None until the first build)
+    """
+    return _index
+
+
+def rebuild_suggest_index(version: Optional[str] = None) -> SuggestIndex:
+    """
+    Build a new index in a private session and swap it in atomically
+    """
+    global _index
+    db = SessionLocal()
+    try:
+        index = build_suggest_index(db, version=version)
+    finally:
+        db.close()
+
+    _index = index
+    print(f"Suggest index rebuilt: {len(index.entries)} entries (catalog {version})")
+    return index
@@ -0,0 +1,310 @@
+"""
+Delta sync utilities for the Spark Tutorial platform.
+Catalog writes are recorded in the catalog_changes log; a sync token
+encodes a client's position in that log and the time of the newest
+progress row it has seen, so offline clients fetch only what changed.
+Once a catalog is published (app.publishing) clients sync the published
+version instead: the token names the version they have, and the delta is
+the difference between the two versions' rows.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+
+from ..models import (
+    CatalogChange, CatalogRowPayload, CatalogVersion, CatalogVersionRow, Course, Lesson, Resource,
+    UserProgress, lesson_prerequisites
+)
+from .catalog import published_version_id
+from .entitlements import TIER_PREMIUM, get_entitlements, premium_lesson_ids, redact_lessons
+
+TOKEN_VERSION = 1
+ENTITIES = ("course", "lesson", "resource")
+# Kept in published row payloads for the in-memory catalog, not synced
+PUBLISHED_ONLY_FIELDS = {
+    "course": ("tags",),
+    "lesson": ("rendered_hash", "interactive_elements"),
+    "resource": (),
+}
+
+
+def record_catalog_changes(
+    db: Session,
+    entity: str,
+    ids: Iterable[int],
+    op: str = "upsert",
+    now: Optional[datetime] = None
+) -> None:
+    """
+    Append changes to the log in the caller's transaction, so they commit
+    or roll back together with the catalog write
+    """
+    ids = list(ids)
+    if not ids:
+        return
+    now = now or datetime.utcnow()
+    db.execute(insert(CatalogChange), [
+        {"entity": entity, "entity_id": entity_id, "op": op, "changed_at": now}
+        for entity_id in ids
+    ])
+
+
+def encode_sync_token(
+    change_id: int,
+    progress_at: Optional[datetime],
+    tier: Optional[str] = None,
+    version_id: Optional[int] = None
+) -> str:
+    """
+    Encode a log position, progress watermark, the access tier the
+    client's copy was redacted for and the published version it holds as
+    an opaque token
+    """
+    raw = json.dumps(
+        {"v": TOKEN_VERSION, "c": change_id, "p": progress_at.isoformat() if progress_at else None,
+         "t": tier, "r": version_id},
+        separators=(",", ":")
+    ).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_sync_token(token: str) -> Tuple[int, Optional[datetime], Optional[str], Optional[int]]:
+    """
+    Decode a token produced by encode_sync_token, raising 400 if it is malformed
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if data.get("v") != TOKEN_VERSION or not isinstance(data.get("c"), int):
+            raise ValueError("unsupported token")
+        progress_at = datetime.fromisoformat(data["p"]) if data.get("p") else None
+        version_id = data.get("r")
+        if version_id is not None and not isinstance(version_id, int):
+            raise ValueError("bad version")
+        return data["c"], progress_at, data.get("t"), version_id
+    except (ValueError, TypeError, AttributeError, json.JSONDecodeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid sync token: {str(e)}")
+
+
+def _course_rows(db: Session, ids: Optional[List[int]] = None) -> List[Dict[str, Any]]:
+    query = db.query(
+        Course.id, Course.title, Course.description, Course.order,
+        Course.is_premium, Course.updated_at
+    )
+    if ids is not None:
+        query = query.filter(Course.id.in_(ids))
+    return [dict(row._mapping) for row in query.order_by(Course.id)]
+
+
+def _lesson_rows(db: Session, ids: Optional[List[int]] = None) -> List[Dict[str, Any]]:
+    query = db.query(Lesson)
+    if ids is not None:
+        query = query.filter(Lesson.id.in_(ids))
+    lessons = query.order_by(Lesson.id).all()
+
+    prereq_query = select(lesson_prerequisites.c.lesson_id, lesson_prerequisites.c.prerequisite_id)
+    if ids is not None:
+        prereq_query = prereq_query.where(lesson_prerequisites.c.lesson_id.in_(ids))
+    prerequisites: Dict[int, List[int]] = {}
+    for lesson_id, prerequisite_id in db.execute(prereq_query):
+        prerequisites.setdefault(lesson_id, []).append(prerequisite_id)
+
+    return [
+        {
+            "id": lesson.id,
+            "title": lesson.title,
+            "description": lesson.description,
+            "content": lesson.content,
+            "content_sections": lesson.content_sections or [],
+            "code_samples": lesson.code_samples or [],
+            "key_points": lesson.key_points,
+            "order": lesson.order,
+            "sort_key": lesson.sort_key,
+            "difficulty": lesson.difficulty.value if lesson.difficulty else "beginner",
+            "lesson_type": lesson.lesson_type.value if lesson.lesson_type else "theory",
+            "estimated_time": lesson.estimated_time,
+            "learning_objectives": lesson.learning_objectives,
+            "is_premium": lesson.is_premium,
+            "course_id": lesson.course_id,
+            "prerequisites": sorted(prerequisites.get(lesson.id, [])),
+            "updated_at": lesson.updated_at,
+        }
+        for lesson in lessons
+    ]
+
+
+def _resource_rows(db: Session, ids: Optional[List[int]] = None) -> List[Dict[str, Any]]:
+    query = db.query(
+        Resource.id, Resource.lesson_id, Resource.title, Resource.type,
+        Resource.content, Resource.description, Resource.blob_hash, Resource.size,
+        Resource.media_type, Resource.filename, Resource.updated_at
+    )
+    if ids is not None:
+        query = query.filter(Resource.id.in_(ids))
+    return [dict(row._mapping) for row in query.order_by(Resource.id)]
+
+
+LOADERS = {"course": _course_rows, "lesson": _lesson_rows, "resource": _resource_rows}
+
+
+def _redact(entity: str, rows: List[Dict[str, Any]], db: Session, tier: str) -> List[Dict[str, Any]]:
+    """Blank what `tier` may not read: locked lessons' bodies and their inline resources"""
+    if entity == "lesson":
+        return redact_lessons(db, rows, tier)
+    if entity == "resource":
+        entitlements = get_entitlements()
+        if tier == TIER_PREMIUM:
+            return rows
+        if entitlements is not None:
+            return [{**row, "content": None}
+                    if row["lesson_id"] is not None and entitlements.lesson_locked(tier, row["lesson_id"])
+                    else row
+                    for row in rows]
+        premium = premium_lesson_ids(db, list({row["lesson_id"] for row in rows} - {None}))
+        return [{**row, "content": None} if row["lesson_id"] in premium else row for row in rows]
+    return rows
+
+
+def _version_hashes(db: Session, version_id: int) -> Dict[Tuple[str, int], str]:
+    return {
+        (entity, entity_id): row_hash
+        for entity, entity_id, row_hash in db.execute(
+            select(CatalogVersionRow.entity, CatalogVersionRow.entity_id, CatalogVersionRow.row_hash)
+            .where(CatalogVersionRow.version_id == version_id)
+        )
+    }
+
+
+def _version_changes(
+    db: Session,
+    version_id: int,
+    since_version_id: Optional[int]
+) -> Tuple[Dict[str, Dict[str, List]], bool]:
+    """
+    The rows of published version `version_id` that differ from
+    `since_version_id`, or all of them (and reset=True) when the client
+    has no version or one that was pruned
+    """
+    current = _version_hashes(db, version_id)
+    reset = since_version_id is None or db.get(CatalogVersion, since_version_id) is None
+    previous = {} if reset else _version_hashes(db, since_version_id)
+
+    changed = {key: row_hash for key, row_hash in current.items() if previous.get(key) != row_hash}
+    payloads: Dict[str, Dict[str, Any]] = {}
+    hashes = list(set(changed.values()))
+    for start in range(0, len(hashes), 500):
+        payloads.update(db.execute(
+            select(CatalogRowPayload.row_hash, CatalogRowPayload.payload)
+            .where(CatalogRowPayload.row_hash.in_(hashes[start:start + 500]))
+        ).all())
+
+    changes: Dict[str, Dict[str, List]] = {entity: {"upserted": [], "deleted": []} for entity in ENTITIES}
+    for (entity, entity_id), row_hash in sorted(changed.items()):
+        hidden = PUBLISHED_ONLY_FIELDS.get(entity, ())
+        changes[entity]["upserted"].append(
+            {key: value for key, value in payloads[row_hash].items() if key not in hidden}
+        )
+    for entity, entity_id in sorted(set(previous) - set(current)):
+        changes[entity]["deleted"].append(entity_id)
+    return changes, reset
+
+
+def _progress_rows(
+    db: Session,
+    user_id: int,
+    since: Optional[datetime]
+) -> Tuple[List[UserProgress], Optional[datetime]]:
+    query = db.query(UserProgress).filter(UserProgress.user_id == user_id)
+    if since is not None:
+        query = query.filter(UserProgress.updated_at > since)
+    rows = query.order_by(UserProgress.updated_at, UserProgress.id).all()
+    return rows, (rows[-1].updated_at if rows else since)
+
+
+def build_sync(
+    db: Session,
+    user_id: int,
+    token: Optional[str] = None,
+    limit: int = 500,
+    tier: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Changes since `token` as {entity: {"upserted": [...], "deleted": [...]}}
+    plus changed progress and a token for the next call. Without a token,
+    or when the log no longer reaches back to it, the whole catalog is
+    returned with reset=True and the client replaces its local copy.
+    At most `limit` log entries are consumed per call; has_more says
+    whether to call again right away.
+    Once a catalog is published the published version is synced instead,
+    in one call.
+    With a `tier`, content it may not open is redacted, and a token
+    issued for another tier forces a reset so upgrades fetch the bodies.
+    """
+    latest_id, oldest_id = db.query(func.max(CatalogChange.id), func.min(CatalogChange.id)).one()
+    latest_id = latest_id or 0
+
+    since_id, progress_since, token_tier, since_version_id = decode_sync_token(token) if token \
+        else (None, None, None, None)
+    version_id = published_version_id(db)
+    reset = since_id is None or since_id > latest_id or token_tier != tier or (
+        oldest_id is not None and since_id < oldest_id - 1
+    ) or (since_version_id is not None and version_id is None)
+
+    changes: Dict[str, Dict[str, List]] = {}
+    has_more = False
+    if version_id is not None:
+        position = latest_id
+        changes, reset = _version_changes(
+            db, version_id, since_version_id if token_tier == tier else None
+        )
+        if reset:
+            progress_since = None
+    elif reset:
+        # Position first: anything written while the snapshot is read is replayed next time
+        position = latest_id
+        progress_since = None
+        for entity in ENTITIES:
+            changes[entity] = {"upserted": LOADERS[entity](db), "deleted": []}
+    else:
+        log = db.query(CatalogChange.id, CatalogChange.entity, CatalogChange.entity_id, CatalogChange.op)\
+            .filter(CatalogChange.id > since_id)\
+            .order_by(CatalogChange.id)\
+            .limit(limit + 1)\
+            .all()
+        has_more = len(log) > limit
+        log = log[:limit]
+        position = log[-1].id if log else since_id
+
+        # Only the last change per row matters
+        final_ops: Dict[str, Dict[int, str]] = {entity: {} for entity in ENTITIES}
+        for change in log:
+            if change.entity in final_ops:
+                final_ops[change.entity][change.entity_id] = change.op
+
+        for entity in ENTITIES:
+            upsert_ids = [i for i, op in final_ops[entity].items() if op == "upsert"]
+            deleted = {i for i, op in final_ops[entity].items() if op == "delete"}
+            upserted = LOADERS[entity](db, upsert_ids) if upsert_ids else []
+            # Rows deleted later in the log than this page reaches are gone already
+            deleted.update(set(upsert_ids) - {row["id"] for row in upserted})
+            changes[entity] = {"upserted": upserted, "deleted": sorted(deleted)}
+
+    if tier is not None:
+        for entity in ENTITIES:
+            changes[entity]["upserted"] = _redact(entity, changes[entity]["upserted"], db, tier)
+
+    progress, progress_at = _progress_rows(db, user_id, progress_since)
+    return {
+        "token": encode_sync_token(position, progress_at, tier, version_id),
+        "reset": reset,
+        "has_more": has_more,
+        "courses": changes["course"],
+        "lessons": changes["lesson"],
+        "resources": changes["resource"],
+        "progress": progress,
+    }
@@ -0,0 +1,143 @@
+"""
+Memory footprint of the in-memory catalog against the ORM path.
+
+Builds a synthetic catalog in a throwaway SQLite database and, with
+tracemalloc, measures:
+
+  - the memory held by the whole catalog as ORM instances (one session
+    with every course, lesson and resource loaded) and as a CatalogIndex;
+  - the allocations and latency of serving one lesson, through the
+    endpoint's database path and through the index.
+
+Run it from the backend directory with the usual environment (.env):
+
+    cd backend
+    python benchmarks/catalog_memory.py --courses 20 --lessons 50
+"""
+import argparse
+import contextlib
+import gc
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def populate(engine, courses: int, lessons_per_course: int, content_size: int) -> list:
+    from sqlalchemy.orm import Session
+    from app.models import Base, Course, DifficultyLevel, Lesson, LessonType, Resource
+
+    Base.metadata.create_all(engine)
+    words = ["spark", "partition", "shuffle", "executor", "dataframe", "join", "cache", "stage"]
+    rng = random.Random(0)
+    lesson_ids = []
+    with Session(engine) as db:
+        for c in range(courses):
+            course = Course(title=f"Course {c}", description="Synthetic course " * 8, order=c)
+            db.add(course)
+            db.flush()
+            for l in range(lessons_per_course):
+                body = " ".join(rng.choice(words) for _ in range(content_size // 8))
+                lesson = Lesson(
+                    course_id=course.id, title=f"Lesson {c}.{l}", description="Synthetic lesson " * 4,
+                    content=body, order=l, difficulty=DifficultyLevel.BEGINNER,
+                    lesson_type=LessonType.THEORY, estimated_time=15,
+                    learning_objectives="Understand " + " ".join(words),
+                    content_sections=[{"title": f"Part {i}", "content": body[:400], "order": i, "type": "text"}
+                                      for i in range(3)],
+                    code_samples=[{"title": "Example", "code": "df.groupBy('k').count()", "language": "python"}],
+                )
+                db.add(lesson)
+                db.flush()
+                lesson_ids.append(lesson.id)
+                for r in range(2):
+                    db.add(Resource(lesson_id=lesson.id, title=f"Resource {r}", type="guide",
+                                    description="Synthetic resource", size=1024,
+                                    media_type="text/plain; charset=utf-8", filename=f"r{r}.txt"))
+        db.commit()
+    return lesson_ids
+
+
+def measure(label: str, load):
+    """Memory still held by load()'s result, and the peak while building it"""
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = load()
+    elapsed = (time.perf_counter() - started) * 1000
+    gc.collect()
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label}: {held / 1024 / 1024:.1f}MB held, {peak / 1024 / 1024:.1f}MB peak, {elapsed:.0f}ms")
+    return result
+
+
+def per_request(label: str, serve, lesson_ids: list, requests: int) -> str:
+    ids = [lesson_ids[i % len(lesson_ids)] for i in range(requests)]
+    tracemalloc.start()
+    peaks = []
+    for lesson_id in ids[:200]:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        serve(lesson_id)
+        peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    for lesson_id in ids:
+        serve(lesson_id)
+    elapsed = (time.perf_counter() - started) / len(ids) * 1_000_000
+    return f"{label}: {sum(peaks) / len(peaks) / 1024:.1f}KB allocated per lesson, {elapsed:.0f}us per lesson"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--courses", type=int, default=20)
+    parser.add_argument("--lessons", type=int, default=50, help="lessons per course")
+    parser.add_argument("--content-size", type=int, default=4000, help="bytes of Markdown per lesson")
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+    from app.main import _load_lesson
+    from app.models import Course, Lesson, Resource
+    from app.utils.catalog_index import build_catalog_index
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'catalog.db')}")
+        lesson_ids = populate(engine, args.courses, args.lessons, args.content_size)
+        print(f"{args.courses} courses, {len(lesson_ids)} lessons, {len(lesson_ids) * 2} resources\n")
+
+        def load_orm():
+            db = Session(engine)
+            return db, db.query(Course).all(), db.query(Lesson).all(), db.query(Resource).all()
+
+        orm = measure("ORM instances", load_orm)
+        orm[0].close()
+        del orm
+
+        with Session(engine) as db:
+            index = measure("CatalogIndex", lambda: build_catalog_index(db))
+        print()
+
+        # The endpoint's loader without an index: query, ORM instance, dict.
+        # It logs every lookup; keep the report readable
+        with Session(engine) as db, contextlib.redirect_stdout(io.StringIO()):
+            orm_report = per_request(
+                "ORM path", lambda i: (_load_lesson(db, i), db.expunge_all()), lesson_ids, args.requests
+            )
+        print(orm_report)
+        print(per_request("CatalogIndex", lambda i: index.lesson(i).to_dict(), lesson_ids, args.requests))
+        engine.dispose()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
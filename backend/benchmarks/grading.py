@@ -0,0 +1,80 @@
+"""
+Deadline-rush benchmark for exercise grading.
+
+Submits one distinct solution per simulated learner, all at once, to a
+GradingService with its own sandbox pool, and reports throughput and
+latency percentiles. Run it from the backend directory with the usual
+environment (.env) in place:
+
+    cd backend
+    python benchmarks/grading.py --learners 60 --pool-size 4
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+EXERCISE = {
+    "reference_solution": (
+        "from collections import Counter\n"
+        "def top_words(text, n):\n"
+        "    return [w for w, _ in Counter(text.split()).most_common(n)]\n"
+    ),
+    "tests": [
+        {"name": "basic", "expression": "top_words('a b a c a b', 2)"},
+        {"name": "empty", "expression": "top_words('', 3)"},
+        {"name": "ties", "expression": "top_words('x y z', 3)"},
+        {"name": "long", "expression": "top_words(' '.join(str(i % 7) for i in range(5000)), 3)"},
+    ],
+}
+
+
+async def run(learners: int, pool_size: int) -> int:
+    from app.execution import PythonEngine, execution_limits
+    from app.grading import GradingService
+    from app.schemas import ExerciseSpec
+
+    spec = ExerciseSpec.model_validate(EXERCISE)
+    service = GradingService(PythonEngine(pool_size, execution_limits()), max_queue=learners)
+    service.start()
+    try:
+        # Reference outputs are normally precomputed at startup
+        await service.reference_values(spec)
+
+        async def submit(learner: int) -> float:
+            # A comment makes every submission distinct, defeating the result cache
+            code = f"# learner {learner}\n{EXERCISE['reference_solution']}"
+            started = time.perf_counter()
+            result = await service.grade(learner, spec, code)
+            if not result["passed"]:
+                raise RuntimeError(f"Learner {learner} unexpectedly failed: {result}")
+            return (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        latencies = sorted(await asyncio.gather(*(submit(i) for i in range(learners))))
+        elapsed = time.perf_counter() - started
+    finally:
+        service.stop()
+
+    tests = learners * len(spec.tests)
+    print(f"{learners} submissions ({tests} test runs) on {pool_size} workers in {elapsed:.2f}s")
+    print(f"  throughput: {learners / elapsed:.1f} submissions/s, {tests / elapsed:.1f} tests/s")
+    print(f"  latency p50: {statistics.median(latencies):.0f}ms  "
+          f"p95: {latencies[int(len(latencies) * 0.95) - 1]:.0f}ms  max: {latencies[-1]:.0f}ms")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--learners", type=int, default=60)
+    parser.add_argument("--pool-size", type=int, default=4)
+    args = parser.parse_args()
+    return asyncio.run(run(args.learners, args.pool_size))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
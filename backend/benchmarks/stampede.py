@@ -0,0 +1,86 @@
+"""
+Cache stampede benchmark for catalog reads.
+
+Simulates a catalog publish: many concurrent readers of /courses find
+the cache empty at the same moment, first with request coalescing and
+then with every reader computing on its own, and reports how many times
+the query ran and the read latency. Run it from the backend directory
+with the usual environment (.env) in place and a seeded database:
+
+    cd backend
+    python benchmarks/stampede.py --readers 64
+"""
+import argparse
+import contextlib
+import io
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def run_readers(readers: int, read) -> list:
+    barrier = threading.Barrier(readers)
+
+    def reader(_):
+        barrier.wait()
+        started = time.perf_counter()
+        read()
+        return (time.perf_counter() - started) * 1000
+
+    with ThreadPoolExecutor(readers) as pool:
+        return sorted(pool.map(reader, range(readers)))
+
+
+def report(label: str, computations: int, latencies: list) -> None:
+    print(f"{label}: {computations} queries for {len(latencies)} readers")
+    print(f"  latency p50: {statistics.median(latencies):.1f}ms  "
+          f"p95: {latencies[int(len(latencies) * 0.95) - 1]:.1f}ms  max: {latencies[-1]:.1f}ms")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--readers", type=int, default=64)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    from app.cache import MemoryCache, cached_catalog
+    from app import cache as cache_module
+    from app.database import SessionLocal
+    from app.main import _load_courses
+
+    cache_module._cache = MemoryCache()
+    computations = [0]
+    lock = threading.Lock()
+
+    def compute():
+        with lock:
+            computations[0] += 1
+        db = SessionLocal()
+        try:
+            return _load_courses(db, 0, 100, None)
+        finally:
+            db.close()
+
+    for label, read in (
+        ("coalesced", lambda key: cached_catalog(key, compute)),
+        ("uncoalesced", lambda key: compute()),
+    ):
+        computations[0] = 0
+        latencies = []
+        for round_number in range(args.rounds):
+            # A fresh key per round, like the namespace change after a publish
+            key = f"catalog:bench-{label}-{round_number}:courses"
+            # The loaders log every query; keep the report readable
+            with contextlib.redirect_stdout(io.StringIO()):
+                latencies += run_readers(args.readers, lambda: read(key))
+        report(label, computations[0], sorted(latencies))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+"""
+Cold-start regression benchmark for the Spark Tutorial API.
+
+Runs `python -X importtime -c "import app.main"` in a fresh interpreter,
+then a second fresh interpreter that imports the app and runs its lifespan
+warm-up phases. Exits non-zero when either exceeds its budget, so it can
+gate CI or a deploy.
+
+    cd backend
+    python benchmarks/startup.py --import-budget-ms 1500 --startup-budget-ms 2500
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+STARTUP_SCRIPT = """
+import asyncio, json, time
+start = time.perf_counter()
+from app.main import app
+imported = time.perf_counter()
+
+async def warm_up():
+    async with app.router.lifespan_context(app):
+        pass
+
+asyncio.run(warm_up())
+done = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "lifespan_ms": (done - imported) * 1000,
+    "phases": app.state.startup_report.as_dict(),
+}))
+"""
+
+
+def _env():
+    env = dict(os.environ)
+    # Settings require these; the values are irrelevant for timing
+    env.setdefault("GOOGLE_CLIENT_ID", "benchmark")
+    env.setdefault("GOOGLE_CLIENT_SECRET", "benchmark")
+    env["PYTHONPATH"] = str(BACKEND_DIR) + os.pathsep + env.get("PYTHONPATH", "")
+    return env
+
+
+def measure_imports(top: int):
+    """
+    Return (total import ms, slowest top-level imports) from -X importtime
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=BACKEND_DIR, env=_env(), capture_output=True, text=True, check=True
+    )
+
+    total_us = 0
+    cumulative = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        total_us += int(self_us)
+        # Only direct imports of the app (depth 1) to keep the report readable
+        if name.startswith("   ") and not name.startswith("    "):
+            cumulative.append((int(cumulative_us), name.strip()))
+
+    cumulative.sort(reverse=True)
+    return total_us / 1000, [(name, us / 1000) for us, name in cumulative[:top]]
+
+
+def measure_startup():
+    result = subprocess.run(
+        [sys.executable, "-c", STARTUP_SCRIPT],
+        cwd=BACKEND_DIR, env=_env(), capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Measure API cold-start time")
+    parser.add_argument("--import-budget-ms", type=float, default=1500)
+    parser.add_argument("--startup-budget-ms", type=float, default=2500)
+    parser.add_argument("--top", type=int, default=10, help="slowest imports to list")
+    args = parser.parse_args(argv)
+
+    import_ms, slowest = measure_imports(args.top)
+    print(f"Import time (sum of -X importtime self times): {import_ms:.1f}ms")
+    for name, ms in slowest:
+        print(f"  {ms:8.1f}ms  {name}")
+
+    startup = measure_startup()
+    startup_ms = startup["import_ms"] + startup["lifespan_ms"]
+    print(f"Cold start: import {startup['import_ms']:.1f}ms + "
+          f"warm-up {startup['lifespan_ms']:.1f}ms = {startup_ms:.1f}ms")
+    for name, ms in startup["phases"]["phases_ms"].items():
+        print(f"  {ms:8.1f}ms  {name}")
+
+    failures = []
+    if import_ms > args.import_budget_ms:
+        failures.append(f"import time {import_ms:.1f}ms exceeds budget {args.import_budget_ms:.0f}ms")
+    if startup_ms > args.startup_budget_ms:
+        failures.append(f"cold start {startup_ms:.1f}ms exceeds budget {args.startup_budget_ms:.0f}ms")
+    if startup["phases"]["errors"]:
+        failures.append(f"warm-up phases failed: {startup['phases']['errors']}")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
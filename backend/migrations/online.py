@@ -0,0 +1,132 @@
+"""
+Helpers for migrations that must run against large, live tables.
+
+Backfills are applied in primary-key ranges, each committed on its own, so
+no single statement holds locks for long; they must therefore be written
+to be safely re-run. Indexes are built with CREATE INDEX CONCURRENTLY on
+PostgreSQL so writes are not blocked while they build.
+"""
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+DEFAULT_BATCH_SIZE = 5000
+
+
+def is_postgres() -> bool:
+    return op.get_bind().dialect.name == "postgresql"
+
+
+def has_column(table: str, column: str) -> bool:
+    inspector = sa.inspect(op.get_bind())
+    return column in {c["name"] for c in inspector.get_columns(table)}
+
+
+def has_index(table: str, name: str) -> bool:
+    inspector = sa.inspect(op.get_bind())
+    return name in {i["name"] for i in inspector.get_indexes(table)}
+
+
+def add_column_if_missing(table: str, column: sa.Column) -> None:
+    """
+    Add a nullable column unless a legacy fix-up script already did.
+    Nullable columns without a server default are metadata-only on PostgreSQL.
+    """
+    if not has_column(table, column.name):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.add_column(column)
+
+
+def batched_backfill(
+    table: str,
+    set_clause: str,
+    where_clause: str = "1 = 1",
+    params: Optional[Dict[str, Any]] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE
+) -> int:
+    """
+    Run `UPDATE table SET set_clause WHERE where_clause` in id-range batches,
+    committing after each batch. Returns the number of rows updated.
+    """
+    bind = op.get_bind()
+    min_id, max_id = bind.execute(sa.text(f"SELECT MIN(id), MAX(id) FROM {table}")).one()
+    if min_id is None:
+        return 0
+
+    statement = sa.text(
+        f"UPDATE {table} SET {set_clause} "
+        f"WHERE id >= :batch_start AND id < :batch_end AND ({where_clause})"
+    )
+    updated = 0
+    for start in range(min_id, max_id + 1, batch_size):
+        with op.get_context().autocommit_block():
+            result = bind.execute(statement, {
+                **(params or {}),
+                "batch_start": start,
+                "batch_end": start + batch_size,
+            })
+            updated += result.rowcount or 0
+    return updated
+
+
+def batched_rewrite(
+    table: sa.Table,
+    transform: Callable[[Dict[str, Any]], Optional[Dict[str, Any]]],
+    batch_size: int = DEFAULT_BATCH_SIZE
+) -> List[int]:
+    """
+    Rewrite rows in Python, for changes SQL cannot express portably.
+    `transform` gets each row as a dict and returns the columns to update,
+    or None to leave the row alone. Rows are read and written in id-range
+    batches, each committed on its own. Returns the ids of updated rows.
+    """
+    bind = op.get_bind()
+    min_id, max_id = bind.execute(sa.select(sa.func.min(table.c.id), sa.func.max(table.c.id))).one()
+    if min_id is None:
+        return []
+
+    updated = []
+    for start in range(min_id, max_id + 1, batch_size):
+        with op.get_context().autocommit_block():
+            rows = bind.execute(
+                sa.select(table).where(table.c.id >= start, table.c.id < start + batch_size)
+            ).mappings().all()
+            for row in rows:
+                values = transform(dict(row))
+                if values:
+                    bind.execute(sa.update(table).where(table.c.id == row["id"]).values(**values))
+                    updated.append(row["id"])
+    return updated
+
+
+def create_index_online(
+    name: str,
+    table: str,
+    columns: Sequence[str],
+    unique: bool = False
+) -> None:
+    """
+    Create an index without blocking writes where the database supports it
+    """
+    if has_index(table, name):
+        return
+
+    if is_postgres():
+        # CONCURRENTLY cannot run inside a transaction block
+        with op.get_context().autocommit_block():
+            op.create_index(name, table, list(columns), unique=unique,
+                            postgresql_concurrently=True)
+    else:
+        op.create_index(name, table, list(columns), unique=unique)
+
+
+def drop_index_online(name: str, table: str) -> None:
+    if not has_index(table, name):
+        return
+
+    if is_postgres():
+        with op.get_context().autocommit_block():
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
+    else:
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,161 @@
+"""Baseline schema, as previously created by Base.metadata.create_all
+
+Databases created before migrations existed are stamped at this revision
+by app.db_migrations.upgrade_database and then upgraded normally.
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2025-02-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001_baseline'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+course_category = sa.Enum('SPARK', 'API', 'PYTHON', 'DATA_SCIENCE', 'WEB_DEVELOPMENT', name='coursecategory')
+difficulty_level = sa.Enum('BEGINNER', 'INTERMEDIATE', 'ADVANCED', name='difficultylevel')
+lesson_type = sa.Enum('THEORY', 'HANDS_ON', 'PROJECT', 'CASE_STUDY', name='lessontype')
+content_format = sa.Enum(
+    'CODE', 'TEXT', 'VIDEO', 'EXERCISE', 'QUIZ', 'API_PLAYGROUND', 'INTERACTIVE_DEMO',
+    name='contentformat'
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        'courses',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('title', sa.String(), nullable=True),
+        sa.Column('description', sa.String(), nullable=True),
+        sa.Column('order', sa.Integer(), nullable=True),
+        sa.Column('is_premium', sa.Boolean(), nullable=True),
+        sa.Column('category', course_category, nullable=False),
+        sa.Column('tags', sa.JSON(), nullable=True),
+        sa.Column('prerequisites', sa.JSON(), nullable=True),
+        sa.Column('target_audience', sa.String(), nullable=True),
+        sa.Column('learning_outcomes', sa.JSON(), nullable=True),
+        sa.Column('supported_content_formats', sa.JSON(), nullable=True),
+        sa.Column('course_metadata', sa.JSON(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_courses_id', 'courses', ['id'], unique=False)
+    op.create_index('ix_courses_title', 'courses', ['title'], unique=False)
+
+    op.create_table(
+        'users',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('username', sa.String(), nullable=False),
+        sa.Column('email', sa.String(), nullable=False),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('is_superuser', sa.Boolean(), nullable=True),
+        sa.Column('google_id', sa.String(), nullable=True),
+        sa.Column('name', sa.String(), nullable=True),
+        sa.Column('picture', sa.String(), nullable=True),
+        sa.Column('email_verified', sa.Boolean(), nullable=True),
+        sa.Column('is_premium', sa.Boolean(), nullable=True),
+        sa.Column('hashed_password', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('google_id')
+    )
+    op.create_index('ix_users_email', 'users', ['email'], unique=True)
+    op.create_index('ix_users_id', 'users', ['id'], unique=False)
+    op.create_index('ix_users_username', 'users', ['username'], unique=True)
+
+    op.create_table(
+        'lessons',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('title', sa.String(), nullable=True),
+        sa.Column('description', sa.String(), nullable=True),
+        sa.Column('summary', sa.String(), nullable=True),
+        sa.Column('content', sa.Text(), nullable=True),
+        sa.Column('content_sections', sa.JSON(), nullable=True),
+        sa.Column('code_samples', sa.JSON(), nullable=True),
+        sa.Column('key_points', sa.Text(), nullable=True),
+        sa.Column('order', sa.Integer(), nullable=True),
+        sa.Column('difficulty', difficulty_level, nullable=True),
+        sa.Column('lesson_type', lesson_type, nullable=True),
+        sa.Column('content_format', content_format, nullable=True),
+        sa.Column('estimated_time', sa.Integer(), nullable=True),
+        sa.Column('skill_level_required', sa.String(), nullable=True),
+        sa.Column('learning_objectives', sa.Text(), nullable=True),
+        sa.Column('interactive_elements', sa.JSON(), nullable=True),
+        sa.Column('external_resources', sa.JSON(), nullable=True),
+        sa.Column('practical_application', sa.Text(), nullable=True),
+        sa.Column('is_premium', sa.Boolean(), nullable=True),
+        sa.Column('course_id', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['course_id'], ['courses.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_lessons_id', 'lessons', ['id'], unique=False)
+    op.create_index('ix_lessons_title', 'lessons', ['title'], unique=False)
+
+    op.create_table(
+        'lesson_prerequisites',
+        sa.Column('lesson_id', sa.Integer(), nullable=False),
+        sa.Column('prerequisite_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['lesson_id'], ['lessons.id']),
+        sa.ForeignKeyConstraint(['prerequisite_id'], ['lessons.id']),
+        sa.PrimaryKeyConstraint('lesson_id', 'prerequisite_id')
+    )
+
+    op.create_table(
+        'resources',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('title', sa.String(), nullable=True),
+        sa.Column('type', sa.String(), nullable=True),
+        sa.Column('content', sa.Text(), nullable=True),
+        sa.Column('description', sa.String(), nullable=True),
+        sa.Column('lesson_id', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['lesson_id'], ['lessons.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_resources_id', 'resources', ['id'], unique=False)
+
+    op.create_table(
+        'user_progress',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('lesson_id', sa.Integer(), nullable=True),
+        sa.Column('is_completed', sa.Boolean(), nullable=True),
+        sa.Column('completed_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['lesson_id'], ['lessons.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_user_progress_id', 'user_progress', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_user_progress_id', table_name='user_progress')
+    op.drop_table('user_progress')
+    op.drop_index('ix_resources_id', table_name='resources')
+    op.drop_table('resources')
+    op.drop_table('lesson_prerequisites')
+    op.drop_index('ix_lessons_title', table_name='lessons')
+    op.drop_index('ix_lessons_id', table_name='lessons')
+    op.drop_table('lessons')
+    op.drop_index('ix_users_username', table_name='users')
+    op.drop_index('ix_users_id', table_name='users')
+    op.drop_index('ix_users_email', table_name='users')
+    op.drop_table('users')
+    op.drop_index('ix_courses_title', table_name='courses')
+    op.drop_index('ix_courses_id', table_name='courses')
+    op.drop_table('courses')
+    for enum in (content_format, lesson_type, difficulty_level, course_category):
+        enum.drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,56 @@
+"""Progress timestamps and catalog slugs
+
+Adds created_at/updated_at to user_progress (backfilled from completed_at)
+and the stable slug columns used by the content importer. Both used to be
+applied by fix_schema.py, so every step tolerates already-present columns.
+
+Revision ID: 0002_progress_timestamps_and_slugs
+Revises: 0001_baseline
+Create Date: 2025-02-19 00:00:01
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.online import (
+    add_column_if_missing, batched_backfill, create_index_online, drop_index_online
+)
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002_progress_timestamps_and_slugs'
+down_revision: Union[str, None] = '0001_baseline'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SLUG_TABLES = ('courses', 'lessons', 'resources')
+
+
+def upgrade() -> None:
+    add_column_if_missing('user_progress', sa.Column('created_at', sa.DateTime(), nullable=True))
+    add_column_if_missing('user_progress', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    batched_backfill(
+        'user_progress',
+        'created_at = COALESCE(created_at, completed_at), '
+        'updated_at = COALESCE(updated_at, completed_at)',
+        where_clause='updated_at IS NULL'
+    )
+    create_index_online('ix_user_progress_updated_at', 'user_progress', ['updated_at'])
+
+    for table in SLUG_TABLES:
+        add_column_if_missing(table, sa.Column('slug', sa.String(), nullable=True))
+        create_index_online(f'ix_{table}_slug', table, ['slug'], unique=True)
+
+
+def downgrade() -> None:
+    for table in SLUG_TABLES:
+        drop_index_online(f'ix_{table}_slug', table)
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column('slug')
+
+    drop_index_online('ix_user_progress_updated_at', 'user_progress')
+    with op.batch_alter_table('user_progress') as batch_op:
+        batch_op.drop_column('updated_at')
+        batch_op.drop_column('created_at')
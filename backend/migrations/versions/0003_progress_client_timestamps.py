@@ -0,0 +1,35 @@
+"""Client timestamps for progress sync
+
+Adds user_progress.client_updated_at, the client-side time of the latest
+applied change, which batch progress sync compares for last-writer-wins,
+and a (user_id, lesson_id) index for the per-user lookups it makes.
+
+Revision ID: 0003_progress_client_timestamps
+Revises: 0002_progress_timestamps_and_slugs
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.online import add_column_if_missing, create_index_online, drop_index_online
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003_progress_client_timestamps'
+down_revision: Union[str, None] = '0002_progress_timestamps_and_slugs'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    add_column_if_missing('user_progress', sa.Column('client_updated_at', sa.DateTime(), nullable=True))
+    create_index_online('ix_user_progress_user_lesson', 'user_progress', ['user_id', 'lesson_id'])
+
+
+def downgrade() -> None:
+    drop_index_online('ix_user_progress_user_lesson', 'user_progress')
+    with op.batch_alter_table('user_progress') as batch_op:
+        batch_op.drop_column('client_updated_at')
@@ -0,0 +1,42 @@
+"""Catalog change log
+
+Creates catalog_changes, the append-only log of course, lesson and
+resource writes that GET /sync reads deltas from. Rows that predate the
+log reach clients through the initial full sync.
+
+Revision ID: 0004_catalog_changes
+Revises: 0003_progress_client_timestamps
+Create Date: 2026-10-19 00:00:01
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004_catalog_changes'
+down_revision: Union[str, None] = '0003_progress_client_timestamps'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'catalog_changes',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('entity', sa.String(length=20), nullable=False),
+        sa.Column('entity_id', sa.Integer(), nullable=False),
+        sa.Column('op', sa.String(length=10), nullable=False),
+        sa.Column('changed_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_catalog_changes_id', 'catalog_changes', ['id'], unique=False)
+    op.create_index('ix_catalog_changes_changed_at', 'catalog_changes', ['changed_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_catalog_changes_changed_at', table_name='catalog_changes')
+    op.drop_index('ix_catalog_changes_id', table_name='catalog_changes')
+    op.drop_table('catalog_changes')
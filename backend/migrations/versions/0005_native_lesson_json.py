@@ -0,0 +1,85 @@
+"""Store lesson JSON columns as native JSON
+
+Older seed scripts wrote content_sections, code_samples and the other
+lesson JSON columns as json.dumps() strings inside JSON columns, so every
+read had to parse them a second time. This decodes such values in place
+(strings that do not parse become empty lists, as the old read path
+did), bumps updated_at so catalog caches move to a new version, and logs
+the lessons for delta sync. Native values are left alone, so the
+migration can be re-run.
+
+Revision ID: 0005_native_lesson_json
+Revises: 0004_catalog_changes
+Create Date: 2026-10-19 00:00:02
+
+"""
+import json
+from datetime import datetime
+from typing import Any, Dict, Optional, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.online import batched_rewrite
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005_native_lesson_json'
+down_revision: Union[str, None] = '0004_catalog_changes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Columns holding lists; the others hold objects
+LIST_COLUMNS = ('content_sections', 'code_samples')
+JSON_COLUMNS = LIST_COLUMNS + ('interactive_elements', 'external_resources')
+
+lessons = sa.table(
+    'lessons',
+    sa.column('id', sa.Integer()),
+    sa.column('updated_at', sa.DateTime()),
+    *(sa.column(name, sa.JSON()) for name in JSON_COLUMNS)
+)
+catalog_changes = sa.table(
+    'catalog_changes',
+    sa.column('entity', sa.String()),
+    sa.column('entity_id', sa.Integer()),
+    sa.column('op', sa.String()),
+    sa.column('changed_at', sa.DateTime()),
+)
+
+
+def _decode(value: Any, empty: Any) -> Any:
+    # Some rows were encoded more than once
+    while isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return empty
+    return value
+
+
+def upgrade() -> None:
+    now = datetime.utcnow()
+
+    def normalize(row: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        values = {
+            name: _decode(row[name], [] if name in LIST_COLUMNS else None)
+            for name in JSON_COLUMNS
+            if isinstance(row[name], str)
+        }
+        if values:
+            values['updated_at'] = now
+        return values or None
+
+    updated = batched_rewrite(lessons, normalize)
+    if updated:
+        op.get_bind().execute(sa.insert(catalog_changes), [
+            {'entity': 'lesson', 'entity_id': lesson_id, 'op': 'upsert', 'changed_at': now}
+            for lesson_id in updated
+        ])
+        print(f"Decoded double-encoded JSON in {len(updated)} lessons")
+
+
+def downgrade() -> None:
+    # Native JSON is what the columns were always meant to hold
+    pass
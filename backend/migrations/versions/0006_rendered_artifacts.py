@@ -0,0 +1,53 @@
+"""Rendered lesson artifacts
+
+Creates rendered_artifacts (HTML, highlighted code, table of contents and
+reading time per lesson content hash) and lessons.rendered_hash. Existing
+lessons are rendered by the next import, by `python -m app.rendering`, or
+on their first rendered read.
+
+Revision ID: 0006_rendered_artifacts
+Revises: 0005_native_lesson_json
+Create Date: 2026-10-19 00:00:03
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.online import add_column_if_missing
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006_rendered_artifacts'
+down_revision: Union[str, None] = '0005_native_lesson_json'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'rendered_artifacts',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('content_hash', sa.String(length=64), nullable=False),
+        sa.Column('renderer_version', sa.Integer(), nullable=False),
+        sa.Column('html', sa.Text(), nullable=True),
+        sa.Column('sections', sa.JSON(), nullable=True),
+        sa.Column('code_samples', sa.JSON(), nullable=True),
+        sa.Column('toc', sa.JSON(), nullable=True),
+        sa.Column('word_count', sa.Integer(), nullable=True),
+        sa.Column('reading_time_minutes', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_rendered_artifacts_id', 'rendered_artifacts', ['id'], unique=False)
+    op.create_index('ix_rendered_artifacts_content_hash', 'rendered_artifacts', ['content_hash'], unique=True)
+    add_column_if_missing('lessons', sa.Column('rendered_hash', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('lessons') as batch_op:
+        batch_op.drop_column('rendered_hash')
+    op.drop_index('ix_rendered_artifacts_content_hash', table_name='rendered_artifacts')
+    op.drop_index('ix_rendered_artifacts_id', table_name='rendered_artifacts')
+    op.drop_table('rendered_artifacts')
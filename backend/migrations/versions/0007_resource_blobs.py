@@ -0,0 +1,43 @@
+"""Resource files in the blob store
+
+Adds blob metadata columns to resources. Inline content stays readable
+until `python -m app.storage offload` moves it into the blob store.
+
+Revision ID: 0007_resource_blobs
+Revises: 0006_rendered_artifacts
+Create Date: 2026-10-19 00:00:04
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.online import add_column_if_missing, create_index_online, drop_index_online
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007_resource_blobs'
+down_revision: Union[str, None] = '0006_rendered_artifacts'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = (
+    sa.Column('blob_hash', sa.String(length=64), nullable=True),
+    sa.Column('size', sa.Integer(), nullable=True),
+    sa.Column('media_type', sa.String(), nullable=True),
+    sa.Column('filename', sa.String(), nullable=True),
+)
+
+
+def upgrade() -> None:
+    for column in COLUMNS:
+        add_column_if_missing('resources', column)
+    create_index_online('ix_resources_blob_hash', 'resources', ['blob_hash'])
+
+
+def downgrade() -> None:
+    drop_index_online('ix_resources_blob_hash', 'resources')
+    with op.batch_alter_table('resources') as batch_op:
+        for column in COLUMNS:
+            batch_op.drop_column(column.name)
@@ -0,0 +1,65 @@
+"""Fractional lesson ordering keys
+
+Adds lessons.sort_key, backfilled from the integer order so lessons keep
+their current order, and an index on (course_id, sort_key).
+
+Revision ID: 0008_lesson_sort_keys
+Revises: 0007_resource_blobs
+Create Date: 2026-10-19 00:00:05
+
+"""
+from typing import Any, Dict, Optional, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.online import (
+    add_column_if_missing, batched_rewrite, create_index_online, drop_index_online
+)
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008_lesson_sort_keys'
+down_revision: Union[str, None] = '0007_resource_blobs'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Frozen copy of app.utils.ordering.key_for_order
+DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+
+lessons = sa.table(
+    'lessons',
+    sa.column('id', sa.Integer()),
+    sa.column('order', sa.Integer()),
+    sa.column('sort_key', sa.String()),
+)
+
+
+def _key_for_order(order: Optional[int]) -> str:
+    value = max(order or 0, 0)
+    digits = []
+    for _ in range(4):
+        value, digit = divmod(value, len(DIGITS))
+        digits.append(DIGITS[digit])
+    return "".join(reversed(digits)) + "V"
+
+
+def upgrade() -> None:
+    # Keys compare byte by byte; a locale collation would reorder mixed case
+    sort_key_type = sa.String().with_variant(sa.String(collation='C'), 'postgresql')
+    add_column_if_missing('lessons', sa.Column('sort_key', sort_key_type, nullable=True))
+
+    def backfill(row: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        # Same order, so same catalog: updated_at is left alone
+        if row['sort_key'] is None:
+            return {'sort_key': _key_for_order(row['order'])}
+        return None
+
+    batched_rewrite(lessons, backfill)
+    create_index_online('ix_lessons_course_sort_key', 'lessons', ['course_id', 'sort_key'])
+
+
+def downgrade() -> None:
+    drop_index_online('ix_lessons_course_sort_key', 'lessons')
+    with op.batch_alter_table('lessons') as batch_op:
+        batch_op.drop_column('sort_key')
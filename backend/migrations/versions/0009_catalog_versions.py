@@ -0,0 +1,78 @@
+"""Published catalog versions
+
+Creates catalog_versions, catalog_version_rows, catalog_row_payloads and
+the single-row catalog_state pointer. Nothing is published until
+`python -m app.publishing publish`; until then readers use the live
+tables as before.
+
+Revision ID: 0009_catalog_versions
+Revises: 0008_lesson_sort_keys
+Create Date: 2026-10-19 00:00:06
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0009_catalog_versions'
+down_revision: Union[str, None] = '0008_lesson_sort_keys'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'catalog_versions',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('parent_id', sa.Integer(), nullable=True),
+        sa.Column('change_id', sa.Integer(), nullable=False),
+        sa.Column('note', sa.String(), nullable=True),
+        sa.Column('published_by', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['parent_id'], ['catalog_versions.id']),
+        sa.ForeignKeyConstraint(['published_by'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_catalog_versions_id', 'catalog_versions', ['id'])
+
+    op.create_table(
+        'catalog_row_payloads',
+        sa.Column('row_hash', sa.String(length=64), nullable=False),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        sa.PrimaryKeyConstraint('row_hash'),
+    )
+
+    op.create_table(
+        'catalog_version_rows',
+        sa.Column('version_id', sa.Integer(), nullable=False),
+        sa.Column('entity', sa.String(length=20), nullable=False),
+        sa.Column('entity_id', sa.Integer(), nullable=False),
+        sa.Column('row_hash', sa.String(length=64), nullable=False),
+        sa.Column('rendered_hash', sa.String(length=64), nullable=True),
+        sa.ForeignKeyConstraint(['version_id'], ['catalog_versions.id']),
+        sa.PrimaryKeyConstraint('version_id', 'entity', 'entity_id'),
+    )
+    op.create_index('ix_catalog_version_rows_row_hash', 'catalog_version_rows', ['row_hash'])
+    op.create_index('ix_catalog_version_rows_rendered_hash', 'catalog_version_rows', ['rendered_hash'])
+
+    op.create_table(
+        'catalog_state',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('published_version_id', sa.Integer(), nullable=True),
+        sa.Column('published_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['published_version_id'], ['catalog_versions.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('catalog_state')
+    op.drop_index('ix_catalog_version_rows_rendered_hash', 'catalog_version_rows')
+    op.drop_index('ix_catalog_version_rows_row_hash', 'catalog_version_rows')
+    op.drop_table('catalog_version_rows')
+    op.drop_table('catalog_row_payloads')
+    op.drop_index('ix_catalog_versions_id', 'catalog_versions')
+    op.drop_table('catalog_versions')
@@ -0,0 +1,38 @@
+"""Byte-order collation for lessons.sort_key
+
+Sort keys mix upper and lower case and must compare byte by byte, as
+Python and SQLite compare them. Databases that ran 0008 before it
+declared the "C" collation get it here; this is a no-op on SQLite, whose
+default collation already compares bytes. PostgreSQL rebuilds the
+(course_id, sort_key) index as part of the change.
+
+Revision ID: 0010_sort_key_collation
+Revises: 0009_catalog_versions
+Create Date: 2026-10-19 00:00:07
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.online import is_postgres
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0010_sort_key_collation'
+down_revision: Union[str, None] = '0009_catalog_versions'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if is_postgres():
+        op.alter_column('lessons', 'sort_key', type_=sa.String(collation='C'),
+                        existing_type=sa.String(), existing_nullable=True)
+
+
+def downgrade() -> None:
+    if is_postgres():
+        op.alter_column('lessons', 'sort_key', type_=sa.String(),
+                        existing_type=sa.String(collation='C'), existing_nullable=True)
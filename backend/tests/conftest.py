@@ -0,0 +1,83 @@
+"""
+Shared fixtures. The app runs against a throwaway SQLite database that is
+migrated and seeded once per test session; tests create the rows they
+need rather than relying on each other.
+"""
+import os
+import shutil
+import tempfile
+
+import pytest
+
+# Before any app import: settings and the engine read these once
+_WORKDIR = tempfile.mkdtemp(prefix="backend-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_WORKDIR}/test.db")
+os.environ.setdefault("GOOGLE_CLIENT_ID", "test-client")
+os.environ.setdefault("GOOGLE_CLIENT_SECRET", "test-secret")
+os.environ.setdefault("BLOB_STORE_DIR", os.path.join(_WORKDIR, "blobs"))
+os.environ.setdefault("SNAPSHOT_DIR", os.path.join(_WORKDIR, "snapshots"))
+os.environ.setdefault("EXECUTION_POOL_SIZE", "0")
+os.environ.setdefault("GRADING_POOL_SIZE", "0")
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(_WORKDIR, ignore_errors=True)
+
+
+@pytest.fixture(scope="session")
+def database():
+    from app.db_migrations import upgrade_database
+    from app.seed import seed_data
+
+    upgrade_database()
+    seed_data()
+
+
+@pytest.fixture(scope="session")
+def client(database):
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def db(database):
+    from app.database import SessionLocal
+
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+def make_user(email: str, superuser: bool = False, premium: bool = False):
+    """Create (or reuse) a user; returns (id, auth headers)"""
+    from app.auth.utils import create_access_token
+    from app.database import SessionLocal
+    from app.models import User
+
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.email == email).first()
+        if user is None:
+            user = User(email=email, username=email.split("@")[0],
+                        is_superuser=superuser, is_premium=premium)
+            db.add(user)
+            db.commit()
+        return user.id, {"Authorization": f"Bearer {create_access_token({'sub': email})}"}
+    finally:
+        db.close()
+
+
+@pytest.fixture(scope="session")
+def admin(client):
+    return make_user("admin@tests.example", superuser=True)[1]
+
+
+def publish(client, admin) -> dict:
+    response = client.post("/admin/catalog/publish", json={"note": "tests"}, headers=admin)
+    assert response.status_code == 200, response.text
+    return response.json()
@@ -0,0 +1,107 @@
+"""
+Response compression: negotiated per request, applied above the size
+threshold, and never to event streams, byte ranges or bodies that are
+already encoded.
+"""
+import gzip
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.cache.responses import compress_variants, variant_response
+from app.core.compression import CompressionMiddleware, choose_encoding
+
+BIG = "spark " * 1000
+
+
+@pytest.fixture(scope="module")
+def client():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=500)
+
+    @app.get("/big")
+    def big():
+        return {"text": BIG}
+
+    @app.get("/small")
+    def small():
+        return {"text": "spark"}
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse((f"line {n}\n" for n in range(2000)), media_type="text/plain")
+
+    @app.get("/events")
+    def events():
+        return StreamingResponse(iter(["data: 1\n\n"] * 200), media_type="text/event-stream")
+
+    @app.get("/file")
+    def file():
+        return PlainTextResponse(BIG, headers={"Accept-Ranges": "bytes"})
+
+    @app.get("/encoded")
+    def encoded():
+        return Response(gzip.compress(BIG.encode()), media_type="text/plain",
+                        headers={"Content-Encoding": "gzip"})
+
+    return TestClient(app)
+
+
+def test_choose_encoding_honours_quality_values():
+    assert choose_encoding("gzip, br", ("br", "gzip")) == "br"
+    assert choose_encoding("br;q=0.5, gzip", ("br", "gzip")) == "gzip"
+    assert choose_encoding("br;q=0, *", ("br", "gzip")) == "gzip"
+    assert choose_encoding("identity", ("br", "gzip")) is None
+    assert choose_encoding("", ("gzip",)) is None
+
+
+def test_large_json_is_gzipped(client):
+    response = client.get("/big", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "accept-encoding" in response.headers["vary"].lower()
+    assert int(response.headers["content-length"]) < len(BIG)
+    assert response.json() == {"text": BIG}
+
+
+def test_client_without_gzip_gets_identity(client):
+    response = client.get("/big", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+    assert "accept-encoding" in response.headers["vary"].lower()
+    assert response.json() == {"text": BIG}
+
+
+def test_small_body_is_left_alone(client):
+    response = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+
+
+def test_streamed_body_is_compressed_chunk_by_chunk(client):
+    response = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert response.text == "".join(f"line {n}\n" for n in range(2000))
+
+
+@pytest.mark.parametrize("path", ["/events", "/file"])
+def test_event_streams_and_ranged_files_pass_through(client, path):
+    response = client.get(path, headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+
+
+def test_already_encoded_body_is_not_compressed_twice(client):
+    response = client.get("/encoded", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.text == BIG
+
+
+def test_precompressed_variants_follow_the_request():
+    variants = compress_variants(('{"text":"%s"}' % BIG).encode())
+    assert "gzip" in variants
+    gzipped = variant_response(variants, "gzip")
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert gzip.decompress(gzipped.body) == variants["identity"]
+    plain = variant_response(variants, "")
+    assert "content-encoding" not in plain.headers
+    assert plain.headers["vary"] == "Accept-Encoding"
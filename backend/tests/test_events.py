@@ -0,0 +1,99 @@
+"""
+Live event channel: tickets are single-use even under races, and a
+stream holds a broker subscription only while it is being served.
+"""
+import asyncio
+import threading
+
+import pytest
+from starlette.requests import Request
+
+from app.cache.memory import MemoryCache
+from app.cache.redis import RedisCache
+from app.cache.resp_server import RespHandler, RespServer
+from app.cache.sqlite import SQLiteCache
+from app.realtime import get_broker
+from app.routes.events import _authenticate, stream_events
+
+from conftest import make_user
+
+
+@pytest.fixture
+def resp_url():
+    server = RespServer(("127.0.0.1", 0), RespHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"redis://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def cache(request, tmp_path):
+    if request.param == "memory":
+        return MemoryCache()
+    if request.param == "sqlite":
+        return SQLiteCache(str(tmp_path / "cache.db"))
+    return RedisCache(request.getfixturevalue("resp_url"), key_prefix="tests:")
+
+
+def test_pop_hands_a_value_to_one_caller(cache):
+    cache.set("ticket", 7, 30)
+    barrier = threading.Barrier(8)
+    results = []
+
+    def take():
+        barrier.wait()
+        results.append(cache.pop("ticket"))
+
+    threads = [threading.Thread(target=take) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(results, key=lambda value: value is None) == [7] + [None] * 7
+    assert cache.get("ticket") is None
+
+
+def test_expired_value_is_not_popped(cache):
+    cache.set("ticket", 7, 0.01)
+    threading.Event().wait(0.05)
+    assert cache.pop("ticket", "gone") == "gone"
+
+
+def test_ticket_authenticates_once(client):
+    user_id, headers = make_user("events@tests.example")
+    response = client.post("/events/ticket", headers=headers)
+    assert response.status_code == 200, response.text
+    ticket = response.json()["ticket"]
+    assert _authenticate(None, ticket) == user_id
+    assert _authenticate(None, ticket) is None
+
+
+def _request() -> Request:
+    async def receive():
+        await asyncio.sleep(3600)
+
+    return Request({"type": "http", "method": "GET", "path": "/events", "headers": [],
+                    "query_string": b""}, receive)
+
+
+def test_stream_subscribes_only_while_it_is_served(client):
+    _, headers = make_user("events@tests.example")
+    broker = get_broker()
+
+    async def scenario():
+        before = broker.subscriber_count()
+        response = await stream_events(_request(), ticket=None,
+                                       authorization=headers["Authorization"], last_event_id=None)
+        # A response that never starts streaming holds nothing
+        assert broker.subscriber_count() == before
+        body = response.body_iterator
+        assert await body.__anext__() == "retry: 5000\n\n"
+        assert broker.subscriber_count() == before + 1
+        await body.aclose()
+        assert broker.subscriber_count() == before
+
+    asyncio.run(scenario())
@@ -0,0 +1,88 @@
+"""
+Fractional lesson ordering: moves rewrite one key, crowded gaps are
+spread out again, and keys compare byte by byte in every database.
+"""
+from sqlalchemy import select, update
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateTable
+
+from app.models import Lesson
+from app.utils.ordering import MAX_KEY_LENGTH, key_between, key_for_order
+
+
+def test_keys_between_neighbours_keep_room():
+    low, high = key_for_order(1), key_for_order(2)
+    for _ in range(100):
+        key = key_between(low, high)
+        assert low < key < high
+        assert not key.endswith("0")
+        high = key
+
+
+def test_sort_key_is_declared_with_c_collation_on_postgres():
+    ddl = str(CreateTable(Lesson.__table__).compile(dialect=postgresql.dialect()))
+    assert 'sort_key VARCHAR COLLATE "C"' in ddl
+
+
+def _create_course(client, admin, lessons: int):
+    course = client.post("/admin/courses", json=[{
+        "title": "Ordering", "description": "d", "order": 90, "is_premium": False
+    }], headers=admin)
+    assert course.status_code == 200, course.text
+    course_id = course.json()["courses"]["created"][0]
+    body = [{
+        "course_id": course_id, "title": f"Lesson {n}", "description": "d", "summary": "s",
+        "content": "# Hi", "order": n, "difficulty": "beginner", "lesson_type": "theory",
+        "estimated_time": 5, "learning_objectives": "x",
+    } for n in range(1, lessons + 1)]
+    created = client.post("/admin/lessons", json=body, headers=admin)
+    assert created.status_code == 200, created.text
+    return course_id, created.json()["lessons"]["created"]
+
+
+def _listing(db, course_id):
+    db.expire_all()
+    return db.execute(
+        select(Lesson.id, Lesson.sort_key).where(Lesson.course_id == course_id)
+        .order_by(Lesson.sort_key, Lesson.id)
+    ).all()
+
+
+def test_mixed_case_keys_sort_bytewise_in_sql(client, admin, db):
+    # "Z" < "a" in byte order; a locale collation would put "a" first
+    keys = ["0001V", "000ZV", "000aV", "000zV"]
+    course_id, ids = _create_course(client, admin, 4)
+    for lesson_id, key in zip(ids, reversed(keys)):
+        db.execute(update(Lesson).where(Lesson.id == lesson_id).values(sort_key=key))
+    db.commit()
+    assert [row.sort_key for row in _listing(db, course_id)] == keys
+
+
+def test_move_rewrites_only_the_moved_lesson(client, admin, db):
+    course_id, ids = _create_course(client, admin, 4)
+    before = dict(_listing(db, course_id))
+    response = client.post("/admin/lessons/reorder", json={
+        "moves": [{"lesson_id": ids[3], "after_id": ids[0]}]
+    }, headers=admin)
+    assert response.status_code == 200, response.text
+    after = _listing(db, course_id)
+    assert [row.id for row in after] == [ids[0], ids[3], ids[1], ids[2]]
+    assert [id for id, key in after if before[id] != key] == [ids[3]]
+
+
+def test_crowded_gap_is_spread_out(client, admin, db):
+    course_id, ids = _create_course(client, admin, 3)
+    # Keep moving the last lesson into the gap after the first one: without
+    # a rebalance the keys would outgrow MAX_KEY_LENGTH long before the end
+    expected = list(ids)
+    for step in range(200):
+        moving = expected[-1]
+        response = client.post("/admin/lessons/reorder", json={
+            "moves": [{"lesson_id": moving, "after_id": expected[0]}]
+        }, headers=admin)
+        assert response.status_code == 200, response.text
+        expected.remove(moving)
+        expected.insert(1, moving)
+    listing = _listing(db, course_id)
+    assert [row.id for row in listing] == expected
+    assert all(len(row.sort_key) <= MAX_KEY_LENGTH for row in listing)
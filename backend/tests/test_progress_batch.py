@@ -0,0 +1,65 @@
+"""
+Batch progress: per lesson the change with the latest client timestamp
+wins, within a batch and against what is already stored, whatever order
+an offline queue is replayed in.
+"""
+import pytest
+
+from conftest import make_user
+
+
+@pytest.fixture
+def lessons(client):
+    return [lesson["id"] for lesson in client.get("/lessons", params={"limit": 3}).json()]
+
+
+def _batch(client, headers, *updates):
+    response = client.post("/progress/batch", json={"updates": [
+        {"lesson_id": lesson_id, "is_completed": completed, "client_timestamp": timestamp}
+        for lesson_id, completed, timestamp in updates
+    ]}, headers=headers)
+    assert response.status_code == 200, response.text
+    return {result["lesson_id"]: result for result in response.json()["results"]}
+
+
+def test_latest_change_in_a_batch_wins(client, lessons):
+    _, headers = make_user("batch-latest@tests.example")
+    results = _batch(client, headers,
+                     (lessons[0], False, "2026-01-01T12:00:00Z"),
+                     (lessons[0], True, "2026-01-01T11:00:00Z"))
+    assert list(results) == [lessons[0]]
+    assert results[lessons[0]]["status"] == "applied"
+    assert results[lessons[0]]["progress"]["is_completed"] is False
+
+
+def test_older_replay_is_stale_and_reports_the_stored_progress(client, lessons):
+    _, headers = make_user("batch-stale@tests.example")
+    _batch(client, headers, (lessons[0], True, "2026-01-02T12:00:00Z"))
+    results = _batch(client, headers,
+                     (lessons[0], False, "2026-01-02T08:00:00Z"),
+                     (lessons[1], True, "2026-01-02T08:00:00Z"))
+    assert results[lessons[0]]["status"] == "stale"
+    assert results[lessons[0]]["progress"]["is_completed"] is True
+    assert results[lessons[1]]["status"] == "applied"
+
+    stored = client.get("/progress/lessons", params={"ids": f"{lessons[0]},{lessons[1]}"},
+                        headers=headers).json()
+    assert stored[str(lessons[0])]["is_completed"] is True
+    assert stored[str(lessons[1])]["is_completed"] is True
+
+
+def test_timestamps_are_compared_in_utc(client, lessons):
+    _, headers = make_user("batch-utc@tests.example")
+    # 10:00+02:00 is 08:00 UTC, earlier than 09:00 UTC
+    _batch(client, headers, (lessons[2], True, "2026-01-03T09:00:00Z"))
+    results = _batch(client, headers, (lessons[2], False, "2026-01-03T10:00:00+02:00"))
+    assert results[lessons[2]]["status"] == "stale"
+
+
+def test_unknown_lesson_is_reported_not_failed(client, lessons):
+    _, headers = make_user("batch-unknown@tests.example")
+    results = _batch(client, headers,
+                     (999999, True, "2026-01-04T09:00:00Z"),
+                     (lessons[0], True, "2026-01-04T09:00:00Z"))
+    assert results[999999] == {"lesson_id": 999999, "status": "not_found", "progress": None}
+    assert results[lessons[0]]["status"] == "applied"
@@ -0,0 +1,70 @@
+"""
+Draft/publish catalog versions: readers see only published versions, a
+publish copies its parent and rewrites only changed rows, and a request
+keeps the version it started on.
+"""
+import pytest
+
+from app.utils.catalog import current_catalog_version, pin_catalog_version, unpin_catalog_version
+from app.utils.catalog_index import get_catalog_index
+
+from conftest import publish
+
+
+@pytest.fixture
+def lesson_id(client, admin):
+    # Start from a published catalog with nothing left in the draft
+    publish(client, admin)
+    return client.get("/lessons", params={"limit": 1}).json()[0]["id"]
+
+
+def _rename(client, admin, lesson_id, title):
+    response = client.patch("/admin/lessons", json=[{"id": lesson_id, "title": title}], headers=admin)
+    assert response.status_code == 200, response.text
+
+
+def test_draft_edits_are_hidden_until_published(client, admin, lesson_id):
+    before = client.get(f"/lessons/{lesson_id}").json()["title"]
+    _rename(client, admin, lesson_id, "Draft title")
+    assert client.get(f"/lessons/{lesson_id}").json()["title"] == before
+
+    publish(client, admin)
+    assert client.get(f"/lessons/{lesson_id}").json()["title"] == "Draft title"
+
+
+def test_publish_rewrites_only_changed_rows(client, admin, lesson_id):
+    _rename(client, admin, lesson_id, "Incremental title")
+    version = publish(client, admin)
+    assert version["created"] is True
+    assert version["rewritten"] == {"course": 0, "lesson": 1, "resource": 0}
+
+    again = publish(client, admin)
+    assert again["created"] is False
+    assert again["version"] == version["version"]
+
+
+def test_rollback_serves_the_parent_version(client, admin, lesson_id):
+    original = client.get(f"/lessons/{lesson_id}").json()["title"]
+    _rename(client, admin, lesson_id, "Rolled back title")
+    publish(client, admin)
+    assert client.get(f"/lessons/{lesson_id}").json()["title"] == "Rolled back title"
+
+    response = client.post("/admin/catalog/rollback", json={}, headers=admin)
+    assert response.status_code == 200, response.text
+    assert client.get(f"/lessons/{lesson_id}").json()["title"] == original
+
+
+def test_pinned_request_keeps_its_version(client, admin, lesson_id):
+    first = current_catalog_version()
+    title = get_catalog_index().lesson(lesson_id).title
+    token = pin_catalog_version()
+    try:
+        _rename(client, admin, lesson_id, "Published midway")
+        second = publish(client, admin)["version"]
+        assert current_catalog_version(pinned=False) == second
+        # Still the catalog the request started with
+        assert current_catalog_version() == first
+        assert get_catalog_index().lesson(lesson_id).title == title
+    finally:
+        unpin_catalog_version(token)
+    assert get_catalog_index().lesson(lesson_id).title == "Published midway"
@@ -0,0 +1,84 @@
+"""
+Resource downloads from the blob store: byte ranges, and conditional
+requests on the content-hash ETag.
+"""
+import hashlib
+
+import pytest
+
+from app.models import Resource
+from app.storage import get_blob_store
+from app.utils.sync import record_catalog_changes
+
+from conftest import publish
+
+DATA = bytes(range(256)) * 40
+
+
+@pytest.fixture(scope="module")
+def resource_id(client, admin):
+    from app.database import SessionLocal
+
+    lesson = next(lesson for lesson in client.get("/lessons", params={"limit": 100}).json()
+                  if not lesson["is_premium"])
+    info = get_blob_store().put_bytes(DATA)
+    db = SessionLocal()
+    try:
+        resource = Resource(title="Dataset", type="dataset", lesson_id=lesson["id"],
+                            blob_hash=info.hash, size=info.size,
+                            media_type="application/octet-stream", filename="data.bin")
+        db.add(resource)
+        db.flush()
+        record_catalog_changes(db, "resource", [resource.id])
+        db.commit()
+        resource_id = resource.id
+    finally:
+        db.close()
+    publish(client, admin)
+    return resource_id
+
+
+def test_full_download_carries_the_content_hash(client, resource_id):
+    response = client.get(f"/resources/{resource_id}/download")
+    assert response.status_code == 200
+    assert response.content == DATA
+    assert response.headers["etag"] == f'"{hashlib.sha256(DATA).hexdigest()}"'
+    assert response.headers["accept-ranges"] == "bytes"
+    assert response.headers["cache-control"] == "public, no-cache"
+    assert 'filename="data.bin"' in response.headers["content-disposition"]
+
+
+def test_range_returns_partial_content(client, resource_id):
+    response = client.get(f"/resources/{resource_id}/download",
+                          headers={"Range": "bytes=100-199", "Accept-Encoding": "gzip"})
+    assert response.status_code == 206
+    assert response.content == DATA[100:200]
+    assert response.headers["content-range"] == f"bytes 100-199/{len(DATA)}"
+    # Ranges refer to the stored bytes, so the middleware leaves them alone
+    assert "content-encoding" not in response.headers
+
+
+def test_suffix_range(client, resource_id):
+    response = client.get(f"/resources/{resource_id}/download", headers={"Range": "bytes=-10"})
+    assert response.status_code == 206
+    assert response.content == DATA[-10:]
+
+
+def test_unsatisfiable_range(client, resource_id):
+    response = client.get(f"/resources/{resource_id}/download",
+                          headers={"Range": f"bytes={len(DATA) + 10}-"})
+    assert response.status_code == 416
+
+
+def test_matching_etag_is_not_modified(client, resource_id):
+    etag = client.head(f"/resources/{resource_id}/download").headers["etag"]
+    response = client.get(f"/resources/{resource_id}/download", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    stale = client.get(f"/resources/{resource_id}/download", headers={"If-None-Match": '"other"'})
+    assert stale.status_code == 200
+
+
+def test_unknown_resource_is_not_found(client):
+    assert client.get("/resources/999999/download").status_code == 404
@@ -0,0 +1,201 @@
+"""
+Sandbox isolation: a run must not be able to reach the worker's protocol
+stream, forge another run's result or leave state behind.
+"""
+import asyncio
+import os
+import sys
+import textwrap
+
+import pytest
+
+from app.execution.engines import ExecutionEngine, ExecutionRejected
+from app.execution.pool import SandboxPool, SandboxWorker, WorkerError
+from app.execution.sandbox import DEFAULT_LIMITS
+from app.execution.service import ExecutionService
+
+FAKE_REPLY = textwrap.dedent('''
+    import json, os, struct
+    fake = json.dumps({"status": "ok", "stdout": "forged", "stderr": "", "error": None,
+                       "truncated": False}).encode()
+    frame = struct.pack(">I", len(fake)) + fake
+''')
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = SandboxPool(1)
+    pool.start()
+    yield pool
+    pool.stop()
+
+
+def run(pool, code):
+    return pool.call({"code": code, "limits": DEFAULT_LIMITS}, timeout=30)
+
+
+def test_runs_are_isolated(pool):
+    assert run(pool, "import math\nmath.pi = 3\nprint(math.pi)")["stdout"] == "3\n"
+    assert run(pool, "import math\nprint(math.pi)")["stdout"] == "3.141592653589793\n"
+
+
+def test_inherited_descriptors_cannot_be_reopened(pool):
+    code = FAKE_REPLY + textwrap.dedent('''
+        opened = []
+        for fd in range(64):
+            try:
+                with open(fd, "wb", closefd=False) as f:
+                    f.write(frame)
+                opened.append(fd)
+            except OSError:
+                pass
+        print(opened)
+    ''')
+    result = run(pool, code)
+    assert result["stdout"] == "[]\n"
+    assert run(pool, "print('next')")["stdout"] == "next\n"
+
+
+def test_protocol_pipes_are_closed_in_the_child(pool):
+    # os.write is not audited: the descriptors themselves must be gone
+    code = FAKE_REPLY + textwrap.dedent('''
+        for fd in range(3, 64):
+            try:
+                os.write(fd, frame)
+            except OSError:
+                pass
+    ''')
+    result = run(pool, code)
+    assert result.get("stdout") != "forged"
+    assert run(pool, "print('after')")["stdout"] == "after\n"
+
+
+def test_tempfiles_still_work(pool):
+    # NamedTemporaryFile reopens the descriptor it created by number
+    code = "import tempfile\nwith tempfile.NamedTemporaryFile() as f:\n    f.write(b'x')\nprint('ok')"
+    assert run(pool, code)["stdout"] == "ok\n"
+
+
+def test_reply_for_another_job_retires_the_worker(tmp_path):
+    script = tmp_path / "echo_worker.py"
+    script.write_text(textwrap.dedent(f'''
+        import sys
+        sys.path.insert(0, {os.path.dirname(os.path.abspath(sys.modules[SandboxPool.__module__].__file__))!r})
+        from sandbox import read_message, write_message
+        requests, replies = sys.stdin.buffer, sys.stdout.buffer
+        write_message(replies, {{"ready": True}})
+        while True:
+            job = read_message(requests)
+            if job is None:
+                break
+            write_message(replies, {{"status": "ok", "id": job["id"] + 1}})
+    '''))
+    worker = SandboxWorker(str(script), ready_timeout=30)
+    try:
+        with pytest.raises(WorkerError):
+            worker.call({"code": ""}, timeout=30)
+    finally:
+        worker.stop()
+
+
+def test_learners_cannot_choose_an_unsandboxed_engine():
+    class Unsandboxed(ExecutionEngine):
+        name = "spark"
+        learner_selectable = False
+
+    service = ExecutionService(max_per_user=1, max_queue=1)
+    service.register(Unsandboxed())
+    service.start()
+    with pytest.raises(ExecutionRejected) as excinfo:
+        asyncio.run(service.run(1, "print(1)", engine_name="spark"))
+    assert excinfo.value.status_code == 400
+    # Authors' exercise specs still select it through select_engine
+    assert service.select_engine("", None, "spark").name == "spark"
+
+
+# Only modules the worker already loaded: the run user may not be able to
+# import from the interpreter's directory on a test machine
+BLOCKED_AFTER_TAMPERING = textwrap.dedent('''
+    import os
+    for attempt in (lambda: os.system("cat /etc/hostname"),
+                    lambda: os.posix_spawn("/bin/cat", ["cat", "/etc/hostname"], {})):
+        try:
+            attempt()
+            print("allowed")
+        except PermissionError:
+            print("blocked")
+''')
+
+
+def test_run_cannot_clear_the_blocklist(pool):
+    code = textwrap.dedent('''
+        import sys
+        try:
+            sys.modules["__main__"].BLOCKED_EVENTS.clear()
+        except AttributeError:
+            pass
+    ''') + BLOCKED_AFTER_TAMPERING
+    assert run(pool, code)["stdout"] == "blocked\nblocked\n"
+
+
+def test_run_cannot_rebind_the_policy_or_builtins(pool):
+    code = textwrap.dedent('''
+        import builtins, sys
+        sandbox = sys.modules["__main__"]
+        sandbox.BLOCKED_EVENTS = frozenset()
+        sandbox.WRITE_PATH_EVENTS = frozenset()
+        builtins.any = lambda items: True
+        try:
+            open("/etc/hostname").read()
+            print("allowed")
+        except PermissionError:
+            print("blocked")
+    ''') + BLOCKED_AFTER_TAMPERING
+    assert run(pool, code)["stdout"] == "blocked\nblocked\nblocked\n"
+
+
+def test_run_cannot_reach_the_hook_through_gc(pool):
+    code = "import gc\ntry:\n    gc.get_objects()\n    print('allowed')\nexcept PermissionError:\n    print('blocked')"
+    assert run(pool, code)["stdout"] == "blocked\n"
+
+
+def test_runs_never_execute_as_root(pool):
+    result = run(pool, "import os\nprint(os.getuid(), os.geteuid())")
+    assert result["status"] == "ok"
+    if os.geteuid() == 0:
+        assert result["stdout"] == f"{DEFAULT_LIMITS['run_as_uid']} {DEFAULT_LIMITS['run_as_uid']}\n"
+    else:
+        assert result["stdout"] == f"{os.getuid()} {os.geteuid()}\n"
+
+
+@pytest.mark.skipif(os.geteuid() != 0, reason="only a root worker switches users")
+def test_root_worker_refuses_to_run_code_as_root(pool):
+    result = pool.call({"code": "print('ran')", "limits": {**DEFAULT_LIMITS, "run_as_uid": 0}}, timeout=30)
+    assert result["status"] == "crashed"
+    assert result["stdout"] == ""
+    assert "root" in result["error"]
+
+
+def test_failed_respawn_does_not_requeue_the_dead_worker(monkeypatch):
+    pool = SandboxPool(1)
+    pool.start()
+    try:
+        def broken_spawn():
+            raise WorkerError("Worker failed to start")
+
+        spawn = pool._spawn
+        monkeypatch.setattr(pool, "_spawn", broken_spawn)
+        pool._workers[0].process.kill()
+        with pytest.raises(WorkerError):
+            run(pool, "print(1)")
+        # The slot stays empty instead of holding the dead worker
+        assert pool._idle.empty()
+        with pytest.raises(WorkerError, match="No sandbox worker"):
+            run(pool, "print(2)")
+
+        # Spawning works again: a later job refills the slot
+        monkeypatch.setattr(pool, "_spawn", spawn)
+        pool._respawn_at = 0
+        assert run(pool, "print(3)")["stdout"] == "3\n"
+    finally:
+        pool.stop()
@@ -0,0 +1,64 @@
+"""
+Cached users: every committed write to a users row drops its snapshot, so
+a changed role or tier applies on the next request, not after the TTL.
+"""
+from sqlalchemy import update
+
+from app.auth.dependencies import get_user_by_email
+from app.cache import get_cache, user_key
+from app.models import User
+
+from conftest import make_user
+
+
+def _cached(email: str) -> bool:
+    return get_cache().get(user_key(email)) is not None
+
+
+def test_update_drops_the_cached_user(db):
+    make_user("cached@tests.example")
+    assert get_user_by_email(db, "cached@tests.example").is_premium is False
+    assert _cached("cached@tests.example")
+
+    user = db.query(User).filter(User.email == "cached@tests.example").one()
+    user.is_premium = True
+    db.commit()
+    assert not _cached("cached@tests.example")
+    assert get_user_by_email(db, "cached@tests.example").is_premium is True
+
+
+def test_email_change_drops_the_old_key(db):
+    make_user("renamed@tests.example")
+    get_user_by_email(db, "renamed@tests.example")
+    user = db.query(User).filter(User.email == "renamed@tests.example").one()
+    user.email = "renamed-again@tests.example"
+    db.commit()
+    assert not _cached("renamed@tests.example")
+    assert get_user_by_email(db, "renamed@tests.example") is None
+
+
+def test_bulk_update_drops_every_cached_user(db):
+    make_user("bulk@tests.example")
+    get_user_by_email(db, "bulk@tests.example")
+    db.execute(update(User).where(User.email == "bulk@tests.example").values(name="Bulk"))
+    db.commit()
+    assert not _cached("bulk@tests.example")
+
+
+def test_rolled_back_write_keeps_the_cached_user(db):
+    make_user("rollback@tests.example")
+    get_user_by_email(db, "rollback@tests.example")
+    user = db.query(User).filter(User.email == "rollback@tests.example").one()
+    user.name = "Never saved"
+    db.flush()
+    db.rollback()
+    assert _cached("rollback@tests.example")
+
+
+def test_demoted_admin_loses_access_immediately(client, db):
+    _, headers = make_user("demoted@tests.example", superuser=True)
+    assert client.get("/admin/catalog/versions", headers=headers).status_code == 200
+
+    db.execute(update(User).where(User.email == "demoted@tests.example").values(is_superuser=False))
+    db.commit()
+    assert client.get("/admin/catalog/versions", headers=headers).status_code == 403
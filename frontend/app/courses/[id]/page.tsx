@@ -20,7 +20,7 @@ function DifficultyBadge({ difficulty }: { difficulty: Lesson['difficulty'] }) {
   );
 }
 
-function LessonCard({ lesson }: { lesson: Lesson }) {
+function LessonCard({ lesson, position }: { lesson: Lesson; position: number }) {
   return (
     <div className="bg-white rounded-lg border border-gray-200 overflow-hidden hover:shadow-lg transition-shadow duration-300">
       <div className="p-4 border-b border-gray-100">
@@ -48,7 +48,7 @@ function LessonCard({ lesson }: { lesson: Lesson }) {
       
       <div className="px-4 py-3 bg-gray-50 flex justify-between items-center">
         <div className="text-sm text-gray-500">
-          Lesson {lesson.order}
+          Lesson {position}
         </div>
         <Link 
           href={`/lessons/${lesson.id}`}
@@ -82,42 +82,27 @@ export default function CoursePage() {
         setError(null);
         console.log('Attempting to fetch course data...');
 
-        // Fetch course data
-        console.log(`Fetching course: http://localhost:8000/courses/${courseId}`);
-        const courseResponse = await fetch(`http://localhost:8000/courses/${courseId}`, {
-          method: 'GET',
-          headers: {
-            'Accept': 'application/json',
-            'Content-Type': 'application/json',
-          },
-        });
-
-        if (!courseResponse.ok) {
-          throw new Error(`Course fetch failed with status: ${courseResponse.status}`);
-        }
-
-        const courseData = await courseResponse.json();
-        console.log('Course data received:', courseData);
-
-        // Fetch lessons data
-        console.log(`Fetching lessons: http://localhost:8000/courses/${courseId}/lessons`);
-        const lessonsResponse = await fetch(`http://localhost:8000/courses/${courseId}/lessons`, {
-          method: 'GET',
-          headers: {
-            'Accept': 'application/json',
-            'Content-Type': 'application/json',
-          },
-        });
+        // Course, lesson outline and navigation in one round trip
+        console.log(`Fetching course bundle: http://localhost:8000/courses/${courseId}/bundle`);
+        const bundleResponse = await fetch(
+          `http://localhost:8000/courses/${courseId}/bundle?fields=course,lessons,navigation`,
+          {
+            method: 'GET',
+            headers: {
+              'Accept': 'application/json',
+            },
+          }
+        );
 
-        if (!lessonsResponse.ok) {
-          throw new Error(`Lessons fetch failed with status: ${lessonsResponse.status}`);
+        if (!bundleResponse.ok) {
+          throw new Error(`Course fetch failed with status: ${bundleResponse.status}`);
         }
 
-        const lessonsData = await lessonsResponse.json();
-        console.log('Lessons data received:', lessonsData);
+        const bundle = await bundleResponse.json();
+        console.log('Course bundle received:', bundle);
 
-        setCourse(courseData);
-        setLessons(lessonsData.lessons || []);
+        setCourse(bundle.course);
+        setLessons(bundle.lessons || []);
       } catch (error) {
         console.error('Error details:', error);
         setError(
@@ -183,8 +168,8 @@ export default function CoursePage() {
         </div>
       ) : (
         <div className="grid gap-6 md:grid-cols-2">
-          {lessons.map((lesson) => (
-            <LessonCard key={lesson.id} lesson={lesson} />
+          {lessons.map((lesson, index) => (
+            <LessonCard key={lesson.id} lesson={lesson} position={index + 1} />
           ))}
         </div>
       )}
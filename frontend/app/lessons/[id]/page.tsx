@@ -256,6 +256,12 @@ export default function LessonPage() {
           fetch(`http://localhost:8000/lessons/${lessonId}/navigation`, { headers })
         ]);
 
+        if (lessonResponse.status === 403) {
+          setError('This is a premium lesson. Please upgrade to access this content.');
+          setIsLoading(false);
+          return;
+        }
+
         if (!lessonResponse.ok) {
           throw new Error(`Failed to fetch lesson: ${lessonResponse.status}`);
         }
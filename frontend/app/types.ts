@@ -47,7 +47,8 @@ export interface Lesson {
   id: number;
   title: string;
   description: string;
-  content: string;
+  // null, with no sections or samples, when the lesson is locked
+  content: string | null;
   content_sections?: string | string[];
   code_samples?: string | string[];
   key_points?: string;
@@ -57,6 +58,8 @@ export interface Lesson {
   estimated_time: number;
   learning_objectives: string;
   is_premium: boolean;
+  // Set by list endpoints when the caller's tier may not open the lesson
+  locked?: boolean;
   course_id: number;
   created_at: string;
   updated_at: string;
@@ -116,9 +119,13 @@ export interface Resource {
   id: number;
   title: string;
   type: string;
-  content: string;
+  content: string | null;
   description?: string;
   lesson_id: number;
+  size?: number | null;
+  media_type?: string | null;
+  filename?: string | null;
+  download_url?: string;
 }
 
 export interface UserProgress {